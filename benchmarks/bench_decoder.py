@@ -0,0 +1,160 @@
+"""Compare gif decoders for speed, peak memory and correctness.
+
+Every frame of every gif is decoded once by each decoder, each in a fresh
+process so resident memory is its own: QMovie caching all frames, as
+the viewer once used it, and FrameSource with the qt and numpy decoders.
+With --verify, the numpy decoder's frames are first checked pixel for pixel
+against QImageReader, and any difference fails the run.
+
+    python benchmarks/bench_decoder.py PATH [PATH ...] [--verify]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DECODERS = ("qmovie", "qt", "numpy")
+
+
+def resident_memory() -> int:
+    """Current resident set size in bytes."""
+
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # peak rather than current, but the best available off Linux
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def gif_files(paths: list[str]) -> list[Path]:
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.rglob("*.gif")) if path.is_dir() else [path])
+    return files
+
+
+def start_qt():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, str(ROOT))
+
+    from PyQt5.QtGui import QGuiApplication
+
+    return QGuiApplication(sys.argv[:1])
+
+
+def run_one(decoder: str, files: list[Path]) -> dict:
+    app = start_qt()  # noqa: F841, kept alive for the run
+
+    from PyQt5.QtGui import QMovie
+
+    from gifviewer.framesource import NUMPY_DECODER, FrameSource
+
+    if decoder == NUMPY_DECODER:
+        # NumPy itself is not part of the decoded frames' cost
+        import gifviewer.npdecoder  # noqa: F401
+
+    baseline = resident_memory()
+    peak = 0
+    frames = 0
+    start = time.perf_counter()
+    for file in files:
+        if decoder == "qmovie":
+            movie = QMovie(file.as_posix())
+            movie.setCacheMode(QMovie.CacheMode.CacheAll)
+            for number in range(movie.frameCount()):
+                movie.jumpToFrame(number)
+                movie.currentImage()
+                frames += 1
+        else:
+            source = FrameSource(file, decoder=decoder)
+            for number in range(source.frame_count):
+                source.frame(number)
+                frames += 1
+        # sampled with the file's frames still held
+        peak = max(peak, resident_memory() - baseline)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "decoder": decoder,
+        "frames": frames,
+        "seconds": round(elapsed, 3),
+        "fps": round(frames / elapsed, 1) if elapsed else 0.0,
+        "peak_mb": round(peak / 2**20, 1),
+    }
+
+
+def verify(files: list[Path]) -> list[str]:
+    """Return the files where the numpy decoder differs from QImageReader."""
+
+    app = start_qt()  # noqa: F841, kept alive for the run
+
+    from PyQt5.QtGui import QImage, QImageReader
+
+    from gifviewer.framesource import NUMPY_DECODER, FrameSource
+
+    # fully transparent pixels compare equal whatever colour they carry
+    pixel_format = QImage.Format.Format_ARGB32_Premultiplied
+    failures = []
+    for file in files:
+        reader = QImageReader(file.as_posix())
+        source = FrameSource(file, decoder=NUMPY_DECODER)
+        number = 0
+        while not (expected := reader.read()).isNull():
+            frame = source.frame(number).convertToFormat(pixel_format)
+            if frame != expected.convertToFormat(pixel_format):
+                failures.append(f"{file}: frame {number} differs")
+                break
+            number += 1
+        else:
+            if number != source.frame_count:
+                failures.append(
+                    f"{file}: {source.frame_count} frames, expected {number}"
+                )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="gif files or folders of them")
+    parser.add_argument(
+        "--decoders", nargs="+", choices=DECODERS, default=list(DECODERS)
+    )
+    parser.add_argument(
+        "--verify", action="store_true", help="check the numpy decoder's frames first"
+    )
+    parser.add_argument("--child", choices=DECODERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    files = gif_files(args.paths)
+    if args.child:
+        print(json.dumps(run_one(args.child, files)))
+        return
+
+    if args.verify:
+        if failures := verify(files):
+            print("\n".join(failures))
+            sys.exit(1)
+        print(f"verified {len(files)} files")
+
+    print(f"{'decoder':<8} {'frames':>8} {'seconds':>8} {'fps':>8} {'peak MB':>8}")
+    for decoder in args.decoders:
+        command = [sys.executable, __file__, "--child", decoder, *args.paths]
+        output = subprocess.run(command, capture_output=True, text=True, check=True)
+        result = json.loads(output.stdout.splitlines()[-1])
+        print(
+            f"{result['decoder']:<8} {result['frames']:>8} {result['seconds']:>8.3f}"
+            f" {result['fps']:>8.1f} {result['peak_mb']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
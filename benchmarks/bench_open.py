@@ -0,0 +1,127 @@
+"""Compare reading gifs through QFile and through a memory map.
+
+Each file is opened, counted and its first frame decoded, as selecting it
+in the viewer does, several times over to stand for reselecting it. Each
+way of reading runs in a fresh process so its memory is its own: Qt's own
+QFile, as QImageReader(path) uses, and MappedFile. Memory is the peak
+resident set, and the private part of the resident set at the end; mapped
+pages belong to the page cache rather than to the process.
+
+    python benchmarks/bench_open.py PATH [PATH ...] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = ("qfile", "mmap")
+
+
+def memory_status() -> dict[str, int]:
+    """Peak, anonymous and file backed resident memory in bytes, on Linux."""
+
+    status = {}
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                key, _, value = line.partition(":")
+                if key in ("VmHWM", "RssAnon", "RssFile"):
+                    status[key] = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+    return status
+
+
+def gif_files(paths: list[str]) -> list[Path]:
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.rglob("*.gif")) if path.is_dir() else [path])
+    return files
+
+
+def run_one(mode: str, files: list[Path], repeat: int) -> dict:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, str(ROOT))
+
+    from PyQt5.QtGui import QGuiApplication, QImageReader
+
+    from gifviewer.mappedfile import MappedFile
+
+    app = QGuiApplication(sys.argv[:1])  # noqa: F841, kept alive for the run
+
+    timings = []
+    frames = 0
+    for _ in range(repeat):
+        for file in files:
+            start = time.perf_counter()
+            if mode == "mmap":
+                mapped = MappedFile(file)
+                reader = mapped.reader()
+            else:
+                mapped = None
+                reader = QImageReader(file.as_posix())
+            frames += reader.imageCount() > 0
+            reader.read()
+            timings.append(time.perf_counter() - start)
+            del reader
+            if mapped is not None:
+                mapped.close()
+
+    memory = memory_status()
+    timings.sort()
+    return {
+        "mode": mode,
+        "opens": len(timings),
+        "readable": frames,
+        "median_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[min(int(len(timings) * 0.95), len(timings) - 1)] * 1000,
+        "peak_mb": memory.get("VmHWM", 0) / 2**20,
+        "private_mb": memory.get("RssAnon", 0) / 2**20,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="gif files or folders of them")
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="times each file is opened"
+    )
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    files = gif_files(args.paths)
+    if args.child:
+        print(json.dumps(run_one(args.child, files, args.repeat)))
+        return
+
+    print(
+        f"{'mode':<6} {'opens':>6} {'median ms':>10} {'p95 ms':>8}"
+        f" {'peak MB':>8} {'private MB':>10}"
+    )
+    for mode in MODES:
+        command = [
+            sys.executable,
+            __file__,
+            "--child",
+            mode,
+            "--repeat",
+            str(args.repeat),
+            *args.paths,
+        ]
+        output = subprocess.run(command, capture_output=True, text=True, check=True)
+        result = json.loads(output.stdout.splitlines()[-1])
+        print(
+            f"{result['mode']:<6} {result['opens']:>6} {result['median_ms']:>10.3f}"
+            f" {result['p95_ms']:>8.3f} {result['peak_mb']:>8.1f}"
+            f" {result['private_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Measure file list populate time and resident memory.
+
+Each run happens in a fresh process so resident memory is not shared
+between sizes. The list model is fed in scanner sized batches, the way
+a folder scan fills it, and the legacy QListWidget approach can be
+measured for comparison.
+
+    python benchmarks/bench_populate.py [--sizes 10000 100000 1000000] [--widget]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def resident_memory() -> int:
+    """Current resident set size in bytes."""
+
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # peak rather than current, but the best available off Linux
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def synthetic_paths(count: int) -> list[Path]:
+    return [
+        Path(f"/mnt/assets/project_{i % 97:02d}/shot_{i % 1013:04d}/clip_{i:07d}.gif")
+        for i in range(count)
+    ]
+
+
+def run_one(size: int, widget: bool) -> dict:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, str(ROOT))
+
+    from PyQt5.QtWidgets import QApplication, QListView, QListWidget, QListWidgetItem
+
+    from gifviewer import scanner
+    from gifviewer.gui.giflistmodel import GifListModel
+    from gifviewer.mainviewmodel import MainViewModel
+
+    app = QApplication(sys.argv[:1])
+    paths = synthetic_paths(size)
+    batches = [
+        paths[i : i + scanner.BATCH_SIZE]
+        for i in range(0, len(paths), scanner.BATCH_SIZE)
+    ]
+    # a scan hands over paths whose string form is already cached
+    for path in paths:
+        str(path)
+    del paths
+
+    baseline = resident_memory()
+    start = time.perf_counter()
+    if widget:
+        view = QListWidget()
+        for batch in batches:
+            for file in batch:
+                item = QListWidgetItem(file.name)
+                item.file_path = file
+                view.addItem(item)
+    else:
+        model = MainViewModel()
+        view = QListView()
+        view.setUniformItemSizes(True)
+        view.setModel(GifListModel(model, view))
+        for batch in batches:
+            model.add_files(list(batch))
+        model.sort_files()
+    view.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    # the input batches stay alive, so only memory held by the list counts
+    return {
+        "size": size,
+        "implementation": "QListWidget" if widget else "GifListModel",
+        "seconds": round(elapsed, 3),
+        "rss_mb": round((resident_memory() - baseline) / 2**20, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--widget", action="store_true", help="also measure the QListWidget approach"
+    )
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--child-widget", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(args.child, args.child_widget)))
+        return
+
+    variants = [False, True] if args.widget else [False]
+    print(f"{'implementation':<14} {'entries':>9} {'seconds':>8} {'rss MB':>8}")
+    for size in args.sizes:
+        for widget in variants:
+            command = [sys.executable, __file__, "--child", str(size)]
+            if widget:
+                command.append("--child-widget")
+            output = subprocess.run(command, capture_output=True, text=True, check=True)
+            result = json.loads(output.stdout.splitlines()[-1])
+            print(
+                f"{result['implementation']:<14} {result['size']:>9}"
+                f" {result['seconds']:>8.3f} {result['rss_mb']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
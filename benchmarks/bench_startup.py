@@ -0,0 +1,94 @@
+"""Measure the time from process start to the main window's first paint.
+
+Each run launches the viewer through cli.py in a fresh process, the way
+a user does, and stops it as soon as the window has painted. The median
+of the runs is checked against a budget, so a regression fails the run.
+
+    python benchmarks/bench_startup.py [--runs 5] [--budget-ms 1500] [--start-in DIR]
+"""
+
+import argparse
+import json
+import os
+import runpy
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_RUNS = 5
+DEFAULT_BUDGET_MS = 1500
+
+
+def run_child(start_in: str) -> None:
+    """Start the viewer and report when its window first paints."""
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, str(ROOT))
+
+    # MainView is needed before the first paint anyway, so importing it
+    # here to hook the signal adds nothing to the measured time
+    from gifviewer.gui.mainview import MainView
+
+    init = MainView.__init__
+
+    def hooked_init(view: MainView) -> None:
+        init(view)
+        view.first_painted.connect(lambda: report(view))
+
+    def report(view: MainView) -> None:
+        print(json.dumps({"painted": time.time(), "modules": len(sys.modules)}))
+        sys.stdout.flush()
+        view.close()
+        from PyQt5.QtWidgets import QApplication
+
+        QApplication.quit()
+
+    MainView.__init__ = hooked_init
+    sys.argv = [str(ROOT / "cli.py"), "--no-confirm-exit", "--start-in", start_in]
+    try:
+        runpy.run_path(str(ROOT / "cli.py"), run_name="__main__")
+    except SystemExit:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument(
+        "--start-in", default=str(ROOT), help="folder the viewer starts in"
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.start_in)
+        return
+
+    timings = []
+    for _ in range(args.runs):
+        started = time.time()
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", "--start-in", args.start_in],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        result = json.loads(output.stdout.splitlines()[-1])
+        timings.append((result["painted"] - started) * 1000)
+
+    median = statistics.median(timings)
+    print(
+        f"first paint: median {median:.0f} ms, best {min(timings):.0f} ms,"
+        f" budget {args.budget_ms:.0f} ms, {result['modules']} modules loaded"
+    )
+    if median > args.budget_ms:
+        print("over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
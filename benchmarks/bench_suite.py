@@ -0,0 +1,295 @@
+"""Time the viewer's hot paths on synthetic corpora and check for regressions.
+
+Corpora are generated locally by corpus.py. Every case runs headless in
+a fresh process with an empty file index, the way a first launch
+would, and is repeated; the median of each metric is reported.
+
+    scan         MainViewModel.update_files, to the first batch and to the
+                 end, with a cold file index and then a warm one
+    populate     time spent in the controller's _populate_gif_list slot
+                 while a scan fills the list
+    first-frame  _set_gif_display_movie_from_string to the first frame
+                 painted, for files not decoded before
+    seek         random jumpToFrame seeks in single-step mode
+
+Results are written as JSON. Given a baseline saved by an earlier run,
+a metric more than --threshold slower than its baseline, by at least
+--min-delta-ms, is a regression and fails the run.
+
+    python benchmarks/bench_suite.py [--cases ...] [--corpora ...]
+        [--output results.json] [--baseline baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import corpus
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+CASES = {
+    "scan": ("many-small", "nested"),
+    "populate": ("many-small", "nested"),
+    "first-frame": ("many-small", "large-frames", "long"),
+    "seek": ("large-frames", "long"),
+}
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA_MS = 10.0
+FIRST_FRAME_FILES = 20
+SEEKS = 200
+SEED = 1
+
+
+def start_viewer(folder: Path):
+    """Return a shown view and its controller, with nothing scanned yet."""
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt5.QtWidgets import QApplication
+
+    import cli
+    import gifviewer.settings as settings
+    from gifviewer.gui.mainview import MainView
+    from gifviewer.mainviewcontroller import MainViewController
+    from gifviewer.mainviewmodel import MainViewModel
+
+    app = QApplication(sys.argv[:1])
+    # no prefetching, so files are only decoded by the path being timed
+    settings.cl_args = cli.parse_gui_args(
+        ["--no-confirm-exit", "--prefetch", "0", "--start-in", str(folder)]
+    )
+    view = MainView()
+    model = MainViewModel()
+    controller = MainViewController(view, model)
+    view.show()
+    app.processEvents()
+    return app, view, model, controller
+
+
+def stop_viewer(app) -> None:
+    """Stop the viewer's threads, which quitting an event loop would do."""
+
+    # noinspection PyUnresolvedReferences
+    app.aboutToQuit.emit()
+
+
+def scan(controller, model, folder: Path) -> tuple[float, float]:
+    """Scan folder as the browse button does; return ms to first batch and to end."""
+
+    from PyQt5.QtCore import QEventLoop
+
+    loop = QEventLoop()
+    times = []
+    first_batch = lambda _: times or times.append(time.perf_counter())  # noqa: E731
+    model.files_added.connect(first_batch)
+    model.scan_finished.connect(loop.quit)
+    start = time.perf_counter()
+    controller._scan_folders([folder])
+    loop.exec()
+    finished = time.perf_counter()
+    model.files_added.disconnect(first_batch)
+    model.scan_finished.disconnect(loop.quit)
+    model.stop_watching()
+    return (times[0] - start) * 1000, (finished - start) * 1000
+
+
+def run_scan(folder: Path) -> dict:
+    app, view, model, controller = start_viewer(folder)
+    cold_first, cold = scan(controller, model, folder)
+    warm_first, warm = scan(controller, model, folder)
+    stop_viewer(app)
+    return {
+        "cold_first_batch_ms": cold_first,
+        "cold_scan_ms": cold,
+        "warm_first_batch_ms": warm_first,
+        "warm_scan_ms": warm,
+    }
+
+
+def run_populate(folder: Path) -> dict:
+    from gifviewer.mainviewcontroller import MainViewController
+
+    spent = []
+    populate = MainViewController._populate_gif_list
+
+    def timed_populate(controller, files) -> None:
+        start = time.perf_counter()
+        populate(controller, files)
+        spent.append(time.perf_counter() - start)
+
+    # hooked before the controller connects it
+    MainViewController._populate_gif_list = timed_populate
+    app, view, model, controller = start_viewer(folder)  # noqa: F841
+    scan(controller, model, folder)
+    stop_viewer(app)
+    return {
+        "populate_ms": sum(spent) * 1000,
+        "populate_max_batch_ms": max(spent) * 1000,
+    }
+
+
+def run_first_frame(folder: Path) -> dict:
+    app, view, model, controller = start_viewer(folder)
+    scan(controller, model, folder)
+    # the scan has already opened the first file, by selecting it
+    files = list(model.files)[1 : FIRST_FRAME_FILES + 1]
+    timings = []
+    for file in files:
+        start = time.perf_counter()
+        controller._set_gif_display_movie_from_string(file)
+        view.gif_display.repaint()
+        timings.append((time.perf_counter() - start) * 1000)
+        app.processEvents()
+    stop_viewer(app)
+    return summary("first_frame", timings)
+
+
+def run_seek(folder: Path) -> dict:
+    app, view, model, controller = start_viewer(folder)
+    scan(controller, model, folder)
+    generator = random.Random(SEED)
+    timings = []
+    for file in model.files:
+        controller._set_gif_display_movie_from_string(file)
+        view.single_step.setChecked(True)
+        movie = view.movie()
+        for _ in range(SEEKS // len(model.files)):
+            frame = generator.randrange(movie.frameCount())
+            start = time.perf_counter()
+            movie.jumpToFrame(frame)
+            view.gif_display.repaint()
+            timings.append((time.perf_counter() - start) * 1000)
+        view.single_step.setChecked(False)
+        app.processEvents()
+    stop_viewer(app)
+    return summary("seek", timings)
+
+
+def summary(name: str, timings: list[float]) -> dict:
+    return {
+        f"{name}_mean_ms": statistics.fmean(timings),
+        f"{name}_p95_ms": statistics.quantiles(timings, n=20, method="inclusive")[-1],
+        f"{name}_max_ms": max(timings),
+    }
+
+
+RUNNERS = {
+    "scan": run_scan,
+    "populate": run_populate,
+    "first-frame": run_first_frame,
+    "seek": run_seek,
+}
+
+
+def run_case(case: str, folder: Path, repeat: int) -> dict:
+    """Run case on folder repeat times, each in a fresh process and index."""
+
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cache:
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", case, str(folder)],
+                capture_output=True,
+                text=True,
+                check=True,
+                env={**os.environ, "XDG_CACHE_HOME": cache},
+            )
+        runs.append(json.loads(output.stdout.splitlines()[-1]))
+    return {
+        metric: round(statistics.median(run[metric] for run in runs), 2)
+        for metric in runs[0]
+    }
+
+
+def regressions(
+    results: dict, baseline: dict, threshold: float, min_delta_ms: float
+) -> list[str]:
+    """Describe every metric of results slower than allowed by baseline."""
+
+    found = []
+    for key, metrics in results["results"].items():
+        for metric, value in metrics.items():
+            if (old := baseline["results"].get(key, {}).get(metric)) is None:
+                continue
+            if value > old * (1 + threshold) and value - old >= min_delta_ms:
+                found.append(f"{key} {metric}: {old:.1f} -> {value:.1f} ms")
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument(
+        "--corpora",
+        nargs="+",
+        choices=corpus.CORPORA,
+        help="only run on these corpora",
+    )
+    parser.add_argument(
+        "--corpus-dir",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "gifviewer-bench",
+        help="where corpora are generated and kept",
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--output", type=Path, help="write the results here")
+    parser.add_argument("--baseline", type=Path, help="results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed slowdown as a fraction of the baseline",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=DEFAULT_MIN_DELTA_MS,
+        help="slowdowns smaller than this are noise",
+    )
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        case, folder = args.child
+        print(json.dumps(RUNNERS[case](Path(folder))))
+        return
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": {},
+    }
+    for case in args.cases:
+        for name in CASES[case]:
+            if args.corpora and name not in args.corpora:
+                continue
+            folder = corpus.ensure_corpus(name, args.corpus_dir)
+            metrics = run_case(case, folder, args.repeat)
+            results["results"][f"{case}/{name}"] = metrics
+            for metric, value in metrics.items():
+                print(f"{case + '/' + name:<26} {metric:<24} {value:>10.1f}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if found := regressions(results, baseline, args.threshold, args.min_delta_ms):
+            print("regressions:\n" + "\n".join(found))
+            sys.exit(1)
+        print(f"no regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
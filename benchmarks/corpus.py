@@ -0,0 +1,134 @@
+"""Synthetic gif corpora for the benchmarks, generated locally.
+
+The gifs are written without any imaging library. Their image data is
+nothing but literal LZW codes, with a clear code often enough that codes
+stay 9 bits wide, so a frame is assembled from a few cached byte-aligned
+chunks and even large corpora are written in seconds. Decoders have to
+handle every code of such data, which makes it heavier to decode than
+typical gifs of the same size, never lighter.
+
+A corpus is regenerated only when its spec changes.
+"""
+
+import dataclasses
+import json
+import shutil
+import struct
+from pathlib import Path
+
+MANIFEST = "corpus.json"
+
+MIN_CODE_SIZE = 8
+CLEAR = 1 << MIN_CODE_SIZE
+END = CLEAR + 1
+CODE_BITS = MIN_CODE_SIZE + 1
+# literals after each clear code: 1 + 247 codes of 9 bits fill 279 whole
+# bytes, and 247 table entries are too few to widen the codes
+CHUNK_PIXELS = 247
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CorpusSpec:
+    files: int
+    width: int
+    height: int
+    frames: int
+    # files are spread over fanout ** depth leaf directories
+    depth: int = 0
+    fanout: int = 4
+    delay_cs: int = 4
+
+
+CORPORA = {
+    "many-small": CorpusSpec(files=5000, width=64, height=64, frames=4),
+    "nested": CorpusSpec(files=5000, width=64, height=64, frames=4, depth=3),
+    "large-frames": CorpusSpec(files=4, width=1024, height=768, frames=24),
+    "long": CorpusSpec(files=3, width=320, height=240, frames=300),
+}
+
+
+def ensure_corpus(name: str, root: Path) -> Path:
+    """Return the folder of corpus name below root, generating it if needed."""
+
+    spec = CORPORA[name]
+    folder = root / name
+    manifest = folder / MANIFEST
+    try:
+        if json.loads(manifest.read_text()) == dataclasses.asdict(spec):
+            return folder
+    except (OSError, ValueError):
+        pass
+
+    shutil.rmtree(folder, ignore_errors=True)
+    folder.mkdir(parents=True)
+    data = gif_bytes(spec.width, spec.height, spec.frames, spec.delay_cs)
+    leaves = spec.fanout**spec.depth
+    for number in range(spec.files):
+        path = folder.joinpath(
+            *_leaf_parts(number % leaves, spec), f"clip_{number:06d}.gif"
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    # written last, so an interrupted generation is redone
+    manifest.write_text(json.dumps(dataclasses.asdict(spec)))
+    return folder
+
+
+def gif_bytes(width: int, height: int, frames: int, delay_cs: int) -> bytes:
+    """Return an endlessly looping gif whose frames differ from each other."""
+
+    palette = b"".join(bytes((i, i * 3 % 256, 255 - i)) for i in range(256))
+    parts = [
+        b"GIF89a",
+        struct.pack("<HHBBB", width, height, 0xF7, 0, 0),
+        palette,
+        b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00",
+    ]
+    chunks = [_pack([CLEAR, *_literals(first, CHUNK_PIXELS)]) for first in range(256)]
+    pixels = width * height
+    full, rest = divmod(pixels, CHUNK_PIXELS)
+    for frame in range(frames):
+        shift = frame * 7
+        data = b"".join(
+            chunks[(chunk * CHUNK_PIXELS + shift) % 256] for chunk in range(full)
+        )
+        data += _pack(
+            [CLEAR, *_literals((full * CHUNK_PIXELS + shift) % 256, rest), END]
+        )
+        parts += [
+            # graphic control extension, disposal 1 leaves the frame in place
+            struct.pack("<4BHBB", 0x21, 0xF9, 4, 0x04, delay_cs, 0, 0),
+            struct.pack("<BHHHHB", 0x2C, 0, 0, width, height, 0),
+            bytes((MIN_CODE_SIZE,)),
+            _sub_blocks(data),
+        ]
+    parts.append(b"\x3b")
+    return b"".join(parts)
+
+
+def _leaf_parts(leaf: int, spec: CorpusSpec) -> list[str]:
+    parts = []
+    for level in range(spec.depth):
+        leaf, branch = divmod(leaf, spec.fanout)
+        parts.append(f"level{level}_{branch}")
+    return parts
+
+
+def _literals(first: int, count: int) -> list[int]:
+    return [(first + i) % 256 for i in range(count)]
+
+
+def _pack(codes: list[int]) -> bytes:
+    value = 0
+    for shift, code in enumerate(codes):
+        value |= code << (shift * CODE_BITS)
+    return value.to_bytes((len(codes) * CODE_BITS + 7) // 8, "little")
+
+
+def _sub_blocks(data: bytes) -> bytes:
+    blocks = [
+        bytes((len(block),)) + block
+        for block in (data[i : i + 255] for i in range(0, len(data), 255))
+    ]
+    return b"".join(blocks) + b"\x00"
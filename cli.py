@@ -1,18 +1,117 @@
 """Entry point"""
 
 import argparse
+import importlib.util
+import sys
 
 import gifviewer.settings as settings
+from gifviewer import scanner
 
-from gifviewer.__main__ import main
+SCAN_COMMAND = "scan"
+EXPORT_COMMAND = "export"
+OPTIMIZE_COMMAND = "optimize"
+
+
+def parse_gui_args(args: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        epilog=f"run '%(prog)s {SCAN_COMMAND} --help' to extract metadata headless,"
+        f" '%(prog)s {EXPORT_COMMAND} --help' to export frames,"
+        f" '%(prog)s {OPTIMIZE_COMMAND} --help' to shrink gifs"
+    )
+    parser.add_argument(
+        "--no-confirm-exit", action="store_true", help="bypass exit confirmation"
+    )
+    parser.add_argument(
+        "--start-in",
+        type=str,
+        nargs="+",
+        default=["."],
+        metavar="FOLDER",
+        help="start in this folder; several are scanned together",
+    )
+    scanner.add_scan_arguments(parser)
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        default=settings.DEFAULT_CACHE_MB,
+        help="memory budget for decoded frames, in MB",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=settings.DEFAULT_PREFETCH_COUNT,
+        help="files decoded ahead on each side of the selection",
+    )
+    parser.add_argument(
+        "--decoder",
+        choices=settings.DECODERS,
+        default=settings.QT_DECODER,
+        help="gif decoder; numpy needs NumPy installed",
+    )
+    parser.add_argument(
+        "--playback-stats",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help="time playback, shown in the status bar; written to FILE as JSON on exit",
+    )
+    parser.add_argument(
+        "--no-frame-skip",
+        action="store_true",
+        help="show every frame, even when that plays slower than real time",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help="watch for event loop stalls and time the controller's slots;"
+        " a summary is printed on exit and written to FILE as JSON",
+    )
+    parser.add_argument(
+        "--stall-ms",
+        type=int,
+        default=settings.DEFAULT_STALL_MS,
+        metavar="MS",
+        help="event loop delay reported as a stall by --profile",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="FILE",
+        help="run the GUI thread under cProfile, written to FILE on exit;"
+        " implies --profile",
+    )
+    cl_args = parser.parse_args(args)
+    if (
+        cl_args.decoder == settings.NUMPY_DECODER
+        and importlib.util.find_spec("numpy") is None
+    ):
+        parser.error("the numpy decoder needs NumPy, which is not installed")
+    if cl_args.max_depth is not None and cl_args.max_depth < 0:
+        parser.error("--max-depth must not be negative")
+    if cl_args.stall_ms <= 0:
+        parser.error("--stall-ms must be positive")
+    if cl_args.cprofile is not None and cl_args.profile is None:
+        cl_args.profile = ""
+    return cl_args
 
-parser = argparse.ArgumentParser()
-parser.add_argument(
-    "--no-confirm-exit", action="store_true", help="bypass exit confirmation"
-)
-parser.add_argument("--start-in", type=str, default=".", help="start in this folder")
-cl_args = parser.parse_args()
-settings.cl_args = cl_args
 
 if __name__ == "__main__":
+    if sys.argv[1:2] == [SCAN_COMMAND]:
+        from gifviewer import scancommand
+
+        sys.exit(scancommand.main(sys.argv[2:]))
+    if sys.argv[1:2] == [EXPORT_COMMAND]:
+        from gifviewer import exportcommand
+
+        sys.exit(exportcommand.main(sys.argv[2:]))
+    if sys.argv[1:2] == [OPTIMIZE_COMMAND]:
+        from gifviewer import optimizecommand
+
+        sys.exit(optimizecommand.main(sys.argv[2:]))
+
+    settings.cl_args = parse_gui_args(sys.argv[1:])
+
+    from gifviewer.__main__ import main
+
     main()
@@ -1,6 +1,31 @@
-__version__ = "1.4.2"
+__version__ = "1.28.0"
 
 change_log = {
+    "1.28.0": "Added --profile, a watchdog for event loop stalls and slot timings.",
+    "1.27.0": "Added a filmstrip of frames in single step mode.",
+    "1.26.0": "Added optimizing gifs in bulk to make them smaller.",
+    "1.25.0": "Gifs inside zip and tar archives can be browsed.",
+    "1.24.0": "Playback keeps time, clamps tiny delays and skips frames when behind.",
+    "1.23.0": "Added finding identical and similar gifs.",
+    "1.22.0": "Gifs are read through memory maps.",
+    "1.21.0": "Added exporting frames to PNG files or sprite sheets.",
+    "1.20.0": "Several folders are scanned at once, with patterns and a depth limit.",
+    "1.19.0": "View > Compare Selected plays 2 to 9 files side by side in step.",
+    "1.18.0": "Gifs larger than the window are decoded scaled to fit it.\n"
+    "View > Actual Size shows them 1:1.",
+    "1.17.0": "Added a search box and sorting by size, date, frames or dimensions.",
+    "1.16.0": "Added --playback-stats, frame timing in the status bar and as JSON.",
+    "1.15.0": "The file list follows files added, removed or renamed in the folder.",
+    "1.14.0": "The window paints before the first scan, and starts faster.",
+    "1.13.0": "Added a headless 'scan' command writing gif metadata as jsonl or csv.",
+    "1.12.0": "Added an optional NumPy decoder and a --decoder commandline argument.",
+    "1.11.0": "Gifs too large for the cache are streamed, seeking from a frame index.",
+    "1.10.0": "Added a thumbnail grid view with a disk backed thumbnail cache.",
+    "1.9.0": "Files next to the selection are decoded ahead of time.",
+    "1.8.0": "Decoded gifs are kept in a memory bounded cache.",
+    "1.7.0": "The file list is a model/view list backed by compact path storage.",
+    "1.6.0": "Scanned folders are indexed so reopening them only relists changes.",
+    "1.5.0": "Folders are scanned in the background, filling the list as found.",
     "1.4.2": "Changed loop and single step radio buttons to checkboxes.",
     "1.4.1": "Added a commandline argument to start browsing from a given folder.",
     "1.4.0": "Added a commandline argument to bypass exit confirmation.",
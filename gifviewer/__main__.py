@@ -1,7 +1,9 @@
 import sys
+from pathlib import Path
 
 from PyQt5.QtWidgets import QApplication
 
+from . import settings
 from .gui.mainview import MainView
 from .mainviewcontroller import MainViewController
 from .mainviewmodel import MainViewModel
@@ -12,12 +14,38 @@ def main():
 
     app = QApplication(sys.argv)
 
+    controller_class = MainViewController
+    if settings.cl_args.profile is not None:
+        controller_class = _start_profiling(app)
+
     main_view = MainView()
 
     main_view_model = MainViewModel()
 
-    main_view_controller = MainViewController(main_view, main_view_model)
+    main_view_controller = controller_class(main_view, main_view_model)
     main_view_controller.initialize_controller()
 
     main_view.show()
     sys.exit(app.exec())
+
+
+def _start_profiling(app: QApplication) -> type[MainViewController]:
+    from .profiling import Profiler
+
+    profiler = Profiler(
+        settings.cl_args.stall_ms, settings.cl_args.cprofile is not None, app
+    )
+
+    def _finish() -> None:
+        profiler.stop()
+        print(profiler.summary(), file=sys.stderr)
+        if settings.cl_args.profile:
+            profiler.export(Path(settings.cl_args.profile))
+        if settings.cl_args.cprofile:
+            profiler.export_cprofile(Path(settings.cl_args.cprofile))
+
+    # noinspection PyUnresolvedReferences
+    app.aboutToQuit.connect(_finish)
+    profiler.start()
+    # slots are connected as the controller is made, so it is made timed
+    return profiler.timed(MainViewController)
@@ -0,0 +1,211 @@
+"""Gifs inside zip and tar archives, kept free of Qt like the scanner.
+
+An archive is browsed as a folder holding its members, whose paths are the
+archive's path followed by the member's name, as in
+drops/bundle.zip/anims/spin.gif. Members are listed from a zip's central
+directory or a tar's headers without reading any member data, and opening
+one reads that member alone: a zip member is decompressed by itself and a
+tar member read from where its data starts. Compressed tars offer no such
+shortcut and are not browsed.
+
+Nothing is extracted to disk. Members are read into memory, and the most
+recently read are kept there within MEMBER_CACHE_BYTES, so returning to
+one does not read the archive again.
+"""
+
+import collections
+import os
+import tarfile
+import threading
+import zipfile
+from pathlib import Path
+from typing import NamedTuple
+
+ARCHIVE_SUFFIXES = (".zip", ".tar")
+MEMBER_CACHE_BYTES = 64 * 2**20
+# archives kept open with their member lists, so reading a member does not
+# parse a large central directory again
+OPEN_ARCHIVES = 8
+
+
+class Member(NamedTuple):
+    name: str  # / separated below the archive
+    size: int
+
+
+class MemberStat(NamedTuple):
+    """The parts of an os.stat() result used for files, for a member.
+
+    Members take the archive's mtime, so they change when it does.
+    """
+
+    st_size: int
+    st_mtime_ns: int
+
+
+def is_archive_name(name: str) -> bool:
+    return name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def is_archive(path: str | Path) -> bool:
+    """Return whether path is an archive file that can be browsed."""
+    return is_archive_name(os.path.basename(path)) and os.path.isfile(path)
+
+
+def split(path: str | Path) -> tuple[str, str] | None:
+    """Return the archive holding path and the member's name in it, or None
+    if path is not below an archive."""
+
+    parts = os.fspath(path).split(os.sep)
+    for end in range(1, len(parts)):
+        if is_archive_name(parts[end - 1]):
+            archive = os.sep.join(parts[:end])
+            if os.path.isfile(archive):
+                return archive, "/".join(parts[end:])
+    return None
+
+
+def stat(path: str | Path) -> os.stat_result | MemberStat:
+    """Return os.stat(path), or the size and mtime of an archive member."""
+
+    try:
+        return os.stat(path)
+    except (NotADirectoryError, FileNotFoundError):
+        # a member's path runs through its archive, a file
+        if (member := split(path)) is None:
+            raise
+
+    archive, name = member
+    opened = _open(archive)
+    return MemberStat(opened.size(name), opened.mtime_ns)
+
+
+def list_members(archive: str | Path) -> list[Member]:
+    """Return the files in archive. Raises OSError if it cannot be read."""
+    return _open(os.fspath(archive)).members()
+
+
+def read_member(archive: str | Path, name: str) -> bytes:
+    """Return the contents of member name of archive.
+
+    Raises OSError if it cannot be read.
+    """
+
+    archive = os.fspath(archive)
+    opened = _open(archive)
+    key = (archive, name, opened.mtime_ns)
+    with _lock:
+        if (data := _members.get(key)) is not None:
+            _members.move_to_end(key)
+            return data
+
+    data = opened.read(name)
+    with _lock:
+        global _cached_bytes
+        if key not in _members and len(data) <= MEMBER_CACHE_BYTES:
+            _members[key] = data
+            _cached_bytes += len(data)
+            while _cached_bytes > MEMBER_CACHE_BYTES:
+                _cached_bytes -= len(_members.popitem(last=False)[1])
+    return data
+
+
+class _Archive:
+    """An open archive and where to find each of its members."""
+
+    def __init__(self, path: str) -> None:
+        """Raises OSError if path is not an archive that can be browsed."""
+
+        self._lock = threading.Lock()
+        self._zip: zipfile.ZipFile | None = None
+        self._tar: tarfile.TarFile | None = None
+        # member name to its size and, for a tar, where its data starts
+        self._entries: dict[str, tuple[int, int]] = {}
+        try:
+            if path.lower().endswith(".zip"):
+                self._zip = zipfile.ZipFile(path)
+                for info in self._zip.infolist():
+                    if not info.is_dir() and _plain(info.filename):
+                        self._entries[info.filename] = (info.file_size, 0)
+            else:
+                # "r:" refuses compressed tars, which are read start to end
+                self._tar = tarfile.open(path, "r:")
+                for info in self._tar:
+                    if info.isreg() and not info.sparse and _plain(info.name):
+                        self._entries[info.name] = (info.size, info.offset_data)
+                # the headers are all that is wanted from the tar object
+                self._tar.members = []
+            stat = os.stat(path)
+        except (zipfile.BadZipFile, tarfile.TarError, EOFError) as error:
+            self.close()
+            raise OSError(f"cannot read archive {path}: {error}") from error
+        except OSError:
+            self.close()
+            raise
+        self.mtime_ns = stat.st_mtime_ns
+        self.file_size = stat.st_size
+
+    def __del__(self) -> None:
+        self.close()
+
+    def members(self) -> list[Member]:
+        return [Member(name, size) for name, (size, _) in self._entries.items()]
+
+    def size(self, name: str) -> int:
+        return self._entry(name)[0]
+
+    def read(self, name: str) -> bytes:
+        size, offset = self._entry(name)
+        try:
+            if self._zip is not None:
+                # zipfile serialises its own reads, members decompress in parallel
+                return self._zip.read(name)
+            with self._lock:
+                file = self._tar.fileobj
+                file.seek(offset)
+                return file.read(size)
+        except (zipfile.BadZipFile, RuntimeError, EOFError, ValueError) as error:
+            # RuntimeError for encrypted members, ValueError once closed
+            raise OSError(f"cannot read {name}: {error}") from error
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+
+    def _entry(self, name: str) -> tuple[int, int]:
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise FileNotFoundError(f"no member {name} in the archive") from None
+
+
+def _plain(name: str) -> bool:
+    """Whether member name maps to a path of its own below the archive."""
+    return all(part not in ("", ".", "..") for part in name.split("/"))
+
+
+def _open(archive: str) -> _Archive:
+    stat = os.stat(archive)
+    with _lock:
+        if (opened := _archives.get(archive)) is not None:
+            if (opened.mtime_ns, opened.file_size) == (stat.st_mtime_ns, stat.st_size):
+                _archives.move_to_end(archive)
+                return opened
+            del _archives[archive]
+
+    # opened outside the lock, a large central directory takes a while
+    opened = _Archive(archive)
+    with _lock:
+        _archives[archive] = opened
+        while len(_archives) > OPEN_ARCHIVES:
+            # closed once no reader holds it any more
+            _archives.popitem(last=False)
+    return opened
+
+
+_lock = threading.Lock()
+_archives: collections.OrderedDict[str, _Archive] = collections.OrderedDict()
+_members: collections.OrderedDict[tuple, bytes] = collections.OrderedDict()
+_cached_bytes = 0
@@ -0,0 +1,159 @@
+"""Filters and sorts the file list off the GUI thread."""
+
+import threading
+from array import array
+from collections.abc import Callable
+
+from PyQt5.QtCore import (
+    QCoreApplication,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    pyqtSignal,
+    pyqtSlot,
+)
+
+from gifviewer import fileorder
+from gifviewer.fileorder import Ordering
+from gifviewer.nameindex import NameIndex
+
+
+class _TaskSignals(QObject):
+    done = pyqtSignal(object)
+
+
+class _Task(QRunnable):
+    """Runs function(cancelled) on a pool thread, keeping what it returns."""
+
+    def __init__(self, function: Callable[[Callable[[], bool]], object]) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.signals = _TaskSignals()
+        self.result = None
+        self._function = function
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def run(self) -> None:
+        self.result = self._function(self._cancelled.is_set)
+        # noinspection PyUnresolvedReferences
+        self.signals.done.emit(self)
+
+
+class ArrangeRequest:
+    """What to show: the files matching query, ordered by sort_key."""
+
+    def __init__(self, query: str, sort_key: str, generation: int) -> None:
+        self.query = query
+        self.sort_key = sort_key
+        # the file list's generation the request was made against
+        self.generation = generation
+        self.rows: array | None = None
+        # the sorted position of each store index, when sorted by metadata
+        self.ranks: array | None = None
+
+
+class FileListArranger(QObject):
+    """Searches the name index and orders the results on one worker thread.
+
+    Only the latest request is wanted: a new one cancels the one before.
+    In between requests the index is prepared for fast searching, work
+    that gives way to any request and carries on after it.
+    """
+
+    arranged = pyqtSignal(object)  # ArrangeRequest
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._request: _Task | None = None
+        self._preparing: _Task | None = None
+        self._unprepared: NameIndex | None = None
+        # every task the pool may still run, so none is garbage collected
+        self._pool_tasks: set[_Task] = set()
+
+        if (app := QCoreApplication.instance()) is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def arrange(
+        self, request: ArrangeRequest, names: NameIndex, ordering: Ordering | None
+    ) -> None:
+        self._cancel_request()
+        self._pause_preparing()
+
+        def work(cancelled: Callable[[], bool]) -> ArrangeRequest:
+            request.rows = fileorder.arrange(
+                names, request.query, ordering, cancelled=cancelled
+            )
+            request.ranks = None if ordering is None else ordering.ranks
+            return request
+
+        self._request = self._start(work)
+
+    def prepare(self, names: NameIndex) -> None:
+        """Prepare names for searching when there is nothing else to do."""
+
+        self._pause_preparing()
+        self._unprepared = names
+        if self._request is None:
+            self._resume_preparing()
+
+    def cancel_all(self) -> None:
+        self._cancel_request()
+        self._pause_preparing()
+        self._unprepared = None
+
+    @pyqtSlot()  # QCoreApplication::aboutToQuit()
+    def shutdown(self) -> None:
+        self.cancel_all()
+        self._pool.waitForDone()
+
+    def _start(self, work: Callable[[Callable[[], bool]], object]) -> _Task:
+        task = _Task(work)
+        # noinspection PyUnresolvedReferences
+        task.signals.done.connect(self._task_done)
+        self._pool_tasks.add(task)
+        self._pool.start(task)
+        return task
+
+    def _cancel_request(self) -> None:
+        if self._request is not None:
+            self._request.cancel()
+            self._request = None
+
+    def _pause_preparing(self) -> None:
+        if self._preparing is not None:
+            # signatures made so far are kept in the index
+            self._preparing.cancel()
+            self._preparing = None
+
+    def _resume_preparing(self) -> None:
+        if (names := self._unprepared) is not None:
+            self._preparing = self._start(
+                lambda cancelled: names.prepare(cancelled=cancelled)
+            )
+
+    @pyqtSlot(object)  # _TaskSignals::done()
+    def _task_done(self, task: _Task) -> None:
+        self._pool_tasks.discard(task)
+        if task is self._preparing:
+            self._preparing = None
+            if task.result:
+                self._unprepared = None
+            return
+
+        if task is not self._request:
+            return
+
+        self._request = None
+        self._resume_preparing()
+        if not task.cancelled:
+            # noinspection PyUnresolvedReferences
+            self.arranged.emit(task.result)
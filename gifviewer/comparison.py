@@ -0,0 +1,210 @@
+"""Plays several gifs side by side, frame for frame."""
+
+from PyQt5.QtCore import (
+    QCoreApplication,
+    QObject,
+    QRunnable,
+    QThread,
+    QThreadPool,
+    QTimer,
+    pyqtSignal,
+    pyqtSlot,
+)
+from PyQt5.QtGui import QImage
+
+from gifviewer.framesource import FrameSource
+from gifviewer.player import DEFAULT_SPEED, effective_delay
+
+MIN_PANES = 2
+MAX_PANES = 9
+
+
+class _FrameSignals(QObject):
+    done = pyqtSignal(object)
+
+
+class FrameTask(QRunnable):
+    """Decodes one frame of one source on a pool thread."""
+
+    def __init__(self, pane: int, source: FrameSource, number: int) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.pane = pane
+        self.number = number
+        self.image = QImage()
+        self.signals = _FrameSignals()
+        self._source = source
+
+    def run(self) -> None:
+        # a source with fewer frames holds its last one
+        source = self._source
+        self.image = source.frame(min(self.number, max(source.frame_count - 1, 0)))
+        # noinspection PyUnresolvedReferences
+        self.signals.done.emit(self)
+
+
+class ComparisonPlayer(QObject):
+    """Plays sources in step, showing the same frame number in each.
+
+    One timer drives every pane. While a step is shown the frames of the
+    next are decoded on a pool, a thread per pane up to the number of
+    cores, and a step is only shown once all of its frames are ready, so
+    a slow pane holds the others back instead of drifting out of step.
+    A step lasts as long as the longest delay among its frames, delays
+    clamped as the GifPlayer clamps them.
+    """
+
+    # frame number, then a QImage per source
+    frames_shown = pyqtSignal(int, list)
+
+    def __init__(self, sources: list[FrameSource], parent: QObject | None = None):
+        super().__init__(parent)
+        self._sources = sources
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(
+            max(1, min(len(sources), QThread.idealThreadCount()))
+        )
+        self._speed = DEFAULT_SPEED
+        self._playing = False
+        self._number = -1
+        # the step being decoded, its frames so far and whether it is due
+        self._wanted: int | None = None
+        self._images: list[QImage | None] = []
+        self._missing = 0
+        self._due = False
+        self._queued: list[FrameTask] = []
+        # every task the pool may still run, so none is garbage collected
+        self._pool_tasks: set[FrameTask] = set()
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        # noinspection PyUnresolvedReferences
+        self._timer.timeout.connect(self._timeout)
+
+        if (app := QCoreApplication.instance()) is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    @property
+    def frame_count(self) -> int:
+        """Frames in the longest source.
+
+        Opens every source, which the pool has done by the time the first
+        frames are shown.
+        """
+        return max(source.frame_count for source in self._sources)
+
+    @property
+    def number(self) -> int:
+        """The frame number shown, -1 before the first."""
+        return self._number
+
+    @property
+    def playing(self) -> bool:
+        return self._playing
+
+    def play(self) -> None:
+        if self._playing:
+            return
+
+        self._playing = True
+        if self._wanted is None:
+            self._request(self._next_number(), due=False)
+            self._schedule()
+        else:
+            # a jump still being decoded carries on playing once shown
+            self._due = True
+
+    def pause(self) -> None:
+        self._playing = False
+        self._timer.stop()
+        if self._wanted is not None and not self._due:
+            # the next step was only being decoded ahead
+            self._cancel_request()
+
+    def jump_to(self, number: int) -> None:
+        """Show frame number in every pane as soon as it is decoded."""
+
+        self._timer.stop()
+        self._request(number, due=True)
+
+    def set_speed(self, percent_speed: int) -> None:
+        self._speed = percent_speed
+        if self._playing and self._wanted is not None and not self._due:
+            self._schedule()
+
+    @pyqtSlot()  # QCoreApplication::aboutToQuit()
+    def shutdown(self) -> None:
+        """Stop playing and wait for the frames being decoded."""
+
+        self.pause()
+        self._cancel_request()
+        self._pool.waitForDone()
+
+    def _next_number(self) -> int:
+        if self._number < 0 or self._number + 1 >= self.frame_count:
+            return 0
+        return self._number + 1
+
+    def _request(self, number: int, *, due: bool) -> None:
+        self._cancel_request()
+        self._wanted = number
+        self._images = [None] * len(self._sources)
+        self._missing = len(self._sources)
+        self._due = due
+        for pane, source in enumerate(self._sources):
+            task = FrameTask(pane, source, number)
+            # noinspection PyUnresolvedReferences
+            task.signals.done.connect(self._frame_done)
+            self._queued.append(task)
+            self._pool_tasks.add(task)
+            self._pool.start(task)
+
+    def _cancel_request(self) -> None:
+        self._wanted = None
+        for task in self._queued:
+            if self._pool.tryTake(task):
+                self._pool_tasks.discard(task)
+        self._queued.clear()
+
+    def _schedule(self) -> None:
+        # as with QMovie, a speed of zero holds the current frame
+        if not self._speed or self._number < 0:
+            self._timer.stop()
+            self._due = self._number < 0
+            return
+
+        delay = max(
+            effective_delay(source.delay(min(self._number, source.frame_count - 1)))
+            for source in self._sources
+        )
+        self._timer.start(delay * 100 // self._speed)
+
+    @pyqtSlot()  # QTimer::timeout()
+    def _timeout(self) -> None:
+        self._due = True
+        if self._wanted is not None and not self._missing:
+            self._show()
+
+    @pyqtSlot(object)  # _FrameSignals::done()
+    def _frame_done(self, task: FrameTask) -> None:
+        self._pool_tasks.discard(task)
+        if task.number != self._wanted or self._images[task.pane] is not None:
+            # from a step no longer wanted
+            return
+
+        self._images[task.pane] = task.image
+        self._missing -= 1
+        if not self._missing and self._due:
+            self._show()
+
+    def _show(self) -> None:
+        self._number = self._wanted
+        images = self._images
+        self._wanted = None
+        self._queued.clear()
+        # noinspection PyUnresolvedReferences
+        self.frames_shown.emit(self._number, images)
+
+        if self._playing:
+            self._request(self._next_number(), due=False)
+            self._schedule()
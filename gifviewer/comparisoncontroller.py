@@ -0,0 +1,69 @@
+"""comparisonview.py controller."""
+
+from pathlib import Path
+
+from PyQt5.QtCore import QObject, pyqtSlot
+
+from gifviewer.comparison import ComparisonPlayer
+from gifviewer.framecache import FrameCache
+from gifviewer.gui.comparisonview import ComparisonView
+
+
+class ComparisonController(QObject):
+    """Plays files side by side in a ComparisonView of its own.
+
+    The gifs are decoded to fit their panes, by sources of their own
+    rather than the cache's, which are decoded to fit the main window.
+    Deletes itself when the window is closed.
+    """
+
+    def __init__(
+        self,
+        paths: list[Path],
+        cache: FrameCache,
+        speed: int,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._view = ComparisonView([path.name for path in paths])
+        self._view.show()
+        self._view.layout().activate()
+
+        fit = self._view.pane_size()
+        sources = [cache.new_source(path, fit=fit) for path in paths]
+        self._player = ComparisonPlayer(sources, self)
+        self._player.set_speed(speed)
+
+        # noinspection PyUnresolvedReferences
+        self._player.frames_shown.connect(self._frames_shown)
+        self._view.play_button.toggled.connect(self._play_toggled)
+        self._view.frame_slider.valueChanged.connect(self._frame_selected)
+        # noinspection PyUnresolvedReferences
+        self._view.closed.connect(self._view_closed)
+
+        self._player.play()
+
+    @pyqtSlot(int, list)  # ComparisonPlayer::frames_shown()
+    def _frames_shown(self, number: int, images: list) -> None:
+        self._view.show_frames(images)
+        self._view.update_frame(number, self._player.frame_count)
+
+    @pyqtSlot(bool)  # QPushButton::toggled()
+    def _play_toggled(self, checked: bool) -> None:
+        if checked:
+            self._player.play()
+        else:
+            self._player.pause()
+        self._view.update_playing(checked)
+
+    @pyqtSlot(int)  # QSlider::valueChanged()
+    def _frame_selected(self, number: int) -> None:
+        # stepping through frames stops playback, as single step does
+        self._player.pause()
+        self._view.update_playing(False)
+        self._player.jump_to(number)
+
+    @pyqtSlot()  # ComparisonView::closed()
+    def _view_closed(self) -> None:
+        self._player.shutdown()
+        self.deleteLater()
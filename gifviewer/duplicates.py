@@ -0,0 +1,301 @@
+"""Finding identical and similar gifs.
+
+Identical files are found by a digest of their contents, taken only of
+files that share their size with another, since no other file can match
+them. Similar files are found by a perceptual signature: a difference
+hash of each of a few frames sampled evenly through the animation, so
+re-encoded, resized or retimed copies still come out close. Signatures
+within a few bits of each other are found by locality sensitive hashing,
+bucketing them by bands of their bytes, instead of comparing every pair.
+
+Hashing runs in a pool of processes. The hashes are kept in the file
+index by the caller, so only new and changed files are ever hashed again.
+"""
+
+import hashlib
+import mmap
+import multiprocessing
+import os
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import NamedTuple
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from gifviewer import gifinfo
+from gifviewer.fileindex import FileHashes
+from gifviewer.framestream import FrameStream
+
+SAMPLED_FRAMES = 4
+HASH_SIZE = 8  # each frame hash compares 8 by 8 neighbouring pixels
+SIGNATURE_BYTES = SAMPLED_FRAMES * HASH_SIZE * HASH_SIZE // 8
+SIMILAR_DISTANCE = 24  # signature bits that may differ between similar files
+BANDS = SIGNATURE_BYTES // 2
+FILES_PER_JOB = 8
+JOBS_PER_PROCESS = 2  # jobs queued per process, to keep them all busy
+
+
+class DuplicateGroup(NamedTuple):
+    paths: list[Path]
+    # True if every file has the same contents, False if they look alike
+    identical: bool
+
+
+def content_digest(path: Path) -> bytes:
+    data = gifinfo.map_file(path)
+    try:
+        return hashlib.blake2b(data, digest_size=16).digest()
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+
+def frame_hash(image: QImage) -> int:
+    """Return a 64 bit difference hash of image.
+
+    Each bit tells whether a pixel of the image shrunk to 9 by 8 grey
+    pixels is brighter than its right neighbour.
+    """
+
+    small = image.scaled(
+        HASH_SIZE + 1,
+        HASH_SIZE,
+        Qt.AspectRatioMode.IgnoreAspectRatio,
+        Qt.TransformationMode.SmoothTransformation,
+    ).convertToFormat(QImage.Format.Format_Grayscale8)
+    line = small.bytesPerLine()
+    pixels = small.constBits().asstring(small.sizeInBytes())
+    value = 0
+    for y in range(HASH_SIZE):
+        row = pixels[y * line : y * line + HASH_SIZE + 1]
+        for x in range(HASH_SIZE):
+            value = value << 1 | (row[x] > row[x + 1])
+    return value
+
+
+def signature(path: Path) -> bytes:
+    """Return the frame hashes of frames sampled evenly through path, joined.
+
+    Empty if path cannot be decoded.
+    """
+
+    try:
+        stream = FrameStream(path, window=1)
+    except (OSError, gifinfo.GifFormatError):
+        return b""
+
+    try:
+        if not (count := stream.frame_count):
+            return b""
+        value = 0
+        for sample in range(SAMPLED_FRAMES):
+            image = stream.frame(sample * count // SAMPLED_FRAMES)
+            value = value << HASH_SIZE * HASH_SIZE | frame_hash(image)
+        return value.to_bytes(SIGNATURE_BYTES, "big")
+    finally:
+        stream.close()
+
+
+def hash_files(
+    jobs: list[tuple[Path, bool, bool]],
+) -> list[tuple[bytes | None, bytes | None]]:
+    """Return the digest and signature of each path asked for them, in turn.
+
+    Runs in a pool process. A file that cannot be read has no digest.
+    """
+
+    hashes = []
+    for path, digest, signature_ in jobs:
+        try:
+            file_digest = content_digest(path) if digest else None
+        except OSError:
+            file_digest = None
+        hashes.append((file_digest, signature(path) if signature_ else None))
+    return hashes
+
+
+class SignatureIndex:
+    """Signatures bucketed by bands of their bytes, to find those alike.
+
+    Each band is two bytes from different frames, and a signature is only
+    compared with those sharing the bytes of one of its bands. Signatures
+    SIMILAR_DISTANCE bits apart still share a band about 97 times in 100
+    and closer ones all but always, while unrelated ones hardly ever do, so
+    a search compares a handful of signatures rather than all of them.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: list[dict[bytes, list]] = [{} for _ in range(BANDS)]
+        self._keys: dict = {}
+
+    def add(self, signature_: bytes, item) -> None:
+        self._keys[item] = int.from_bytes(signature_, "big")
+        for buckets, band in zip(self._buckets, _bands(signature_)):
+            buckets.setdefault(band, []).append(item)
+
+    def search(self, signature_: bytes, distance: int) -> Iterator:
+        """Yield the items found within distance bits of signature_."""
+
+        key = int.from_bytes(signature_, "big")
+        seen = set()
+        for buckets, band in zip(self._buckets, _bands(signature_)):
+            for item in buckets.get(band, ()):
+                if item not in seen:
+                    seen.add(item)
+                    if (key ^ self._keys[item]).bit_count() <= distance:
+                        yield item
+
+
+def _bands(signature_: bytes) -> Iterator[bytes]:
+    half = len(signature_) // 2
+    for number in range(BANDS):
+        yield bytes((signature_[number], signature_[half + number]))
+
+
+def find_duplicates(
+    files: list[FileHashes],
+    *,
+    store: Callable[[list[FileHashes]], None] = lambda _: None,
+    progress: Callable[[int, int], None] = lambda done, total: None,
+    jobs: int | None = None,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> list[DuplicateGroup] | None:
+    """Group files that are identical or look alike.
+
+    Files are hashed if they lack the hashes needed, and each batch hashed
+    is passed to store. progress is told how many files of those to hash
+    are done. Returns None if cancelled.
+    """
+
+    by_size: dict[int, list[FileHashes]] = defaultdict(list)
+    for file in files:
+        by_size[file.size].append(file)
+    sizes_shared = {size for size, sized in by_size.items() if len(sized) > 1}
+
+    wanted = [
+        (
+            file,
+            file.size in sizes_shared and file.digest is None,
+            file.signature is None,
+        )
+        for file in files
+    ]
+    wanted = [job for job in wanted if job[1] or job[2]]
+    if wanted and not _hash(wanted, store, progress, jobs, cancelled):
+        return None
+
+    # files with the same contents are compared for looks as one
+    copies: list[list[FileHashes]] = []
+    by_digest: dict[tuple[int, bytes], list[FileHashes]] = {}
+    for file in files:
+        if file.size not in sizes_shared or not file.digest:
+            copies.append([file])
+        elif (key := (file.size, file.digest)) in by_digest:
+            by_digest[key].append(file)
+        else:
+            by_digest[key] = [file]
+            copies.append(by_digest[key])
+
+    similar = _similar_groups(copies, cancelled)
+    if similar is None:
+        return None
+
+    groups = []
+    for group in similar:
+        paths = sorted(file.path for number in group for file in copies[number])
+        if len(paths) > 1:
+            groups.append(DuplicateGroup(paths, len(group) == 1))
+    groups.sort(key=lambda group: (-len(group.paths), group.paths[0]))
+    return groups
+
+
+def _hash(
+    wanted: list[tuple[FileHashes, bool, bool]],
+    store: Callable[[list[FileHashes]], None],
+    progress: Callable[[int, int], None],
+    jobs: int | None,
+    cancelled: Callable[[], bool],
+) -> bool:
+    """Hash files on a pool of processes, returning False if cancelled."""
+
+    jobs = jobs or os.cpu_count() or 1
+    done = 0
+    progress(done, len(wanted))
+    # spawned rather than forked, since the GUI hashes with threads running
+    with ProcessPoolExecutor(
+        jobs, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        pending = {}
+
+        def collect() -> bool:
+            nonlocal done
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done += _store(pending.pop(future), future.result(), store)
+            progress(done, len(wanted))
+            if cancelled():
+                pool.shutdown(cancel_futures=True)
+                return False
+            return True
+
+        for start in range(0, len(wanted), FILES_PER_JOB):
+            batch = wanted[start : start + FILES_PER_JOB]
+            pending[
+                pool.submit(
+                    hash_files, [(file.path, *needed) for file, *needed in batch]
+                )
+            ] = batch
+            if len(pending) >= jobs * JOBS_PER_PROCESS and not collect():
+                return False
+
+        while pending:
+            if not collect():
+                return False
+    return True
+
+
+def _store(
+    batch: list[tuple[FileHashes, bool, bool]],
+    hashes: list[tuple[bytes | None, bytes | None]],
+    store: Callable[[list[FileHashes]], None],
+) -> int:
+    for (file, digest, signature_), (file_digest, file_signature) in zip(batch, hashes):
+        if digest:
+            file.digest = file_digest
+        if signature_:
+            file.signature = file_signature
+    store([file for file, _, _ in batch])
+    return len(batch)
+
+
+def _similar_groups(
+    copies: list[list[FileHashes]], cancelled: Callable[[], bool]
+) -> list[list[int]] | None:
+    """Return the numbers of copies grouped by how alike they look."""
+
+    parents = list(range(len(copies)))
+
+    def find(number: int) -> int:
+        while parents[number] != number:
+            parents[number] = parents[parents[number]]
+            number = parents[number]
+        return number
+
+    index = SignatureIndex()
+    for number, files in enumerate(copies):
+        if number % 1000 == 0 and cancelled():
+            return None
+        # a flat animation hashes to zero and looks like every other one
+        if not any(signature_ := files[0].signature or b""):
+            continue
+        for other in index.search(signature_, SIMILAR_DISTANCE):
+            parents[find(other)] = find(number)
+        index.add(signature_, number)
+
+    groups: dict[int, list[int]] = defaultdict(list)
+    for number in range(len(copies)):
+        groups[find(number)].append(number)
+    return list(groups.values())
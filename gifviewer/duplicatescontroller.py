@@ -0,0 +1,79 @@
+"""duplicatesview.py controller."""
+
+from pathlib import Path
+
+from PyQt5.QtCore import QCoreApplication, QObject, pyqtSignal, pyqtSlot
+
+from gifviewer.framecache import FrameCache
+from gifviewer.gui.duplicatesview import DuplicatesView
+from gifviewer.pathstore import PathStore
+from gifviewer.workers import DuplicatesThread
+
+
+class DuplicatesController(QObject):
+    """Finds duplicates among files and lists them in a DuplicatesView.
+
+    Deletes itself once the window is closed and the search has stopped.
+    """
+
+    # a file was picked from the list, to be shown in the main window
+    file_chosen = pyqtSignal(object)
+
+    def __init__(
+        self,
+        roots: list[Path],
+        files: PathStore,
+        cache: FrameCache,
+        speed: int,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._cache = cache
+        self._speed = speed
+        self._closed = False
+        self._view = DuplicatesView()
+        self._view.show()
+
+        # noinspection PyUnresolvedReferences
+        self._view.file_activated.connect(self.file_chosen)
+        # noinspection PyUnresolvedReferences
+        self._view.compare_requested.connect(self._compare)
+        # noinspection PyUnresolvedReferences
+        self._view.closed.connect(self._view_closed)
+
+        self._thread = DuplicatesThread(roots, files, self)
+        # noinspection PyUnresolvedReferences
+        self._thread.progress.connect(self._view.update_progress)
+        # noinspection PyUnresolvedReferences
+        self._thread.groups_found.connect(self._view.show_groups)
+        # noinspection PyUnresolvedReferences
+        self._thread.finished.connect(self._thread_finished)
+        if (app := QCoreApplication.instance()) is not None:
+            app.aboutToQuit.connect(self.shutdown)
+        self._thread.start()
+
+    @pyqtSlot()  # QCoreApplication::aboutToQuit()
+    def shutdown(self) -> None:
+        """Stop the search and wait for the files being hashed."""
+
+        self._thread.cancel()
+        self._thread.wait()
+
+    @pyqtSlot(list)  # DuplicatesView::compare_requested()
+    def _compare(self, paths: list[Path]) -> None:
+        from gifviewer.comparisoncontroller import ComparisonController
+
+        ComparisonController(paths, self._cache, self._speed, self.parent())
+
+    @pyqtSlot()  # DuplicatesView::closed()
+    def _view_closed(self) -> None:
+        self._closed = True
+        if self._thread.isFinished():
+            self.deleteLater()
+        else:
+            self._thread.cancel()
+
+    @pyqtSlot()  # QThread::finished()
+    def _thread_finished(self) -> None:
+        if self._closed:
+            self.deleteLater()
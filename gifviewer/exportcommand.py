@@ -0,0 +1,81 @@
+"""Headless frame export, run as ``cli.py export GIF_OR_FOLDER...``.
+
+Gifs given directly are exported as they are; folders are searched for
+gifs the way the viewer scans them. Uses Qt's image classes but starts
+no application, so no display is needed.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from gifviewer import archives, scanner
+
+
+def main(args: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog=f"{Path(sys.argv[0]).name} export",
+        description="Write frames of gifs to PNG files or sprite sheets.",
+    )
+    parser.add_argument(
+        "paths",
+        type=Path,
+        nargs="+",
+        metavar="GIF_OR_FOLDER",
+        help="gifs, or folders to find gifs in",
+    )
+    parser.add_argument(
+        "--output", type=Path, required=True, help="folder to write the frames to"
+    )
+    parser.add_argument(
+        "--frames",
+        metavar="RANGE",
+        help="frame numbers to export, as N, N-M, N- or -M (default: all)",
+    )
+    parser.add_argument(
+        "--every", type=int, default=1, metavar="N", help="export every Nth frame"
+    )
+    parser.add_argument(
+        "--sheet",
+        type=int,
+        nargs="?",
+        const=0,
+        metavar="COLUMNS",
+        help="write one sprite sheet per gif, COLUMNS frames wide (default: square)",
+    )
+    parser.add_argument(
+        "--jobs", type=int, help="encoding processes (default: one per cpu)"
+    )
+    scanner.add_scan_arguments(parser)
+    options = parser.parse_args(args)
+    # Qt is imported only once there is something to export
+    from gifviewer.frameexport import FrameSelection, export_frames
+
+    for path in options.paths:
+        try:
+            archives.stat(path)
+        except OSError:
+            parser.error(f"no such file or folder: {path}")
+    try:
+        selection = FrameSelection.parse(options.frames, options.every)
+    except ValueError as error:
+        parser.error(str(error))
+    if options.jobs is not None and options.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    paths = scanner.gif_paths(options.paths, scanner.ScanOptions.from_args(options))
+    errors = 0
+    for result in export_frames(
+        paths,
+        options.output,
+        selection,
+        columns=options.sheet,
+        jobs=options.jobs,
+    ):
+        if result.error is None:
+            print(f"{result.path}: {result.frames} frames")
+        else:
+            print(f"{result.path}: {result.error}", file=sys.stderr)
+            errors += 1
+
+    return 1 if errors else 0
@@ -0,0 +1,574 @@
+"""Persistent index of scanned folders.
+
+Each directory is stored with the mtime it had when it was last listed.
+Reopening a folder only lists the directories whose mtime has changed,
+everything else comes straight from the index. The index holds every gif
+file it has seen; ScanOptions only decide what is walked and returned.
+Archives are stored as directories with the mtime of the archive file, so
+an archive is only opened again once it has changed.
+"""
+
+import dataclasses
+import os
+import sqlite3
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from pathlib import Path
+from stat import S_ISLNK
+
+from gifviewer import archives, gifinfo, scanner, settings
+from gifviewer.scanner import Directory, Listing, ScanOptions
+
+INDEX_FILE_NAME = "index.sqlite3"
+COMMIT_INTERVAL = 200
+BUSY_TIMEOUT = 30  # seconds to wait for another connection's lock
+
+# frame count stored for files that could not be parsed, so they are not retried
+UNREADABLE = 0
+# directory mtime stored for directories found but not listed yet
+UNLISTED = -1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    path TEXT PRIMARY KEY,
+    scanned REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS directories_parent ON directories (parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    frames INTEGER,
+    width INTEGER,
+    height INTEGER,
+    loops INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_directory ON files (directory);
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest BLOB,
+    signature BLOB
+);
+"""
+
+
+@dataclasses.dataclass(slots=True)
+class GifMetadata:
+    path: Path
+    size: int
+    mtime_ns: int
+    frame_count: int | None
+    width: int | None
+    height: int | None
+    loop_count: int | None
+
+
+@dataclasses.dataclass(slots=True)
+class FileHashes:
+    """Hashes of a file's contents, None until they are computed."""
+
+    path: Path
+    size: int
+    mtime_ns: int
+    digest: bytes | None = None
+    # empty for a file that could not be decoded
+    signature: bytes | None = None
+
+
+@dataclasses.dataclass(slots=True)
+class DirectoryChange:
+    """What refreshing directories found to have changed."""
+
+    added: list[Path] = dataclasses.field(default_factory=list)
+    removed: list[Path] = dataclasses.field(default_factory=list)
+    directories_added: list[str] = dataclasses.field(default_factory=list)
+    directories_removed: list[str] = dataclasses.field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.added
+            or self.removed
+            or self.directories_added
+            or self.directories_removed
+        )
+
+    def update(self, other: "DirectoryChange") -> None:
+        self.added += other.added
+        self.removed += other.removed
+        self.directories_added += other.directories_added
+        self.directories_removed += other.directories_removed
+
+
+class FileIndex:
+    """SQLite backed index of gif files, stored in the user cache folder.
+
+    A connection may only be used by the thread that created it.
+    """
+
+    def __init__(self, db_path: Path | None = None) -> None:
+        self._db_path = db_path or settings.cache_dir() / INDEX_FILE_NAME
+        self._connection = sqlite3.connect(self._db_path, timeout=BUSY_TIMEOUT)
+        try:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SCHEMA)
+            # a database left locked fails here rather than partway through
+            # a scan, so the scan can go without the index
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._connection.commit()
+        except sqlite3.Error:
+            self._connection.close()
+            raise
+
+    def __enter__(self) -> "FileIndex":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.commit()
+        self._connection.close()
+
+    def iter_files(
+        self,
+        roots: Sequence[Path],
+        options: ScanOptions = ScanOptions(),
+        *,
+        cancelled: Callable[[], bool] = lambda: False,
+    ) -> Iterator[tuple[Path, Path]]:
+        """Yield each wanted gif file below roots with the root it is below.
+
+        Only changed directories are listed again. The roots are walked
+        together, checking and listing directories in parallel.
+        """
+
+        roots_ = [str(root.absolute()) for root in roots]
+        scanned = time.time()
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO folders VALUES (?, ?)",
+            ((root, scanned) for root in roots_),
+        )
+
+        try:
+            starts = [Directory(root, root, "") for root in roots_]
+            for directory, files in self._walk(starts, options, cancelled):
+                root = Path(directory.root)
+                for file in files:
+                    yield root, Path(file)
+        finally:
+            self._connection.commit()
+
+    def directories(
+        self, root: Path, options: ScanOptions = ScanOptions()
+    ) -> list[str]:
+        """Return root and the listed directories below it that are wanted.
+
+        Directories never listed are left out; after a complete walk those
+        are the ones it skipped, such as symlinks back into the tree.
+        """
+
+        root_ = str(root.absolute())
+        low, high = _subtree_bounds(root_)
+        directories = [
+            row[0]
+            for row in self._connection.execute(
+                "SELECT path FROM directories"
+                " WHERE (path = ? OR (path > ? AND path < ?)) AND mtime_ns != ?",
+                (root_, low, high, UNLISTED),
+            )
+        ]
+        if not options.follow_symlinks:
+            directories = _without_symlinked(directories, root_)
+        if not options.filtering:
+            return directories
+        return [
+            directory
+            for directory in directories
+            if options.wants_path(_relative(directory, root_), directory=True)
+        ]
+
+    def refresh_directory(
+        self, directory: Path, root: Path, options: ScanOptions = ScanOptions()
+    ) -> DirectoryChange:
+        """Relist directory, below root, if it has changed, and walk any new
+        directories in it.
+
+        Returns the wanted files and directories that appeared or disappeared.
+        """
+
+        directory_ = str(directory.absolute())
+        root_ = str(root.absolute())
+        walked = Directory(directory_, root_, _relative(directory_, root_))
+        change = DirectoryChange()
+        try:
+            mtime_ns = os.stat(directory_).st_mtime_ns
+        except OSError:
+            self._forget_subtree(directory_, change)
+            self._connection.commit()
+            return change
+
+        if self._directory_mtime(directory_) == mtime_ns:
+            return change
+
+        indexed_files, indexed_subdirectories = self._indexed_entries(directory_)
+        # relisting forgets vanished subdirectories, note what they held first
+        for subdirectory in indexed_subdirectories:
+            if not scanner.is_folder(subdirectory):
+                self._forget_subtree(subdirectory, change)
+
+        files, subdirectories = self._store_listing(
+            directory_,
+            mtime_ns,
+            scanner.list_directory(directory_, follow_symlinks=True),
+        )
+        indexed = set(indexed_files)
+        listed = set(files)
+        change.added += [
+            Path(file)
+            for file in files
+            if file not in indexed and options.wants_file(walked.file_relative(file))
+        ]
+        change.removed += [Path(file) for file in indexed_files if file not in listed]
+
+        new = [
+            child
+            for child in map(
+                walked.child, set(subdirectories) - set(indexed_subdirectories)
+            )
+            if options.wants_directory(child.relative)
+        ]
+        for new_directory, new_files in self._walk(new, options):
+            change.directories_added.append(new_directory.path)
+            change.added += map(Path, new_files)
+
+        # an archive replaced by a new one changes its directory, not itself
+        for archive in set(subdirectories) & set(indexed_subdirectories):
+            if archives.is_archive_name(archive) and options.wants_directory(
+                walked.child(archive).relative
+            ):
+                change.update(self.refresh_directory(Path(archive), root, options))
+
+        self._connection.commit()
+        return change
+
+    def update_metadata(
+        self,
+        root: Path,
+        options: ScanOptions = ScanOptions(),
+        *,
+        cancelled: Callable[[], bool] = lambda: False,
+    ) -> int:
+        """Read the metadata of wanted files below root that have none yet.
+
+        Returns the number of files that were read.
+        """
+
+        root_ = str(root.absolute())
+        low, high = _subtree_bounds(root_)
+        paths = [
+            row[0]
+            for row in self._connection.execute(
+                "SELECT path FROM files WHERE frames IS NULL"
+                " AND (directory = ? OR (directory > ? AND directory < ?))",
+                (root_, low, high),
+            )
+        ]
+        if options.filtering:
+            paths = [
+                path for path in paths if options.wants_path(_relative(path, root_))
+            ]
+
+        count = 0
+        for count, path in enumerate(paths, 1):
+            if cancelled():
+                break
+
+            try:
+                info = gifinfo.read_gif_info(Path(path))
+                values = (info.frame_count, info.width, info.height, info.loop_count)
+            except (OSError, gifinfo.GifFormatError):
+                values = (UNREADABLE, None, None, None)
+
+            self._connection.execute(
+                "UPDATE files SET frames = ?, width = ?, height = ?, loops = ?"
+                " WHERE path = ?",
+                (*values, path),
+            )
+            if count % COMMIT_INTERVAL == 0:
+                self._connection.commit()
+
+        self._connection.commit()
+        return count
+
+    def metadata(self, path: Path) -> GifMetadata | None:
+        row = self._connection.execute(
+            "SELECT path, size, mtime_ns, frames, width, height, loops"
+            " FROM files WHERE path = ?",
+            (str(path.absolute()),),
+        ).fetchone()
+        return _to_metadata(row) if row else None
+
+    def iter_metadata(self, root: Path) -> Iterator[GifMetadata]:
+        """Yield the stored metadata of every file below root."""
+
+        root_ = str(root.absolute())
+        low, high = _subtree_bounds(root_)
+        for row in self._connection.execute(
+            "SELECT path, size, mtime_ns, frames, width, height, loops FROM files"
+            " WHERE directory = ? OR (directory > ? AND directory < ?)",
+            (root_, low, high),
+        ):
+            yield _to_metadata(row)
+
+    def iter_hashes(self, root: Path) -> Iterator[FileHashes]:
+        """Yield every file below root, with the hashes stored for it if
+        they were computed from its current contents."""
+
+        root_ = str(root.absolute())
+        low, high = _subtree_bounds(root_)
+        for path, size, mtime_ns, digest, signature in self._connection.execute(
+            "SELECT files.path, files.size, files.mtime_ns, digest, signature"
+            " FROM files LEFT JOIN hashes ON hashes.path = files.path"
+            " AND hashes.size = files.size AND hashes.mtime_ns = files.mtime_ns"
+            " WHERE directory = ? OR (directory > ? AND directory < ?)",
+            (root_, low, high),
+        ):
+            yield FileHashes(Path(path), size, mtime_ns, digest, signature)
+
+    def store_hashes(self, files: Iterable[FileHashes]) -> None:
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?)",
+            (
+                (str(file.path), file.size, file.mtime_ns, file.digest, file.signature)
+                for file in files
+            ),
+        )
+        self._connection.commit()
+
+    def _walk(
+        self,
+        starts: list[Directory],
+        options: ScanOptions,
+        cancelled: Callable[[], bool] = lambda: False,
+    ) -> Iterator[tuple[Directory, list[str]]]:
+        """Yield each wanted directory from starts down with its wanted files.
+
+        Directories are checked, and listed if changed, on a pool of
+        threads; the index is only used from this one. A directory reached
+        a second time, through a symlink loop or from another root, is not
+        walked again.
+        """
+
+        known = {}
+        for start in starts:
+            known.update(self._subtree_mtimes(start.path))
+
+        def visit(
+            directory: Directory,
+        ) -> tuple[os.stat_result | None, Listing | None] | None:
+            try:
+                stat = os.lstat(directory.path)
+                if S_ISLNK(stat.st_mode):
+                    if directory.relative and not options.follow_symlinks:
+                        return None
+                    stat = os.stat(directory.path)
+            except OSError:
+                return None, None
+            if known.get(directory.path) == stat.st_mtime_ns:
+                return stat, None
+            # symlinked directories are always indexed, whether followed or not
+            return stat, scanner.list_directory(directory.path, follow_symlinks=True)
+
+        seen: set[tuple[int, int]] = set()
+        relisted = 0
+        for directory, visited, descend in scanner.walk_parallel(
+            starts, visit, cancelled=cancelled
+        ):
+            if visited is None:
+                # a symlink not to follow
+                continue
+            stat, listing = visited
+            if stat is None:
+                self._forget_directory(directory.path)
+                continue
+            if (stat.st_dev, stat.st_ino) in seen:
+                continue
+            seen.add((stat.st_dev, stat.st_ino))
+
+            if listing is None:
+                files, subdirectories = self._indexed_entries(directory.path)
+            else:
+                files, subdirectories = self._store_listing(
+                    directory.path, stat.st_mtime_ns, listing
+                )
+                relisted += 1
+                if relisted % COMMIT_INTERVAL == 0:
+                    self._connection.commit()
+
+            yield directory, [
+                file
+                for file in files
+                if options.wants_file(directory.file_relative(file))
+            ]
+            descend(
+                child
+                for child in map(directory.child, subdirectories)
+                if options.wants_directory(child.relative)
+            )
+
+    def _forget_subtree(self, directory: str, change: DirectoryChange) -> None:
+        """Forget directory and everything below it, noting it all in change."""
+
+        low, high = _subtree_bounds(directory)
+        change.removed += (
+            Path(row[0])
+            for row in self._connection.execute(
+                "SELECT path FROM files"
+                " WHERE directory = ? OR (directory > ? AND directory < ?)",
+                (directory, low, high),
+            )
+        )
+        change.directories_removed += (
+            row[0]
+            for row in self._connection.execute(
+                "SELECT path FROM directories"
+                " WHERE path = ? OR (path > ? AND path < ?)",
+                (directory, low, high),
+            )
+        )
+        self._forget_directory(directory)
+
+    def _subtree_mtimes(self, directory: str) -> dict[str, int]:
+        low, high = _subtree_bounds(directory)
+        return dict(
+            self._connection.execute(
+                "SELECT path, mtime_ns FROM directories"
+                " WHERE path = ? OR (path > ? AND path < ?)",
+                (directory, low, high),
+            )
+        )
+
+    def _directory_mtime(self, directory: str) -> int | None:
+        row = self._connection.execute(
+            "SELECT mtime_ns FROM directories WHERE path = ?", (directory,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _indexed_entries(self, directory: str) -> tuple[list[str], list[str]]:
+        files = [
+            row[0]
+            for row in self._connection.execute(
+                "SELECT path FROM files WHERE directory = ?", (directory,)
+            )
+        ]
+        return files, self._indexed_subdirectories(directory)
+
+    def _indexed_subdirectories(self, directory: str) -> list[str]:
+        return [
+            row[0]
+            for row in self._connection.execute(
+                "SELECT path FROM directories WHERE parent = ?", (directory,)
+            )
+        ]
+
+    def _store_listing(
+        self, directory: str, mtime_ns: int, listing: Listing
+    ) -> tuple[list[str], list[str]]:
+        """Replace what the index holds for directory with listing."""
+
+        indexed_subdirectories = self._indexed_subdirectories(directory)
+        known = {
+            row[0]: (row[1], row[2])
+            for row in self._connection.execute(
+                "SELECT path, size, mtime_ns FROM files WHERE directory = ?",
+                (directory,),
+            )
+        }
+
+        files = []
+        for path, size, file_mtime_ns in listing.files:
+            files.append(path)
+            if known.pop(path, None) != (size, file_mtime_ns):
+                # new or changed, the metadata is read again later
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO files (path, directory, size,"
+                    " mtime_ns) VALUES (?, ?, ?, ?)",
+                    (path, directory, size, file_mtime_ns),
+                )
+        subdirectories = listing.subdirectories
+
+        for table in ("files", "hashes"):
+            self._connection.executemany(
+                f"DELETE FROM {table} WHERE path = ?", ((path,) for path in known)
+            )
+        for subdirectory in set(indexed_subdirectories) - set(subdirectories):
+            self._forget_directory(subdirectory)
+        # placeholders keep subdirectories reachable if the walk is cancelled
+        # before they are listed, their unknown mtime gets them listed next time
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO directories VALUES (?, ?, ?)",
+            ((subdirectory, directory, UNLISTED) for subdirectory in subdirectories),
+        )
+
+        self._connection.execute(
+            "INSERT OR REPLACE INTO directories VALUES (?, ?, ?)",
+            (directory, os.path.dirname(directory), mtime_ns),
+        )
+        return files, subdirectories
+
+    def _forget_directory(self, directory: str) -> None:
+        low, high = _subtree_bounds(directory)
+        self._connection.execute(
+            "DELETE FROM files WHERE directory = ? OR (directory > ? AND directory < ?)",
+            (directory, low, high),
+        )
+        self._connection.execute(
+            "DELETE FROM hashes WHERE path > ? AND path < ?", (low, high)
+        )
+        self._connection.execute(
+            "DELETE FROM directories WHERE path = ? OR (path > ? AND path < ?)",
+            (directory, low, high),
+        )
+
+
+def _subtree_bounds(directory: str) -> tuple[str, str]:
+    """Return the exclusive string range that holds every path below directory."""
+
+    prefix = directory.rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+def _without_symlinked(directories: list[str], root: str) -> list[str]:
+    """Return directories without symlinks below root and what is below them."""
+
+    kept = []
+    linked: list[str] = []
+    for directory in sorted(directories):
+        if any(directory.startswith(link + os.sep) for link in linked):
+            continue
+        if directory != root and os.path.islink(directory):
+            linked.append(directory)
+            continue
+        kept.append(directory)
+    return kept
+
+
+def _relative(path: str, root: str) -> str:
+    """Return path below root, / separated as ScanOptions expects."""
+
+    relative = os.path.relpath(path, root)
+    return "" if relative == os.curdir else relative.replace(os.sep, "/")
+
+
+def _to_metadata(row: tuple) -> GifMetadata:
+    path, size, mtime_ns, frames, width, height, loops = row
+    return GifMetadata(Path(path), size, mtime_ns, frames, width, height, loops)
@@ -0,0 +1,103 @@
+"""Orderings of the file list by metadata, and arranging it for display."""
+
+import dataclasses
+import os
+from array import array
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING
+
+from gifviewer.nameindex import NameIndex
+from gifviewer.pathstore import PathStore
+
+if TYPE_CHECKING:
+    from gifviewer.fileindex import GifMetadata
+
+SORT_NAME = "name"
+SORT_KEYS = {
+    SORT_NAME: "Name",
+    "size": "Size",
+    "modified": "Modified",
+    "frames": "Frames",
+    "dimensions": "Dimensions",
+}
+# files without metadata sort after every file with it
+_UNKNOWN = 1 << 62
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Ordering:
+    # store indexes in sorted order, and the sorted position of each index
+    rows: array
+    ranks: array
+
+
+def _sort_values(metadata: "GifMetadata") -> dict[str, int | None]:
+    area = (
+        metadata.width * metadata.height
+        if metadata.width is not None and metadata.height is not None
+        else None
+    )
+    return {
+        "size": metadata.size,
+        "modified": metadata.mtime_ns,
+        "frames": metadata.frame_count or None,
+        "dimensions": area,
+    }
+
+
+def build_orderings(
+    paths: PathStore,
+    metadata: Iterable["GifMetadata"],
+    *,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> dict[str, Ordering] | None:
+    """Sort the indexes of paths, a store sorted by name, by each metadata key.
+
+    Files with equal values, or none at all, stay in name order. Returns
+    None if cancelled.
+    """
+
+    rows_of = paths.index_map()
+    values = {key: array("q", [_UNKNOWN]) * len(paths) for key in SORT_KEYS}
+    del values[SORT_NAME]
+    for number, entry in enumerate(metadata):
+        if number % 10_000 == 0 and cancelled():
+            return None
+        if (row := rows_of.get(os.fsencode(entry.path))) is None:
+            continue
+        for key, value in _sort_values(entry).items():
+            if value is not None:
+                values[key][row] = value
+
+    orderings = {}
+    for key, column in values.items():
+        if cancelled():
+            return None
+        # sorted() is stable and the indexes are in name order
+        rows = array("L", sorted(range(len(paths)), key=column.__getitem__))
+        ranks = array("L", bytes(rows.itemsize * len(rows)))
+        for rank, row in enumerate(rows):
+            ranks[row] = rank
+        orderings[key] = Ordering(rows, ranks)
+    return orderings
+
+
+def arrange(
+    names: NameIndex,
+    query: str,
+    ordering: Ordering | None,
+    *,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> array | None:
+    """Return the store indexes to show, in display order.
+
+    An empty array shows nothing; None, everything in name order.
+    Cancelling also returns None, so check cancelled() before using it.
+    """
+
+    found = names.search(query, cancelled=cancelled) if query else None
+    if ordering is None:
+        return found
+    if found is None:
+        return ordering.rows
+    return array("L", sorted(found, key=ordering.ranks.__getitem__))
@@ -0,0 +1,112 @@
+"""Frame thumbnails of one gif, for the single step filmstrip.
+
+Only the frames a view asks for are rendered, by a thread decoding the
+gif on its own at thumbnail size, so the player's frames are left alone.
+Until a frame has been rendered, the nearest rendered frame before it
+stands in, so a strip scrolled somewhere new fills in at once and is
+refined as its thumbnails arrive.
+"""
+
+import bisect
+from collections import OrderedDict
+from pathlib import Path
+
+from PyQt5.QtCore import QObject, QSize, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QImage, QPixmap
+
+from gifviewer.workers import FrameThumbnailThread
+
+FILMSTRIP_SIZE = 64
+MEMORY_CACHE_SIZE = 512  # thumbnails
+
+
+class FrameThumbnails(QObject):
+    """Hands out the frame thumbnails of a gif, rendering them on request."""
+
+    thumbnail_ready = pyqtSignal(int)
+
+    def __init__(self, size: int = FILMSTRIP_SIZE, parent=None) -> None:
+        super().__init__(parent)
+        self._size = size
+        self._thread: FrameThumbnailThread | None = None
+        self._pixmaps: OrderedDict[int, QPixmap] = OrderedDict()
+        # the frames in _pixmaps, in order, to find stand-ins
+        self._rendered: list[int] = []
+
+        self._placeholder = QPixmap(self.size)
+        self._placeholder.fill(Qt.GlobalColor.transparent)
+
+    @property
+    def path(self) -> Path | None:
+        return None if self._thread is None else self._thread.path
+
+    @property
+    def size(self) -> QSize:
+        return QSize(self._size, self._size)
+
+    def set_path(self, path: Path | None) -> None:
+        """Hand out the frames of path from now on, or none."""
+
+        if path == self.path:
+            return
+
+        self._stop()
+        self._pixmaps.clear()
+        self._rendered.clear()
+        if path is None:
+            return
+
+        self._thread = FrameThumbnailThread(path, self._size, self)
+        # noinspection PyUnresolvedReferences
+        self._thread.thumbnail_rendered.connect(self._thumbnail_rendered)
+        # noinspection PyUnresolvedReferences
+        self._thread.finished.connect(self._thread.deleteLater)
+        self._thread.start()
+
+    def thumbnail(self, number: int) -> QPixmap:
+        """Return the thumbnail of frame number, or a stand-in while it is
+        rendered; thumbnail_ready is emitted once it is."""
+
+        if (pixmap := self._pixmaps.get(number)) is not None:
+            self._pixmaps.move_to_end(number)
+            return pixmap
+
+        if self._thread is not None:
+            # asked again, so still wanted: it moves to the front of the queue
+            self._thread.request(number)
+        if not self._rendered:
+            return self._placeholder
+        nearest = bisect.bisect(self._rendered, number)
+        return self._pixmaps[self._rendered[max(nearest - 1, 0)]]
+
+    @pyqtSlot()  # QCoreApplication::aboutToQuit()
+    def shutdown(self) -> None:
+        """Stop rendering, waiting for threads still winding down."""
+
+        self._stop()
+        for thread in self.findChildren(FrameThumbnailThread):
+            thread.cancel()
+            thread.wait()
+
+    def _stop(self) -> None:
+        if self._thread is not None:
+            self._thread.cancel()
+            self._thread = None
+
+    @pyqtSlot(int, QImage)  # FrameThumbnailThread::thumbnail_rendered()
+    def _thumbnail_rendered(self, number: int, image: QImage) -> None:
+        if self.sender() is not self._thread:
+            return
+
+        if number not in self._pixmaps:
+            bisect.insort(self._rendered, number)
+        self._pixmaps[number] = (
+            self._placeholder if image.isNull() else QPixmap.fromImage(image)
+        )
+        self._pixmaps.move_to_end(number)
+        while len(self._pixmaps) > MEMORY_CACHE_SIZE:
+            oldest, _ = self._pixmaps.popitem(last=False)
+            del self._rendered[bisect.bisect_left(self._rendered, oldest)]
+
+        # noinspection PyUnresolvedReferences
+        self.thumbnail_ready.emit(number)
@@ -0,0 +1,155 @@
+"""Cache of decoded gifs."""
+
+import dataclasses
+from collections import OrderedDict
+from pathlib import Path
+
+from PyQt5.QtCore import QSize
+
+from gifviewer import archives
+from gifviewer.framesource import FrameSource
+from gifviewer.settings import DEFAULT_CACHE_MB, QT_DECODER
+
+# gifs that would take more than this share of the budget are streamed
+STREAM_SHARE = 4
+
+
+@dataclasses.dataclass(slots=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    used_bytes: int
+    budget_bytes: int
+
+    def __str__(self) -> str:
+        return (
+            f"Cache: {self.entries} files, "
+            f"{self.used_bytes / 2**20:.1f} of {self.budget_bytes / 2**20:.0f} MB, "
+            f"{self.hits} hits, {self.misses} misses, {self.evictions} evictions"
+        )
+
+
+class FrameCache:
+    """Least recently used cache of frame sources.
+
+    Sources are keyed by path, mtime and size, so a file that changes on
+    disk is decoded again. The budget applies to the decoded frame bytes;
+    the source last returned by get() is never evicted, as it is on screen.
+    Gifs too large to fit comfortably are streamed rather than decoded whole,
+    so even the source on screen stays within a fixed share of the budget.
+
+    Frames are decoded to fit the size given to set_fit(), so a gif much
+    larger than the display costs only as much memory as the display.
+    Sources decoded for another fit are decoded again when next asked for.
+
+    The cache itself belongs to the GUI thread; the sources it holds may be
+    decoded from any thread.
+    """
+
+    def __init__(
+        self, budget_mb: int = DEFAULT_CACHE_MB, decoder: str = QT_DECODER
+    ) -> None:
+        self._budget = budget_mb * 2**20
+        self._decoder = decoder
+        self._fit = QSize()
+        self._sources: OrderedDict[tuple, FrameSource] = OrderedDict()
+        self._current_key: tuple | None = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def budget_bytes(self) -> int:
+        return self._budget
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(source.nbytes for source in self._sources.values())
+
+    @property
+    def fit(self) -> QSize:
+        return QSize(self._fit)
+
+    def set_fit(self, fit: QSize) -> None:
+        """Decode frames scaled down to fit fit, or at full size if invalid."""
+        self._fit = QSize(fit)
+
+    def get(self, path: Path) -> FrameSource:
+        """Return the source for path, creating it on a miss."""
+
+        key = self._key(path)
+        if (source := self._sources.get(key)) is not None and source.fits(self._fit):
+            self._hits += 1
+        else:
+            self._misses += 1
+            source = self._new_source(path)
+            self._sources[key] = source
+        self._sources.move_to_end(key)
+
+        self._current_key = key
+        self.trim()
+        return source
+
+    def get_for_prefetch(self, path: Path) -> FrameSource:
+        """Return the source for path without counting it as a use.
+
+        New sources are added as least recently used, so prefetching never
+        pushes out files that were actually viewed.
+        """
+
+        key = self._key(path)
+        if (source := self._sources.get(key)) is None or not source.fits(self._fit):
+            source = self._new_source(path)
+            self._sources[key] = source
+            self._sources.move_to_end(key, last=False)
+        return source
+
+    def new_source(self, path: Path, *, fit: QSize = QSize()) -> FrameSource:
+        """Return a source for path decoded to fit fit, which is not cached."""
+
+        return FrameSource(
+            path,
+            stream_above=self._budget // STREAM_SHARE,
+            decoder=self._decoder,
+            fit=fit,
+        )
+
+    def trim(self) -> None:
+        """Evict least recently used sources until within budget."""
+
+        used = self.used_bytes
+        for key in list(self._sources):
+            if used <= self._budget:
+                return
+            if key == self._current_key:
+                continue
+
+            used -= self._sources.pop(key).nbytes
+            self._evictions += 1
+
+    def clear(self) -> None:
+        self._sources.clear()
+        self._current_key = None
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            entries=len(self._sources),
+            used_bytes=self.used_bytes,
+            budget_bytes=self._budget,
+        )
+
+    def _new_source(self, path: Path) -> FrameSource:
+        return self.new_source(path, fit=self._fit)
+
+    @staticmethod
+    def _key(path: Path) -> tuple:
+        try:
+            stat = archives.stat(path)
+        except OSError:
+            return path, None, None
+        return path, stat.st_mtime_ns, stat.st_size
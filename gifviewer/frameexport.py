@@ -0,0 +1,379 @@
+"""Exporting frames of gifs to PNG files or sprite sheets, in bulk.
+
+Each gif is decoded a frame at a time by a FrameStream, so only a small
+window of its frames is held however long it is. PNG encoding, which
+costs far more than decoding, runs on a pool of processes. Only a bounded
+number of frames is in flight, so decoding never runs far ahead of the
+encoders. A sprite sheet is built a row of tiles at a time; each row is
+compressed on the pool and appended to the sheet in order.
+
+Uses Qt's image classes but no application, so it runs headless.
+"""
+
+import dataclasses
+import json
+import math
+import multiprocessing
+import os
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from PyQt5.QtCore import QPoint, Qt
+from PyQt5.QtGui import QImage, QPainter
+
+from gifviewer import gifinfo, pngwriter
+from gifviewer.framestream import FrameStream
+
+FRAMES_PER_JOB = 4  # frames queued per process, to keep them all busy
+
+
+@dataclasses.dataclass(frozen=True)
+class FrameSelection:
+    """Frame numbers first to last, inclusive, taking every step-th."""
+
+    first: int = 0
+    last: int | None = None
+    step: int = 1
+
+    @classmethod
+    def parse(cls, frames: str | None, step: int = 1) -> "FrameSelection":
+        """Read frames as N, N-M, N- or -M; None selects them all.
+
+        Raises ValueError if frames or step cannot be used.
+        """
+
+        if step < 1:
+            raise ValueError(f"step must be at least 1, not {step}")
+        if not frames:
+            return cls(step=step)
+
+        first, dash, last = frames.partition("-")
+        try:
+            selection = cls(
+                int(first) if first else 0,
+                (int(last) if last else None) if dash else int(first),
+                step,
+            )
+        except ValueError:
+            selection = None
+        if (
+            selection is None
+            or selection.first < 0
+            or (selection.last is not None and selection.last < selection.first)
+        ):
+            raise ValueError(f"not a frame range: {frames}")
+        return selection
+
+    def numbers(self, frame_count: int) -> range:
+        last = frame_count - 1 if self.last is None else min(self.last, frame_count - 1)
+        return range(self.first, last + 1, self.step)
+
+
+class ExportResult(NamedTuple):
+    path: Path
+    frames: int
+    error: str | None = None
+
+
+def output_stems(paths: Sequence[Path]) -> list[str]:
+    """Return a distinct file name stem for each path's output."""
+
+    stems = []
+    taken = set()
+    for path in paths:
+        stem = path.stem
+        number = 1
+        while stem.lower() in taken:
+            number += 1
+            stem = f"{path.stem}-{number}"
+        taken.add(stem.lower())
+        stems.append(stem)
+    return stems
+
+
+def rgba_bytes(image: QImage) -> bytes:
+    """Return the pixels of image as 8 bit RGBA rows without padding."""
+
+    image = image.convertToFormat(QImage.Format.Format_RGBA8888)
+    return image.constBits().asstring(image.sizeInBytes())
+
+
+class _Pipeline:
+    """Jobs on a process pool, retired in the order they were submitted.
+
+    Submitting waits for the oldest job once limit jobs are in flight.
+    """
+
+    def __init__(self, pool: ProcessPoolExecutor, limit: int) -> None:
+        self._pool = pool
+        self._limit = max(limit, 1)
+        self._jobs: deque[tuple[Future | None, Callable]] = deque()
+
+    def submit(self, done: Callable[[Future], None], function, *args) -> None:
+        while len(self._jobs) >= self._limit:
+            self._retire()
+        self._jobs.append((self._pool.submit(function, *args), done))
+
+    def then(self, done: Callable[[], None]) -> None:
+        """Call done once every job submitted so far is retired."""
+        self._jobs.append((None, done))
+
+    def retire_all(self) -> None:
+        while self._jobs:
+            self._retire()
+
+    def cancel(self) -> None:
+        for future, _ in self._jobs:
+            if future is not None:
+                future.cancel()
+        self._jobs.clear()
+
+    def _retire(self) -> None:
+        future, done = self._jobs.popleft()
+        if future is None:
+            done()
+        else:
+            future.exception()
+            done(future)
+
+
+class _FileExport:
+    """The export of one gif, which jobs report back to."""
+
+    def __init__(self, path: Path, results: list[ExportResult]) -> None:
+        self.path = path
+        self.written = 0
+        self.error: str | None = None
+        self._results = results
+
+    def frame_written(self, future: Future) -> None:
+        if (error := future.exception()) is not None:
+            self.error = self.error or str(error)
+        else:
+            self.written += 1
+
+    def finish(self) -> None:
+        self._results.append(ExportResult(self.path, self.written, self.error))
+
+
+class _SheetExport(_FileExport):
+    """The export of one gif to a sprite sheet, written strip by strip.
+
+    The sheet is described in a JSON file once it is complete.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        results: list[ExportResult],
+        writer: pngwriter.StripWriter,
+        description: Path,
+    ) -> None:
+        super().__init__(path, results)
+        self.tiles: list[dict] = []
+        self.layout: dict = {}
+        self._writer = writer
+        self._description = description
+
+    def strip_compressed(self, future: Future) -> None:
+        if self.error is not None:
+            return
+        try:
+            self._writer.add(future.result())
+        except Exception as error:
+            self.error = str(error)
+            self._writer.abandon()
+
+    def abandon(self) -> None:
+        if self.error is None:
+            self._writer.abandon()
+
+    def finish(self) -> None:
+        if self.error is None:
+            try:
+                self._writer.finish()
+                self._description.write_text(
+                    json.dumps({**self.layout, "frames": self.tiles}, indent=2)
+                )
+            except OSError as error:
+                self.error = str(error)
+                self._writer.abandon()
+        if self.error is not None:
+            self.written = 0
+        super().finish()
+
+
+def export_frames(
+    paths: Sequence[Path],
+    folder: Path,
+    selection: FrameSelection = FrameSelection(),
+    *,
+    columns: int | None = None,
+    jobs: int | None = None,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> Iterator[ExportResult]:
+    """Export the selected frames of each gif into folder.
+
+    Frames are written to STEM_NUMBER.png files or, given columns, to a
+    sprite sheet STEM.png with columns frames to a row, as near square as
+    can be if columns is 0, described by STEM.json. Yields a result for
+    each gif as it is finished, which is not always straight away. Stops,
+    leaving the gif being exported unfinished, as soon as cancelled()
+    returns True.
+    """
+
+    jobs = jobs or os.cpu_count() or 1
+    folder.mkdir(parents=True, exist_ok=True)
+    results: list[ExportResult] = []
+    # spawned rather than forked, since the GUI exports with threads running
+    with ProcessPoolExecutor(
+        jobs, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        pipeline = _Pipeline(pool, jobs * FRAMES_PER_JOB)
+        for path, stem in zip(paths, output_stems(paths)):
+            try:
+                stream = FrameStream(path, window=1)
+            except (OSError, gifinfo.GifFormatError) as error:
+                results.append(ExportResult(path, 0, str(error)))
+                yield from _take(results)
+                continue
+
+            try:
+                if columns is None:
+                    steps = _export_pngs(
+                        pipeline, path, stream, folder / stem, selection, results
+                    )
+                else:
+                    steps = _export_sheet(
+                        pipeline,
+                        path,
+                        stream,
+                        folder / stem,
+                        selection,
+                        columns,
+                        results,
+                    )
+                for _ in steps:
+                    if cancelled():
+                        pipeline.cancel()
+                        steps.close()
+                        return
+                    yield from _take(results)
+            except OSError as error:
+                results.append(ExportResult(path, 0, str(error)))
+            finally:
+                stream.close()
+            yield from _take(results)
+
+        pipeline.retire_all()
+        yield from _take(results)
+
+
+def _take(results: list[ExportResult]) -> list[ExportResult]:
+    taken = results[:]
+    results.clear()
+    return taken
+
+
+def _export_pngs(
+    pipeline: _Pipeline,
+    path: Path,
+    stream: FrameStream,
+    output: Path,
+    selection: FrameSelection,
+    results: list[ExportResult],
+) -> Iterator[None]:
+    """Queue a PNG file for each selected frame, yielding after each."""
+
+    export = _FileExport(path, results)
+    width, height = stream.size.width(), stream.size.height()
+    digits = max(len(str(stream.frame_count - 1)), 4)
+    for number in selection.numbers(stream.frame_count):
+        pipeline.submit(
+            export.frame_written,
+            pngwriter.write,
+            output.with_name(f"{output.name}_{number:0{digits}}.png"),
+            width,
+            height,
+            rgba_bytes(stream.frame(number)),
+        )
+        yield
+    pipeline.then(export.finish)
+
+
+def _export_sheet(
+    pipeline: _Pipeline,
+    path: Path,
+    stream: FrameStream,
+    output: Path,
+    selection: FrameSelection,
+    columns: int,
+    results: list[ExportResult],
+) -> Iterator[None]:
+    """Queue the rows of a sprite sheet of the selected frames, yielding
+    after each frame."""
+
+    if not (numbers := selection.numbers(stream.frame_count)):
+        results.append(ExportResult(path, 0))
+        return
+
+    width, height = stream.size.width(), stream.size.height()
+    if columns < 1:
+        columns = math.ceil(math.sqrt(len(numbers)))
+    columns = min(columns, len(numbers))
+    rows = math.ceil(len(numbers) / columns)
+    export = _SheetExport(
+        path,
+        results,
+        pngwriter.StripWriter(
+            output.with_name(f"{output.name}.png"), width * columns, height * rows
+        ),
+        output.with_name(f"{output.name}.json"),
+    )
+    export.layout = {
+        "image": output.with_name(f"{output.name}.png").name,
+        "frame_width": width,
+        "frame_height": height,
+        "columns": columns,
+    }
+
+    try:
+        for position, number in enumerate(numbers):
+            row, column = divmod(position, columns)
+            if not column:
+                strip = QImage(width * columns, height, QImage.Format.Format_ARGB32)
+                strip.fill(Qt.GlobalColor.transparent)
+                painter = QPainter(strip)
+                painter.setCompositionMode(
+                    QPainter.CompositionMode.CompositionMode_Source
+                )
+
+            painter.drawImage(QPoint(column * width, 0), stream.frame(number))
+            export.tiles.append(
+                {
+                    "frame": number,
+                    "x": column * width,
+                    "y": row * height,
+                    "delay_ms": stream.delay(number),
+                }
+            )
+            export.written += 1
+
+            if column == columns - 1 or position == len(numbers) - 1:
+                painter.end()
+                pipeline.submit(
+                    export.strip_compressed,
+                    pngwriter.compress_strip,
+                    rgba_bytes(strip),
+                    width * columns,
+                    row == rows - 1,
+                )
+            yield
+    except GeneratorExit:
+        # cancelled, the sheet is left unfinished
+        export.abandon()
+        raise
+    pipeline.then(export.finish)
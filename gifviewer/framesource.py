@@ -0,0 +1,260 @@
+"""Decoded gif frames."""
+
+import math
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QImage, QImageReader
+
+from gifviewer.framestream import FrameStream, fitted_size
+from gifviewer.gifinfo import GifFormatError
+from gifviewer.mappedfile import MappedFile
+from gifviewer.settings import NUMPY_DECODER, QT_DECODER
+
+
+class FrameSource:
+    """Decodes the frames of a gif on demand and keeps them.
+
+    Frames are read in order with a QImageReader, the same way QMovie
+    does, so asking for frame n decodes every frame up to n once. The file
+    is not opened until something is asked of the source, and decoding is
+    serialised by a lock so a prefetch thread and the GUI can share it.
+    The reader reads a memory map of the file, which is closed once every
+    frame is decoded.
+
+    A gif whose decoded frames would take more than stream_above bytes is
+    streamed instead: frames are composed on demand by a FrameStream, which
+    keeps only a window of them, so seeking works at a fixed memory cost.
+
+    With the numpy decoder every gif goes through a NumpyFrameStream, which
+    keeps all frames of those within stream_above.
+
+    Frames larger than fit are scaled down to fit it as they are decoded,
+    and only the scaled frames are kept, which is what stream_above is
+    measured against. size is always the size of the gif itself.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        stream_above: int | None = None,
+        decoder: str = QT_DECODER,
+        fit: QSize = QSize(),
+    ) -> None:
+        self._path = path
+        self._stream_above = stream_above
+        self._decoder = decoder
+        self._fit = QSize(fit)
+        self._lock = threading.RLock()
+        self._opened = False
+        self._file: MappedFile | None = None
+        self._reader: QImageReader | None = None
+        self._stream: FrameStream | None = None
+        self._frame_count = 0
+        self._loop_count = 0
+        self._size = QSize()
+        self._frames: list[QImage] = []
+        self._delays: list[int] = []
+        self._nbytes = 0
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def frame_count(self) -> int:
+        self._open()
+        return self._frame_count
+
+    @property
+    def loop_count(self) -> int:
+        """Times the animation repeats after the first play, -1 is forever."""
+        self._open()
+        return self._loop_count
+
+    @property
+    def size(self) -> QSize:
+        self._open()
+        return self._size
+
+    @property
+    def fit(self) -> QSize:
+        return QSize(self._fit)
+
+    def fits(self, fit: QSize) -> bool:
+        """Return whether frames decoded to fit fit would be these frames."""
+
+        if fit == self._fit:
+            return True
+        if not self._opened:
+            return False
+        return fitted_size(self._size, fit) == fitted_size(self._size, self._fit)
+
+    @property
+    def streaming(self) -> bool:
+        self._open()
+        return self._stream is not None
+
+    @property
+    def decoded_count(self) -> int:
+        if self._stream is not None:
+            return self._stream.decoded_count
+        return len(self._frames)
+
+    @property
+    def complete(self) -> bool:
+        """True when every frame is decoded, which a streamed gif may never be."""
+        return self._opened and self.decoded_count == self._frame_count
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the decoded frames."""
+
+        if self._stream is not None:
+            with self._lock:
+                return self._stream.nbytes
+        return self._nbytes
+
+    def frame(self, number: int) -> QImage:
+        """Return frame number, decoding up to it if needed."""
+
+        self._open()
+        if self._stream is not None:
+            with self._lock:
+                return self._stream.frame(number)
+
+        self._decode_to(number)
+        if not self._frames:
+            return QImage()
+        return self._frames[min(number, len(self._frames) - 1)]
+
+    def delay(self, number: int) -> int:
+        """Return the declared delay of frame number, in milliseconds."""
+
+        self._open()
+        if self._stream is not None:
+            return self._stream.delay(number)
+
+        self._decode_to(number)
+        if not self._delays:
+            return 0
+        return self._delays[min(number, len(self._delays) - 1)]
+
+    def decode_all(
+        self,
+        *,
+        cancelled: Callable[[], bool] = lambda: False,
+        max_bytes: int | None = None,
+    ) -> None:
+        """Decode every frame, stopping early if cancelled or over max_bytes.
+
+        A streamed gif only has as many frames decoded as it keeps.
+        """
+
+        if self.streaming:
+            for number in range(min(self._frame_count, self._stream.window_size)):
+                if cancelled() or (max_bytes is not None and self.nbytes >= max_bytes):
+                    return
+                self.frame(number)
+            return
+
+        for number in range(self.frame_count):
+            if cancelled() or (max_bytes is not None and self._nbytes >= max_bytes):
+                return
+            self._decode_to(number)
+
+    def _open(self) -> None:
+        if self._opened:
+            return
+
+        with self._lock:
+            if self._opened:
+                return
+
+            if self._decoder == NUMPY_DECODER:
+                from gifviewer.npdecoder import NumpyFrameStream
+
+                if self._open_stream(
+                    NumpyFrameStream,
+                    keep_all_within=(
+                        math.inf if self._stream_above is None else self._stream_above
+                    ),
+                    fit=self._fit,
+                ):
+                    self._opened = True
+                    return
+
+            try:
+                file = MappedFile(self._path)
+            except OSError:
+                # unreadable, so without frames
+                self._opened = True
+                return
+
+            reader = file.reader()
+            if not reader.canRead():
+                file.close()
+            else:
+                self._file = file
+                self._reader = reader
+                self._frame_count = max(reader.imageCount(), 0)
+                self._loop_count = reader.loopCount()
+                self._size = reader.size()
+                frame_size = self._size
+                if (scaled := fitted_size(self._size, self._fit)) is not None:
+                    # the reader scales each frame after composing it
+                    reader.setScaledSize(scaled)
+                    frame_size = scaled
+
+                decoded_size = frame_size.width() * frame_size.height() * 4
+                if (
+                    self._stream_above is not None
+                    and decoded_size * self._frame_count > self._stream_above
+                ):
+                    self._open_stream(FrameStream, fit=self._fit)
+            self._opened = True
+
+    def _open_stream(self, stream_type: type[FrameStream], **kwargs) -> bool:
+        try:
+            stream = stream_type(self._path, **kwargs)
+        except (OSError, GifFormatError):
+            # left to the reader, which copes with what it can
+            return False
+
+        self._stream = stream
+        self._close_reader()
+        self._frame_count = stream.frame_count
+        self._loop_count = stream.loop_count
+        self._size = stream.size
+        return True
+
+    def _decode_to(self, number: int) -> None:
+        if len(self._frames) > number:
+            return
+
+        self._open()
+        with self._lock:
+            while self._reader is not None and len(self._frames) <= number:
+                image = self._reader.read()
+                if image.isNull():
+                    # a damaged file ends at the last frame that could be read
+                    self._frame_count = len(self._frames)
+                    self._close_reader()
+                    return
+
+                self._delays.append(self._reader.nextImageDelay())
+                self._nbytes += image.sizeInBytes()
+                self._frames.append(image)
+
+                if len(self._frames) == self._frame_count:
+                    # everything is decoded, the file is no longer needed
+                    self._close_reader()
+
+    def _close_reader(self) -> None:
+        self._reader = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,354 @@
+"""Seekable decoding of gifs too large to keep decoded.
+
+A FrameStream works from the frame index built by gifinfo. Each frame's
+own image is decoded by handing Qt a one frame gif cut from the file, and
+the frames are composed onto the canvas here, following their disposal
+methods. Only a window of frames around the last one asked for is kept,
+together with a few canvas checkpoints to seek from, so memory use does
+not grow with the length of the gif.
+
+Frames can be kept scaled down to fit a display, which is done once as
+they enter the window; the canvas itself is always composed at full size.
+
+How a canvas is held, cleared and drawn on is left to a few methods, so a
+subclass can decode and compose frames some other way.
+"""
+
+import bisect
+import mmap
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+from PyQt5.QtCore import QRect, QSize, Qt
+from PyQt5.QtGui import QImage, QPainter
+
+from gifviewer import gifinfo
+from gifviewer.gifinfo import FrameInfo, GifInfo
+
+WINDOW_FRAMES = 16  # decoded frames kept around the current one
+CHECKPOINT_INTERVAL = 32  # frames between canvas checkpoints
+CHECKPOINTS = 8  # checkpoints kept
+
+_CANVAS_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+
+
+def fitted_size(size: QSize, fit: QSize) -> QSize | None:
+    """Return size scaled down to fit within fit, None if it already fits.
+
+    An invalid fit means full size.
+    """
+
+    if not fit.isValid() or (
+        size.width() <= fit.width() and size.height() <= fit.height()
+    ):
+        return None
+    scaled = size.scaled(fit, Qt.AspectRatioMode.KeepAspectRatio)
+    return scaled.expandedTo(QSize(1, 1))
+
+
+def scale_frame(image: QImage, size: QSize) -> QImage:
+    return image.scaled(
+        size,
+        Qt.AspectRatioMode.IgnoreAspectRatio,
+        Qt.TransformationMode.SmoothTransformation,
+    )
+
+
+class _Canvas:
+    """The canvas right after a frame has been drawn on it."""
+
+    __slots__ = ("number", "image", "previous")
+
+    def __init__(self, number: int, image, previous) -> None:
+        self.number = number
+        self.image = image
+        # the canvas before this frame, kept when its disposal restores it
+        self.previous = previous
+
+    def copy(self, snapshot: Callable) -> "_Canvas":
+        return _Canvas(
+            self.number,
+            snapshot(self.image),
+            None if self.previous is None else snapshot(self.previous),
+        )
+
+
+class FrameStream:
+    """Decodes any frame of a gif from its frame index.
+
+    Not thread safe; FrameSource serialises access to it.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        window: int = WINDOW_FRAMES,
+        checkpoint_interval: int = CHECKPOINT_INTERVAL,
+        checkpoints: int = CHECKPOINTS,
+        keep_all_within: float | None = None,
+        fit: QSize = QSize(),
+    ) -> None:
+        """Frames are all kept when they fit within keep_all_within bytes.
+
+        Frames larger than fit are scaled down to fit it.
+        """
+
+        self._data = gifinfo.map_file(path)
+        self._info: GifInfo = gifinfo.parse_gif(self._data)
+        self._keyframes = self._info.keyframes()
+        self._frame_size = fitted_size(self.size, fit)
+        frame_size = self._frame_size or self.size
+        frame_bytes = frame_size.width() * frame_size.height() * 4
+        if (
+            keep_all_within is not None
+            and frame_bytes * self._info.frame_count <= keep_all_within
+        ):
+            window = self._info.frame_count
+        self._window_size = max(window, 1)
+        self._checkpoint_interval = max(checkpoint_interval, 1)
+        self._checkpoint_count = checkpoints
+        self._window: OrderedDict[int, object] = OrderedDict()
+        self._checkpoints: OrderedDict[int, _Canvas] = OrderedDict()
+        self._canvas: _Canvas | None = None
+
+    @property
+    def info(self) -> GifInfo:
+        return self._info
+
+    @property
+    def frame_count(self) -> int:
+        return self._info.frame_count
+
+    @property
+    def loop_count(self) -> int:
+        """Times the animation repeats after the first play, -1 is forever."""
+
+        # QImageReader's convention, which the player expects
+        if self._info.loop_count is None:
+            return 0
+        if self._info.loop_count == 0:
+            return -1
+        return self._info.loop_count
+
+    @property
+    def size(self) -> QSize:
+        return QSize(self._info.width, self._info.height)
+
+    @property
+    def frame_size(self) -> QSize:
+        """Size of the frames returned, which may be scaled down."""
+        return self._frame_size or self.size
+
+    @property
+    def window_size(self) -> int:
+        """Frames kept decoded."""
+        return self._window_size
+
+    @property
+    def decoded_count(self) -> int:
+        return len(self._window)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the kept frames and checkpoints."""
+
+        images = []
+        scaled_bytes = 0
+        if self._frame_size is None:
+            images += self._window.values()
+        else:
+            # scaled frames are images of their own
+            scaled_bytes = sum(image.sizeInBytes() for image in self._window.values())
+        for canvas in self._checkpoints.values():
+            images.append(canvas.image)
+            if canvas.previous is not None:
+                images.append(canvas.previous)
+        # shared images are counted once
+        return scaled_bytes + sum(dict(map(self._image_bytes, images)).values())
+
+    def frame(self, number: int) -> QImage:
+        """Return frame number, composing it from the nearest start point."""
+
+        if not self._info.frames:
+            return QImage()
+
+        number = min(max(number, 0), self.frame_count - 1)
+        if (image := self._window.get(number)) is not None:
+            self._window.move_to_end(number)
+        else:
+            self._seek(number)
+            image = self._window[number]
+        return image if self._frame_size is not None else self._to_qimage(image)
+
+    def delay(self, number: int) -> int:
+        """Return the declared delay of frame number, in milliseconds."""
+
+        if not self._info.frames:
+            return 0
+        return self._info.frames[min(max(number, 0), self.frame_count - 1)].delay
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
+
+    def _seek(self, number: int) -> None:
+        canvas = None
+        if self._canvas is not None and self._canvas.number <= number:
+            canvas = self._canvas
+        if (checkpoint := self._best_checkpoint(number)) is not None and (
+            canvas is None or checkpoint.number > canvas.number
+        ):
+            canvas = checkpoint.copy(self._snapshot)
+        if (keyframe := self._keyframe_before(number)) is not None and (
+            canvas is None or keyframe > canvas.number
+        ):
+            canvas = self._start(keyframe)
+            self._keep(canvas, number)
+
+        if canvas.number == number:
+            # the cursor is already there, but its frame left the window
+            self._keep(canvas, number)
+        while canvas.number < number:
+            self._advance(canvas)
+            self._keep(canvas, number)
+
+        self._canvas = canvas
+
+    def _best_checkpoint(self, number: int) -> _Canvas | None:
+        best = None
+        for checkpoint in self._checkpoints.values():
+            if checkpoint.number <= number and (
+                best is None or checkpoint.number > best.number
+            ):
+                best = checkpoint
+        if best is not None:
+            self._checkpoints.move_to_end(best.number)
+        return best
+
+    def _keyframe_before(self, number: int) -> int | None:
+        position = bisect.bisect_right(self._keyframes, number)
+        return self._keyframes[position - 1] if position else None
+
+    def _keep(self, canvas: _Canvas, target: int) -> None:
+        """Remember the frame just drawn, if it is worth keeping."""
+
+        if target - canvas.number < self._window_size:
+            self._window[canvas.number] = (
+                self._snapshot(canvas.image)
+                if self._frame_size is None
+                else scale_frame(self._to_qimage(canvas.image), self._frame_size)
+            )
+            self._window.move_to_end(canvas.number)
+            while len(self._window) > self._window_size:
+                self._window.popitem(last=False)
+
+        if (
+            self._checkpoint_count
+            and canvas.number % self._checkpoint_interval == 0
+            and canvas.number not in self._checkpoints
+            and self._keyframe_before(canvas.number) != canvas.number
+        ):
+            self._checkpoints[canvas.number] = canvas.copy(self._snapshot)
+            while len(self._checkpoints) > self._checkpoint_count:
+                self._checkpoints.popitem(last=False)
+
+    def _start(self, number: int) -> _Canvas:
+        image = self._new_canvas()
+        frame = self._info.frames[number]
+        previous = (
+            self._snapshot(image)
+            if frame.disposal == gifinfo.DISPOSAL_PREVIOUS
+            else None
+        )
+        self._draw(image, frame)
+        return _Canvas(number, image, previous)
+
+    def _advance(self, canvas: _Canvas) -> None:
+        """Dispose of the frame on canvas and draw the next one."""
+
+        frame = self._info.frames[canvas.number]
+        if frame.disposal == gifinfo.DISPOSAL_BACKGROUND:
+            self._clear(canvas.image, frame)
+        elif (
+            frame.disposal == gifinfo.DISPOSAL_PREVIOUS and canvas.previous is not None
+        ):
+            canvas.image = canvas.previous
+
+        canvas.number += 1
+        frame = self._info.frames[canvas.number]
+        canvas.previous = (
+            self._snapshot(canvas.image)
+            if frame.disposal == gifinfo.DISPOSAL_PREVIOUS
+            else None
+        )
+        self._draw(canvas.image, frame)
+
+    # canvas operations, for subclasses to replace
+
+    def _new_canvas(self) -> QImage:
+        """Return a transparent canvas the size of the screen."""
+
+        image = QImage(self.size, _CANVAS_FORMAT)
+        image.fill(Qt.GlobalColor.transparent)
+        return image
+
+    @staticmethod
+    def _snapshot(image: QImage) -> QImage:
+        """Return a copy of image that drawing on image does not change."""
+
+        # QImage is implicitly shared, painting on either copy detaches it
+        return QImage(image)
+
+    @staticmethod
+    def _to_qimage(image: QImage) -> QImage:
+        return image
+
+    @staticmethod
+    def _image_bytes(image: QImage) -> tuple[int, int]:
+        """Return an identity for the pixels of image and their size."""
+        return image.cacheKey(), image.sizeInBytes()
+
+    @staticmethod
+    def _clear(image: QImage, frame: FrameInfo) -> None:
+        """Make the area of frame transparent again."""
+
+        painter = QPainter(image)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.fillRect(
+            QRect(frame.left, frame.top, frame.width, frame.height),
+            Qt.GlobalColor.transparent,
+        )
+        painter.end()
+
+    def _draw(self, image: QImage, frame: FrameInfo) -> None:
+        if (sub_image := self._decode(frame)).isNull():
+            # a damaged frame leaves the canvas as it was
+            return
+
+        painter = QPainter(image)
+        painter.drawImage(frame.left, frame.top, sub_image)
+        painter.end()
+
+    def _decode(self, frame: FrameInfo) -> QImage:
+        """Decode the image of one frame, without its position on the canvas."""
+
+        data = self._data
+        # the header and global colour table, with the screen cut to the frame
+        header = bytearray(data[: self._info.header_end])
+        header[6:10] = frame.width.to_bytes(2, "little") + frame.height.to_bytes(
+            2, "little"
+        )
+        # the graphic control extension, if any, then the frame moved to 0, 0
+        descriptor = bytearray(data[frame.image_offset : frame.image_offset + 10])
+        descriptor[1:5] = bytes(4)
+        return QImage.fromData(
+            bytes(header)
+            + data[frame.offset : frame.image_offset]
+            + bytes(descriptor)
+            + data[frame.image_offset + 10 : frame.end]
+            + bytes((gifinfo.TRAILER,)),
+            "GIF",
+        )
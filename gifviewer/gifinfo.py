@@ -0,0 +1,235 @@
+"""Reads gif block structure without decoding any image data."""
+
+import dataclasses
+import mmap
+from pathlib import Path
+
+from gifviewer import archives
+
+TRAILER = 0x3B
+EXTENSION_INTRODUCER = 0x21
+IMAGE_SEPARATOR = 0x2C
+GRAPHIC_CONTROL_LABEL = 0xF9
+APPLICATION_LABEL = 0xFF
+
+DISPOSAL_NONE = 0
+DISPOSAL_KEEP = 1
+DISPOSAL_BACKGROUND = 2
+DISPOSAL_PREVIOUS = 3
+
+
+class GifFormatError(ValueError):
+    """Raised when a file is not a readable gif."""
+
+
+@dataclasses.dataclass(slots=True)
+class FrameInfo:
+    """Location and layout of one frame within the file."""
+
+    offset: int  # start of the frame's graphic control extension, if any
+    image_offset: int  # start of the image descriptor
+    end: int  # one past the block terminator of the image data
+    left: int
+    top: int
+    width: int
+    height: int
+    delay: int  # milliseconds, as declared
+    disposal: int
+    transparent_index: int | None
+    interlaced: bool
+    local_color_table: bool
+
+
+@dataclasses.dataclass(slots=True)
+class GifInfo:
+    width: int
+    height: int
+    # None when there is no NETSCAPE2.0 extension (play once), 0 is forever
+    loop_count: int | None
+    header_end: int  # end of the logical screen descriptor and global table
+    background_index: int
+    global_color_table: bool
+    frames: list[FrameInfo]
+    truncated: bool = False
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frames)
+
+    @property
+    def delays(self) -> list[int]:
+        return [frame.delay for frame in self.frames]
+
+    @property
+    def duration(self) -> int:
+        """Total declared duration of one loop, in milliseconds."""
+        return sum(frame.delay for frame in self.frames)
+
+    def covers_canvas(self, frame: FrameInfo) -> bool:
+        return (
+            frame.left == 0
+            and frame.top == 0
+            and frame.width >= self.width
+            and frame.height >= self.height
+        )
+
+    def keyframes(self) -> list[int]:
+        """Return the frames that can be drawn without any earlier frame.
+
+        These are the first frame and every opaque frame covering the whole
+        canvas, unless its disposal brings back the canvas from before it;
+        decoding can start at any of them.
+        """
+
+        return [
+            number
+            for number, frame in enumerate(self.frames)
+            if number == 0
+            or (
+                frame.transparent_index is None
+                and frame.disposal != DISPOSAL_PREVIOUS
+                and self.covers_canvas(frame)
+            )
+        ]
+
+
+def map_file(path: Path) -> mmap.mmap | bytes:
+    """Return the contents of path, memory mapped when it is not empty.
+
+    An archive member is read into memory instead.
+    """
+
+    try:
+        file = open(path, "rb")
+    except (NotADirectoryError, FileNotFoundError):
+        # a member's path runs through its archive, a file
+        if (member := archives.split(path)) is None:
+            raise
+        return archives.read_member(*member)
+
+    with file:
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            return b""
+
+
+def read_gif_info(path: Path) -> GifInfo:
+    """Return the block structure of the gif at path."""
+
+    data = map_file(path)
+    try:
+        return parse_gif(data)
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+
+def parse_gif(data: bytes) -> GifInfo:
+    """Walk the blocks of a gif held in memory.
+
+    Truncated files are tolerated: the frames read so far are returned
+    with truncated set, as browsers show whatever they could decode.
+    """
+
+    if len(data) < 13 or data[:3] != b"GIF":
+        raise GifFormatError("not a gif file")
+
+    width = data[6] | data[7] << 8
+    height = data[8] | data[9] << 8
+    packed = data[10]
+    global_color_table = bool(packed & 0x80)
+    pos = 13
+    if global_color_table:
+        pos += 3 << ((packed & 0x07) + 1)
+
+    info = GifInfo(
+        width=width,
+        height=height,
+        loop_count=None,
+        header_end=pos,
+        background_index=data[11],
+        global_color_table=global_color_table,
+        frames=[],
+    )
+
+    size = len(data)
+    frame_offset = None
+    delay = 0
+    disposal = DISPOSAL_NONE
+    transparent_index = None
+    try:
+        while pos < size:
+            block = data[pos]
+            if block == TRAILER:
+                return info
+
+            if block == EXTENSION_INTRODUCER:
+                label = data[pos + 1]
+                if label == GRAPHIC_CONTROL_LABEL and data[pos + 2] >= 4:
+                    frame_offset = pos
+                    gce_packed = data[pos + 3]
+                    delay = (data[pos + 4] | data[pos + 5] << 8) * 10
+                    disposal = (gce_packed >> 2) & 0x07
+                    transparent_index = data[pos + 6] if gce_packed & 0x01 else None
+                elif label == APPLICATION_LABEL and data[pos + 2] == 11:
+                    identifier = data[pos + 3 : pos + 14]
+                    sub_block = pos + 14
+                    if (
+                        identifier in (b"NETSCAPE2.0", b"ANIMEXTS1.0")
+                        and data[sub_block] >= 3
+                        and data[sub_block + 1] == 1
+                    ):
+                        info.loop_count = data[sub_block + 2] | data[sub_block + 3] << 8
+                pos = _skip_sub_blocks(data, pos + 2)
+                continue
+
+            if block != IMAGE_SEPARATOR:
+                raise GifFormatError(f"unknown block 0x{block:02x} at {pos}")
+
+            image_offset = pos
+            image_packed = data[pos + 9]
+            local_color_table = bool(image_packed & 0x80)
+            frame = FrameInfo(
+                offset=image_offset if frame_offset is None else frame_offset,
+                image_offset=image_offset,
+                end=0,
+                left=data[pos + 1] | data[pos + 2] << 8,
+                top=data[pos + 3] | data[pos + 4] << 8,
+                width=data[pos + 5] | data[pos + 6] << 8,
+                height=data[pos + 7] | data[pos + 8] << 8,
+                delay=delay,
+                disposal=disposal,
+                transparent_index=transparent_index,
+                interlaced=bool(image_packed & 0x40),
+                local_color_table=local_color_table,
+            )
+            pos += 10
+            if local_color_table:
+                pos += 3 << ((image_packed & 0x07) + 1)
+            # skip the lzw minimum code size, then the image data
+            pos = _skip_sub_blocks(data, pos + 1)
+
+            frame.end = pos
+            info.frames.append(frame)
+            frame_offset = None
+            delay = 0
+            disposal = DISPOSAL_NONE
+            transparent_index = None
+    except IndexError:
+        pass
+
+    if not info.frames:
+        raise GifFormatError("gif contains no frames")
+
+    info.truncated = True
+    return info
+
+
+def _skip_sub_blocks(data: bytes, pos: int) -> int:
+    """Return the position after the block terminator starting at pos."""
+
+    while length := data[pos]:
+        pos += length + 1
+    return pos + 1
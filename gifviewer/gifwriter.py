@@ -0,0 +1,108 @@
+"""GIF writing in pure Python, so it runs in worker processes without Qt.
+
+Images are given as colour indexes into a colour table of packed 0xRRGGBB
+values; the blocks written are the ones gifinfo reads.
+"""
+
+import struct
+
+from gifviewer import lzw
+from gifviewer.gifinfo import (
+    APPLICATION_LABEL,
+    EXTENSION_INTRODUCER,
+    GRAPHIC_CONTROL_LABEL,
+    IMAGE_SEPARATOR,
+    TRAILER,
+)
+
+SIGNATURE = b"GIF89a"
+MAX_COLORS = 256
+# a palette gifs are reduced to keeps one index for transparency
+MIN_PALETTE_COLORS = 2
+MAX_PALETTE_COLORS = MAX_COLORS - 1
+MAX_DELAY_MS = 0xFFFF * 10
+
+
+def table_bits(colors: int) -> int:
+    """Return the size field of a colour table holding colors entries."""
+    return max(colors - 1, 1).bit_length() - 1
+
+
+def color_table(colors: list[int]) -> bytes:
+    """Return colors as a table padded to its power of two size."""
+
+    size = 2 << table_bits(len(colors))
+    return b"".join(
+        color.to_bytes(3, "big") for color in colors + [0] * (size - len(colors))
+    )
+
+
+def header(width: int, height: int, colors: list[int], loop_count: int | None) -> bytes:
+    """Return the screen descriptor with a global colour table of colors,
+    if any, and the loop extension unless loop_count is None."""
+
+    packed = 0x80 | table_bits(len(colors)) if colors else 0
+    data = SIGNATURE + struct.pack("<HHBBB", width, height, packed, 0, 0)
+    if colors:
+        data += color_table(colors)
+    if loop_count is not None:
+        data += (
+            bytes((EXTENSION_INTRODUCER, APPLICATION_LABEL, 11))
+            + b"NETSCAPE2.0"
+            + struct.pack("<BBHB", 3, 1, loop_count, 0)
+        )
+    return data
+
+
+def sub_blocks(data: bytes) -> bytes:
+    """Return data cut into sub-blocks, with the block terminator."""
+
+    return (
+        b"".join(
+            bytes((len(data[start : start + 255]),)) + data[start : start + 255]
+            for start in range(0, len(data), 255)
+        )
+        + b"\x00"
+    )
+
+
+def frame(
+    left: int,
+    top: int,
+    width: int,
+    height: int,
+    indexes: bytes,
+    *,
+    delay_ms: int,
+    disposal: int,
+    transparent_index: int | None,
+    local_colors: list[int] | None = None,
+) -> bytes:
+    """Return the graphic control extension and image of one frame.
+
+    indexes holds width by height colour indexes, row by row, into
+    local_colors if given and the global colour table otherwise.
+    """
+
+    data = bytes((EXTENSION_INTRODUCER, GRAPHIC_CONTROL_LABEL, 4)) + struct.pack(
+        "<BHBB",
+        disposal << 2 | (transparent_index is not None),
+        min(delay_ms, MAX_DELAY_MS) // 10,
+        transparent_index or 0,
+        0,
+    )
+    packed = 0x80 | table_bits(len(local_colors)) if local_colors else 0
+    data += bytes((IMAGE_SEPARATOR,)) + struct.pack(
+        "<HHHHB", left, top, width, height, packed
+    )
+    if local_colors:
+        data += color_table(local_colors)
+
+    min_code_size = max(max(indexes, default=0).bit_length(), 2)
+    return (
+        data + bytes((min_code_size,)) + sub_blocks(lzw.encode(indexes, min_code_size))
+    )
+
+
+def trailer() -> bytes:
+    return bytes((TRAILER,))
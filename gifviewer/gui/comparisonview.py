@@ -0,0 +1,96 @@
+import math
+
+from PyQt5.QtCore import QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QCloseEvent, QImage, QPixmap
+from PyQt5.QtWidgets import (
+    QGridLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QSizePolicy,
+    QSlider,
+    QVBoxLayout,
+    QWidget,
+)
+
+from gifviewer.__init__ import __version__
+
+# share of the screen the window opens at
+SCREEN_SHARE = 0.8
+
+
+class ComparisonView(QWidget):
+    """A window showing gifs in a grid, with one set of playback controls."""
+
+    closed = pyqtSignal()
+
+    def __init__(self, names: list[str]) -> None:
+        super().__init__()
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.setWindowTitle(f"GifViewer v{__version__} - Compare {len(names)} files")
+
+        grid = QGridLayout()
+        columns = math.ceil(math.sqrt(len(names)))
+        self._panes: list[QLabel] = []
+        for number, name in enumerate(names):
+            pane = QLabel(self)
+            pane.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            # the panes share the window rather than grow it to their gifs
+            pane.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+            caption = QLabel(name, self)
+            caption.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            caption.setToolTip(name)
+
+            column = QVBoxLayout()
+            column.addWidget(pane, 1)
+            column.addWidget(caption)
+            grid.addLayout(column, *divmod(number, columns))
+            self._panes.append(pane)
+
+        self.play_button = QPushButton("Pause", self)
+        self.play_button.setCheckable(True)
+        self.play_button.setChecked(True)
+        self.frame_slider = QSlider(Qt.Orientation.Horizontal, self)
+        self.frame_slider.setMinimum(0)
+        self.frame_label = QLabel(self)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.play_button)
+        controls.addWidget(self.frame_slider, 1)
+        controls.addWidget(self.frame_label)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(grid, 1)
+        layout.addLayout(controls)
+
+        if (screen := self.screen()) is not None:
+            self.resize(screen.availableSize() * SCREEN_SHARE)
+        self.update_frame(0, 0)
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        # noinspection PyUnresolvedReferences
+        self.closed.emit()
+        super().closeEvent(event)
+
+    def pane_size(self) -> QSize:
+        """The space each gif has, once the window is laid out."""
+        return self._panes[0].contentsRect().size()
+
+    def show_frames(self, images: list[QImage]) -> None:
+        for pane, image in zip(self._panes, images):
+            pane.setPixmap(QPixmap.fromImage(image))
+
+    def update_frame(self, number: int, count: int) -> None:
+        """Show frame number of count on the slider, without moving it."""
+
+        self.frame_slider.blockSignals(True)
+        self.frame_slider.setMaximum(max(count - 1, 0))
+        self.frame_slider.setValue(number)
+        self.frame_slider.blockSignals(False)
+        self.frame_label.setText(f"Frame [{number}]:")
+
+    def update_playing(self, playing: bool) -> None:
+        self.play_button.blockSignals(True)
+        self.play_button.setChecked(playing)
+        self.play_button.blockSignals(False)
+        self.play_button.setText("Pause" if playing else "Play")
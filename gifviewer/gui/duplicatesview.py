@@ -0,0 +1,101 @@
+from pathlib import Path
+
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QCloseEvent
+from PyQt5.QtWidgets import (
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from gifviewer.__init__ import __version__
+from gifviewer.comparison import MAX_PANES, MIN_PANES
+from gifviewer.duplicates import DuplicateGroup
+
+_PATH_ROLE = Qt.ItemDataRole.UserRole
+
+
+class DuplicatesView(QWidget):
+    """A window listing groups of identical and similar files."""
+
+    closed = pyqtSignal()
+    file_activated = pyqtSignal(object)  # Path
+    compare_requested = pyqtSignal(list)  # list[Path]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.setWindowTitle(f"GifViewer v{__version__} - Duplicates")
+
+        self.tree = QTreeWidget(self)
+        self.tree.setHeaderLabels(["File", "Folder"])
+        self.tree.itemActivated.connect(self._item_activated)
+        self.tree.currentItemChanged.connect(self._current_item_changed)
+        self.status_label = QLabel(self)
+        self.compare_button = QPushButton("Compare", self)
+        self.compare_button.setToolTip(
+            f"Play the first {MAX_PANES} files of the group side by side"
+        )
+        self.compare_button.setEnabled(False)
+        self.compare_button.clicked.connect(self._compare_clicked)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.status_label, 1)
+        controls.addWidget(self.compare_button)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.tree, 1)
+        layout.addLayout(controls)
+        self.resize(720, 480)
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        # noinspection PyUnresolvedReferences
+        self.closed.emit()
+        super().closeEvent(event)
+
+    def update_progress(self, done: int, total: int) -> None:
+        self.status_label.setText(f"Hashing {done} of {total} files...")
+
+    def show_groups(self, groups: list[DuplicateGroup]) -> None:
+        self.tree.clear()
+        for group in groups:
+            kind = "identical" if group.identical else "similar"
+            item = QTreeWidgetItem([f"{len(group.paths)} {kind} files"])
+            for path in group.paths:
+                child = QTreeWidgetItem([path.name, path.parent.as_posix()])
+                child.setData(0, _PATH_ROLE, path)
+                item.addChild(child)
+            self.tree.addTopLevelItem(item)
+        self.tree.expandAll()
+        self.tree.resizeColumnToContents(0)
+        duplicates = sum(len(group.paths) - 1 for group in groups)
+        self.status_label.setText(
+            f"{duplicates} duplicates in {len(groups)} groups."
+            if groups
+            else "No duplicates found."
+        )
+
+    def _group_paths(self, item: QTreeWidgetItem | None) -> list[Path]:
+        if item is None:
+            return []
+        group = item.parent() or item
+        return [
+            group.child(row).data(0, _PATH_ROLE) for row in range(group.childCount())
+        ]
+
+    def _item_activated(self, item: QTreeWidgetItem, _: int) -> None:
+        if (path := item.data(0, _PATH_ROLE)) is not None:
+            # noinspection PyUnresolvedReferences
+            self.file_activated.emit(path)
+
+    def _current_item_changed(self, item: QTreeWidgetItem | None, _) -> None:
+        self.compare_button.setEnabled(len(self._group_paths(item)) >= MIN_PANES)
+
+    def _compare_clicked(self) -> None:
+        if paths := self._group_paths(self.tree.currentItem()):
+            # noinspection PyUnresolvedReferences
+            self.compare_requested.emit(paths[:MAX_PANES])
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+from PyQt5.QtWidgets import (
+    QDialog,
+    QDialogButtonBox,
+    QFileDialog,
+    QFormLayout,
+    QHBoxLayout,
+    QLineEdit,
+    QPushButton,
+    QRadioButton,
+    QSpinBox,
+    QWidget,
+)
+
+from gifviewer.frameexport import FrameSelection
+
+MAX_FRAME = 99999
+
+
+class ExportDialog(QDialog):
+    """Asks which frames of the selected files to export, and where to."""
+
+    def __init__(self, count: int, folder: Path, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Export Frames of {count} File{'s' * (count != 1)}")
+
+        self.first_frame = QSpinBox(self)
+        self.first_frame.setRange(0, MAX_FRAME)
+        self.last_frame = QSpinBox(self)
+        # the minimum stands for the last frame of each gif
+        self.last_frame.setRange(-1, MAX_FRAME)
+        self.last_frame.setSpecialValueText("Last")
+        self.last_frame.setValue(-1)
+        self.every = QSpinBox(self)
+        self.every.setRange(1, MAX_FRAME)
+        self.every.setSuffix(" frame(s)")
+
+        self.png_files = QRadioButton("A PNG file per frame", self)
+        self.png_files.setChecked(True)
+        self.sprite_sheet = QRadioButton("A sprite sheet per file", self)
+        self.columns = QSpinBox(self)
+        self.columns.setRange(0, MAX_FRAME)
+        self.columns.setSpecialValueText("Square")
+        self.columns.setEnabled(False)
+        self.sprite_sheet.toggled.connect(self.columns.setEnabled)
+
+        self.folder = QLineEdit(str(folder), self)
+        browse = QPushButton("Browse...", self)
+        browse.clicked.connect(self._browse)
+        folder_row = QHBoxLayout()
+        folder_row.addWidget(self.folder, 1)
+        folder_row.addWidget(browse)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
+            self,
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        self.folder.textChanged.connect(
+            lambda text: buttons.button(QDialogButtonBox.StandardButton.Ok).setEnabled(
+                bool(text.strip())
+            )
+        )
+
+        layout = QFormLayout(self)
+        layout.addRow("From frame:", self.first_frame)
+        layout.addRow("To frame:", self.last_frame)
+        layout.addRow("Every:", self.every)
+        layout.addRow("Write:", self.png_files)
+        layout.addRow("", self.sprite_sheet)
+        layout.addRow("Sheet columns:", self.columns)
+        layout.addRow("To folder:", folder_row)
+        layout.addRow(buttons)
+
+    def selection(self) -> FrameSelection:
+        first = self.first_frame.value()
+        last = self.last_frame.value()
+        return FrameSelection(
+            first, None if last < 0 else max(last, first), self.every.value()
+        )
+
+    def sheet_columns(self) -> int | None:
+        """Columns of the sprite sheets, 0 for square, None for PNG files."""
+        return self.columns.value() if self.sprite_sheet.isChecked() else None
+
+    def output_folder(self) -> Path:
+        return Path(self.folder.text().strip())
+
+    def _browse(self) -> None:
+        if folder := QFileDialog.getExistingDirectory(
+            self, "Export Frames To", self.folder.text()
+        ):
+            self.folder.setText(folder)
@@ -0,0 +1,49 @@
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QObject, Qt, pyqtSlot
+
+from gifviewer.filmstrip import FrameThumbnails
+
+
+class FilmstripModel(QAbstractListModel):
+    """A row for each frame of the gif shown, with its thumbnail.
+
+    The view asks only for the rows it shows, and only those thumbnails
+    are rendered.
+    """
+
+    def __init__(self, thumbnails: FrameThumbnails, parent: QObject | None = None):
+        super().__init__(parent)
+        self._thumbnails = thumbnails
+        self._frame_count = 0
+        # noinspection PyUnresolvedReferences
+        thumbnails.thumbnail_ready.connect(self._thumbnail_ready)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._frame_count
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self._frame_count:
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(index.row())
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._thumbnails.thumbnail(index.row())
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+
+        return None
+
+    def set_frame_count(self, frame_count: int) -> None:
+        self.beginResetModel()
+        self._frame_count = frame_count
+        self.endResetModel()
+
+    @pyqtSlot(int)  # FrameThumbnails::thumbnail_ready()
+    def _thumbnail_ready(self, number: int) -> None:
+        if number >= self._frame_count:
+            return
+
+        # rows standing in with an earlier frame may show this one now
+        last = self._frame_count - 1
+        index = self.index(number)
+        self.dataChanged.emit(index, self.index(last), [Qt.ItemDataRole.DecorationRole])
@@ -0,0 +1,407 @@
+import bisect
+import sys
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QObject,
+    Qt,
+    pyqtSignal,
+    pyqtSlot,
+)
+
+from gifviewer import nameindex
+from gifviewer.arranger import ArrangeRequest, FileListArranger
+from gifviewer.fileorder import SORT_NAME
+
+if TYPE_CHECKING:
+    from gifviewer.thumbnails import ThumbnailProvider
+
+FilePathRole = Qt.ItemDataRole.UserRole
+
+
+class GifListModel(QAbstractListModel):
+    """Presents the files of a MainViewModel to a QListView.
+
+    Rows are not stored here; the name and path of a row are read from
+    the model's PathStore when the view asks for them, so only visible
+    rows ever cost anything.
+
+    The files can be filtered by name and sorted by metadata. Both are
+    worked out on a worker thread, after which the rows map to the
+    store's indexes through a single array.
+    """
+
+    # the rows were replaced, by a new search or sort order
+    rows_arranged = pyqtSignal()
+
+    def __init__(self, model, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._model = model
+        self._files = model.files
+        self._row_count = 0
+        # store index of each row, None while every file is shown in name order
+        self._rows: array | None = None
+        # sorted position of each store index, while sorted by metadata
+        self._ranks: array | None = None
+        # given to files inserted while sorted by metadata, which go last
+        self._next_rank = 0
+        self._query = ""
+        self._sort_key = SORT_NAME
+        self._arranger = FileListArranger(self)
+        self._thumbnails: "ThumbnailProvider | None" = None
+        # rows whose thumbnail is being rendered, to find them again cheaply
+        self._thumbnail_rows: dict[Path, int] = {}
+
+        self._arranger.arranged.connect(self._arranged)
+        model.files_cleared.connect(self._files_cleared)
+        model.files_added.connect(self._files_added)
+        model.files_sorted.connect(self._files_sorted)
+        model.files_inserted.connect(self._files_inserted)
+        model.files_removed.connect(self._files_removed)
+        model.orderings_changed.connect(self._orderings_changed)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._row_count
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self._row_count:
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._files.name(self._store_row(index.row()))
+        if role == FilePathRole:
+            return self._path(index.row())
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self._path(index.row()).as_posix()
+        if role == Qt.ItemDataRole.DecorationRole and self._thumbnails is not None:
+            path = self._path(index.row())
+            if (pixmap := self._thumbnails.thumbnail(path)) is None:
+                self._thumbnail_rows[path] = index.row()
+                return self._thumbnails.placeholder
+            return pixmap
+
+        return None
+
+    @property
+    def filtered(self) -> bool:
+        return self._rows is not None and bool(self._query)
+
+    @property
+    def visible_files(self) -> Sequence[Path]:
+        """The paths of the rows, in row order."""
+        return _VisibleFiles(self)
+
+    def file_path(self, index: QModelIndex) -> Path:
+        return self._path(index.row())
+
+    def index_of(self, path: Path) -> QModelIndex:
+        """Return the index of path, invalid if it is not shown."""
+
+        try:
+            if self._model.names is None:
+                # still being scanned, so not yet sorted by name
+                store_row = self._files.index(path)
+            else:
+                store_row = self._files.index_sorted(path)
+        except ValueError:
+            return QModelIndex()
+
+        row = self._row_of(store_row)
+        return QModelIndex() if row is None else self.index(row)
+
+    def set_filter(self, query: str) -> None:
+        """Show only the files whose name contains query, or starts with it
+        if it begins with ^. Case is ignored."""
+
+        self._query = query.lower()
+        self._request_arrangement()
+
+    def set_sort_key(self, key: str) -> None:
+        self._sort_key = key
+        self._request_arrangement()
+
+    def set_thumbnail_provider(self, provider: "ThumbnailProvider | None") -> None:
+        """Show thumbnails from provider, or none at all."""
+
+        if self._thumbnails is not None:
+            self._thumbnails.thumbnail_ready.disconnect(self._thumbnail_ready)
+        self._thumbnails = provider
+        self._thumbnail_rows.clear()
+        if provider is not None:
+            provider.thumbnail_ready.connect(self._thumbnail_ready)
+
+        if self._row_count:
+            self.dataChanged.emit(
+                self.index(0),
+                self.index(self._row_count - 1),
+                [Qt.ItemDataRole.DecorationRole],
+            )
+
+    def _row_of(self, store_row: int) -> int | None:
+        """Return the row showing store_row, None if it is not shown."""
+
+        if self._rows is None:
+            return store_row
+        if self._ranks is None:
+            row = bisect.bisect_left(self._rows, store_row)
+        else:
+            ranks = self._ranks
+            row = bisect.bisect_left(
+                self._rows, ranks[store_row], key=ranks.__getitem__
+            )
+        found = row < len(self._rows) and self._rows[row] == store_row
+        return row if found else None
+
+    def _store_row(self, row: int) -> int:
+        return row if self._rows is None else self._rows[row]
+
+    def _path(self, row: int) -> Path:
+        return self._files[self._store_row(row)]
+
+    def _request_arrangement(self) -> None:
+        # until the scan has sorted the files, they are shown as they come
+        if (names := self._model.names) is None:
+            return
+
+        ordering = None
+        if self._sort_key != SORT_NAME:
+            if (orderings := self._model.orderings) is None:
+                # arranged again when they are ready
+                return
+            ordering = orderings[self._sort_key]
+
+        if ordering is None and not self._query:
+            self._arranger.cancel_all()
+            if self._rows is not None:
+                self._set_rows(None)
+            return
+
+        request = ArrangeRequest(self._query, self._sort_key, self._model.generation)
+        self._arranger.arrange(request, names.snapshot(), ordering)
+
+    def _set_rows(self, rows: array | None, ranks: array | None = None) -> None:
+        self.beginResetModel()
+        self._rows = rows
+        self._ranks = ranks
+        self._next_rank = 0 if ranks is None else len(ranks)
+        self._row_count = len(self._files) if rows is None else len(rows)
+        self._thumbnail_rows.clear()
+        self.endResetModel()
+        # noinspection PyUnresolvedReferences
+        self.rows_arranged.emit()
+
+    @pyqtSlot(object)  # FileListArranger::arranged()
+    def _arranged(self, request: ArrangeRequest) -> None:
+        if request.query != self._query or request.sort_key != self._sort_key:
+            # a later request is on its way
+            return
+        if request.generation != self._model.generation:
+            self._request_arrangement()
+            return
+
+        # a copy of the ranks, as they change with the files
+        ranks = None if request.ranks is None else request.ranks[:]
+        self._set_rows(request.rows, ranks)
+
+    @pyqtSlot(object)  # ThumbnailProvider::thumbnail_ready()
+    def _thumbnail_ready(self, path: Path) -> None:
+        row = self._thumbnail_rows.pop(path, None)
+        if row is None or row >= self._row_count or self._path(row) != path:
+            return
+
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    # the store has already changed when the slots below run; the row
+    # count is only updated inside the begin/end pairs so the view stays
+    # consistent
+
+    @pyqtSlot()  # MainViewModel::files_cleared()
+    def _files_cleared(self) -> None:
+        self._arranger.cancel_all()
+        self.beginResetModel()
+        self._rows = self._ranks = None
+        self._row_count = 0
+        self._thumbnail_rows.clear()
+        self.endResetModel()
+
+    @pyqtSlot(list)  # MainViewModel::files_added()
+    def _files_added(self, files: list[Path]) -> None:
+        if not files or self._rows is not None:
+            return
+
+        first = self._row_count
+        self.beginInsertRows(QModelIndex(), first, first + len(files) - 1)
+        self._row_count += len(files)
+        self.endInsertRows()
+
+    @pyqtSlot(list)  # MainViewModel::files_inserted()
+    def _files_inserted(self, store_rows: list[int]) -> None:
+        if self._rows is not None:
+            # files after each one in the store have moved down, by as many
+            # as were inserted before them
+            self._renumber(
+                [store_row - number for number, store_row in enumerate(store_rows)],
+                1,
+            )
+            if self._ranks is not None:
+                self._ranks = self._inserted_ranks(store_rows)
+            store_rows = [
+                store_row
+                for store_row in store_rows
+                if nameindex.matches(self._files.name(store_row).lower(), self._query)
+            ]
+
+        for store_row in store_rows:
+            if self._rows is None:
+                row = store_row
+            elif self._ranks is None:
+                row = bisect.bisect_left(self._rows, store_row)
+            else:
+                # without metadata yet, until the orderings are remade
+                row = len(self._rows)
+
+            self.beginInsertRows(QModelIndex(), row, row)
+            if self._rows is not None:
+                self._rows.insert(row, store_row)
+            self._row_count += 1
+            self._shift_thumbnail_rows(row, 1)
+            self.endInsertRows()
+
+    @pyqtSlot(list)  # MainViewModel::files_removed()
+    def _files_removed(self, store_rows: list[int]) -> None:
+        if self._rows is None:
+            rows = store_rows
+        else:
+            rows = sorted(
+                row
+                for store_row in store_rows
+                if (row := self._row_of(store_row)) is not None
+            )
+            # files after each one in the store have moved up, by as many
+            # as were removed before them; the removed ones are dropped below
+            self._renumber([store_row + 1 for store_row in store_rows], -1)
+            if self._ranks is not None:
+                self._ranks = _without(self._ranks, store_rows)
+
+        # from the last, so the rows before each stay where they are
+        for row in reversed(rows):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            if self._rows is not None:
+                del self._rows[row]
+            self._row_count -= 1
+            self._shift_thumbnail_rows(row, -1)
+            self.endRemoveRows()
+
+    def _renumber(self, thresholds: list[int], step: int) -> None:
+        """Add step to each store index in the rows once for every one of
+        the ascending thresholds it is at or above."""
+
+        if self._ranks is not None:
+            # in no order by store index, so each is looked up
+            self._rows = array(
+                "L",
+                (
+                    index + step * bisect.bisect_right(thresholds, index)
+                    for index in self._rows
+                ),
+            )
+            return
+
+        # in store order, so each threshold starts a run moved one further
+        starts = [bisect.bisect_left(self._rows, threshold) for threshold in thresholds]
+        for count, (start, stop) in enumerate(
+            zip(starts, [*starts[1:], len(self._rows)]), 1
+        ):
+            _add(self._rows, start, stop, step * count)
+
+    def _inserted_ranks(self, store_rows: list[int]) -> array:
+        """Return the ranks with new ones, after every other, at store_rows."""
+
+        ranks = array("L")
+        previous = 0
+        for number, store_row in enumerate(store_rows):
+            ranks += self._ranks[previous : store_row - number]
+            ranks.append(self._next_rank)
+            self._next_rank += 1
+            previous = store_row - number
+        ranks += self._ranks[previous:]
+        return ranks
+
+    def _shift_thumbnail_rows(self, row: int, offset: int) -> None:
+        self._thumbnail_rows = {
+            path: pending + offset if pending >= row else pending
+            for path, pending in self._thumbnail_rows.items()
+        }
+
+    @pyqtSlot(list)  # MainViewModel::files_sorted()
+    def _files_sorted(self, order: list[int]) -> None:
+        if self._rows is None:
+            self.layoutAboutToBeChanged.emit()
+
+            new_rows = [0] * len(order)
+            for new_row, old_row in enumerate(order):
+                new_rows[old_row] = new_row
+
+            self._thumbnail_rows.clear()
+            persistent = self.persistentIndexList()
+            self.changePersistentIndexList(
+                persistent,
+                [self.index(new_rows[index.row()]) for index in persistent],
+            )
+            self.layoutChanged.emit()
+
+        self._arranger.prepare(self._model.names.snapshot())
+        self._request_arrangement()
+
+    @pyqtSlot()  # MainViewModel::orderings_changed()
+    def _orderings_changed(self) -> None:
+        if self._sort_key != SORT_NAME:
+            self._request_arrangement()
+
+
+def _add(values: array, start: int, stop: int, offset: int) -> None:
+    """Add offset to values[start:stop], which takes none of them out of range.
+
+    Works on the values as one large integer, so no value is looked at
+    from Python.
+    """
+
+    if start >= stop or not offset:
+        return
+    size = values.itemsize
+    ones = int.from_bytes(
+        (1).to_bytes(size, sys.byteorder) * (stop - start), sys.byteorder
+    )
+    total = int.from_bytes(values[start:stop].tobytes(), sys.byteorder) + offset * ones
+    values[start:stop] = array(
+        values.typecode, total.to_bytes((stop - start) * size, sys.byteorder)
+    )
+
+
+def _without(values: array, indexes: list[int]) -> array:
+    """Return values less those at indexes, which are ascending."""
+
+    kept = array(values.typecode)
+    previous = 0
+    for index in indexes:
+        kept += values[previous:index]
+        previous = index + 1
+    kept += values[previous:]
+    return kept
+
+
+class _VisibleFiles(Sequence):
+    def __init__(self, model: GifListModel) -> None:
+        self._model = model
+
+    def __len__(self) -> int:
+        return self._model.rowCount()
+
+    def __getitem__(self, row: int) -> Path:
+        return self._model._path(row)
@@ -1,28 +1,66 @@
-from PyQt5.QtGui import QCloseEvent, QColor, QMovie, QPalette
-from PyQt5.QtWidgets import QMainWindow, QMessageBox, QWidget
+from PyQt5.QtCore import (
+    QAbstractItemModel,
+    QEvent,
+    QModelIndex,
+    QObject,
+    QSize,
+    QTimer,
+    pyqtSignal,
+)
+from PyQt5.QtGui import QCloseEvent, QColor, QPaintEvent, QPalette
+from PyQt5.QtWidgets import (
+    QAbstractItemView,
+    QLabel,
+    QListView,
+    QMainWindow,
+    QMessageBox,
+    QSizePolicy,
+    QWidget,
+)
 
 import gifviewer.settings as settings
 from gifviewer.__init__ import __version__
 from gifviewer.gui.qtdesignerforms import mainview_ui
+from gifviewer.player import GifPlayer
 
 
 class MainView(QMainWindow, mainview_ui.Ui_MainView):
     TITLE_PREFIX = f"GifViewer v{__version__}"
 
+    # emitted once, after the window has first been painted
+    first_painted = pyqtSignal()
+    # the area gifs are shown in changed size
+    display_resized = pyqtSignal()
+
     def __init__(self) -> None:
         super().__init__()
         self.setupUi(self)
         self.add_title_detail()
-
-        # used to prevent playing animation for the first file selected
-        # when the program starts and the QListWidget is created causing
-        # QListWidget::currentItemChanged() to be emitted
-        self.gif_list.startup = True
+        self._movie: GifPlayer | None = None
+        self._painted = False
+        self._playback_stats_label: QLabel | None = None
 
         self.gif_frame_palette = QPalette()
         self.update_nav_controls_visibility(False)
         self.normal_play.setVisible(False)
 
+        self.gif_display.installEventFilter(self)
+        self.set_fit_to_view(True)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if watched is self.gif_display and event.type() == QEvent.Type.Resize:
+            # noinspection PyUnresolvedReferences
+            self.display_resized.emit()
+        return super().eventFilter(watched, event)
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            # queued, so the paint reaches the screen before slots run
+            # noinspection PyUnresolvedReferences
+            QTimer.singleShot(0, self.first_painted.emit)
+
     def closeEvent(self, event: QCloseEvent) -> None:
         if settings.cl_args.no_confirm_exit:
             event.accept()
@@ -44,39 +82,101 @@ class MainView(QMainWindow, mainview_ui.Ui_MainView):
         return result == QMessageBox.Yes
 
     def clear_gif_display(self) -> None:
+        # the display is left empty while a folder is scanned,
+        # so the old movie must not keep emitting frames
+        if movie := self.movie():
+            movie.stop()
+            movie.frameChanged.disconnect(self._show_movie_frame)
+            self._movie = None
         self.gif_display.clear()
 
     def clear_dimensions_label(self) -> None:
         self.dimensions_label.setText("Dimensions:")
 
-    def clear_file_list(self) -> None:
-        self.gif_list.clear()
-
     def clear_status_message(self) -> None:
         self.statusBar().clearMessage()
 
-    def movie(self) -> QMovie:
-        return self.gif_display.movie()
+    def movie(self) -> GifPlayer | None:
+        return self._movie
 
     def reset(self) -> None:
         self.update_file_count_label(0)
-        self.clear_file_list()
         self.set_dimension_text("Dimensions: 0 x 0")
         self.clear_gif_display()
 
+    def display_size(self) -> QSize:
+        return self.gif_display.contentsRect().size()
+
+    def set_fit_to_view(self, fit: bool) -> None:
+        """Let the gif display fill the space it has, rather than grow to
+        the size of the gif."""
+
+        policy = QSizePolicy.Policy.Ignored if fit else QSizePolicy.Policy.Preferred
+        self.gif_display.setSizePolicy(policy, policy)
+        # the spacers around it only take what the display leaves
+        self.verticalLayout_2.setStretchFactor(self.gif_display, int(fit))
+
     def set_dimension_text(self, text: str) -> None:
         self.dimensions_label.setText(text)
 
-    def update_file_count_label(self, count: int) -> None:
-        self.files_label.setText(f"Files [{count}]:")
+    def update_file_count_label(self, count: int, shown: int | None = None) -> None:
+        """Show the number of files, and of those shown if they are filtered."""
+
+        of = "" if shown is None else f"{shown} of "
+        self.files_label.setText(f"Files [{of}{count}]:")
+
+    def set_file_list_model(self, model: QAbstractItemModel) -> None:
+        self.gif_list.setModel(model)
+
+    def set_filmstrip_model(self, model: QAbstractItemModel, icon_size: QSize) -> None:
+        self.filmstrip.setModel(model)
+        self.filmstrip.setWrapping(False)
+        self.filmstrip.setMovement(QListView.Movement.Static)
+        self.filmstrip.setIconSize(icon_size)
+        self.filmstrip.setGridSize(icon_size + QSize(8, 24))
+        # one row of frames above the scroll bar
+        self.filmstrip.setFixedHeight(
+            self.filmstrip.gridSize().height()
+            + self.filmstrip.horizontalScrollBar().sizeHint().height()
+            + 2 * self.filmstrip.frameWidth()
+        )
 
-    def set_movie(self, movie: QMovie) -> None:
-        self.gif_display.setMovie(movie)
+    def show_filmstrip_frame(self, index: QModelIndex) -> None:
+        self.filmstrip.setCurrentIndex(index)
+        self.filmstrip.scrollTo(index, QAbstractItemView.ScrollHint.PositionAtCenter)
+
+    def set_grid_mode(self, grid: bool, icon_size: QSize = QSize()) -> None:
+        """Show the file list as a thumbnail grid or as a plain list."""
+
+        if grid:
+            self.gif_list.setViewMode(QListView.ViewMode.IconMode)
+            self.gif_list.setIconSize(icon_size)
+            self.gif_list.setGridSize(icon_size + QSize(24, 40))
+            self.gif_list.setResizeMode(QListView.ResizeMode.Adjust)
+            self.gif_list.setMovement(QListView.Movement.Static)
+            self.gif_list.setWordWrap(True)
+        else:
+            self.gif_list.setViewMode(QListView.ViewMode.ListMode)
+            self.gif_list.setIconSize(QSize())
+            self.gif_list.setGridSize(QSize())
+            self.gif_list.setWordWrap(False)
+
+        if (current := self.gif_list.currentIndex()).isValid():
+            self.gif_list.scrollTo(current)
+
+    def set_movie(self, movie: GifPlayer) -> None:
+        self.clear_gif_display()
+        self._movie = movie
+        movie.frameChanged.connect(self._show_movie_frame)
+
+    def _show_movie_frame(self, _: int) -> None:
+        self.gif_display.setPixmap(self._movie.currentPixmap())
 
     def update_nav_controls_visibility(self, visibility: bool) -> None:
         self.frame_label.setVisible(visibility)
         self.frame_number.setVisible(visibility)
         self.frame_slider.setVisible(visibility)
+        self.filmstrip.setVisible(visibility)
 
     def update_speed_slider(self, speed: int) -> None:
         self.speed_slider.setValue(speed)
@@ -91,6 +191,14 @@ class MainView(QMainWindow, mainview_ui.Ui_MainView):
     def update_status_message(self, message: str) -> None:
         self.statusBar().showMessage(message)
 
+    def update_playback_stats(self, text: str) -> None:
+        """Show text permanently at the right of the status bar."""
+
+        if self._playback_stats_label is None:
+            self._playback_stats_label = QLabel(self)
+            self.statusBar().addPermanentWidget(self._playback_stats_label)
+        self._playback_stats_label.setText(text)
+
     def add_title_detail(self, detail: str = "") -> None:
         detail = f" - {detail}" if detail else detail
         self.setWindowTitle(self.TITLE_PREFIX + detail)
@@ -0,0 +1,90 @@
+from pathlib import Path
+
+from PyQt5.QtWidgets import (
+    QCheckBox,
+    QDialog,
+    QDialogButtonBox,
+    QFileDialog,
+    QFormLayout,
+    QHBoxLayout,
+    QLineEdit,
+    QPushButton,
+    QRadioButton,
+    QSpinBox,
+    QWidget,
+)
+
+from gifviewer.gifwriter import MAX_PALETTE_COLORS, MIN_PALETTE_COLORS
+
+DEFAULT_COLORS = 128
+
+
+class OptimizeDialog(QDialog):
+    """Asks whether to replace the selected files when optimizing them,
+    and whether to reduce their colours."""
+
+    def __init__(self, count: int, folder: Path, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Optimize {count} File{'s' * (count != 1)}")
+
+        self.replace = QRadioButton("Replace each file that comes out smaller", self)
+        self.replace.setChecked(True)
+        self.copy = QRadioButton("Write the files to a folder", self)
+        self.folder = QLineEdit(str(folder), self)
+        self.browse = QPushButton("Browse...", self)
+        self.browse.clicked.connect(self._browse)
+        folder_row = QHBoxLayout()
+        folder_row.addWidget(self.folder, 1)
+        folder_row.addWidget(self.browse)
+        self.copy.toggled.connect(self.folder.setEnabled)
+        self.copy.toggled.connect(self.browse.setEnabled)
+        self.folder.setEnabled(False)
+        self.browse.setEnabled(False)
+
+        self.reduce = QCheckBox("Reduce to", self)
+        self.reduce.setToolTip("Fewer colours make smaller files but lose detail")
+        self.colors = QSpinBox(self)
+        self.colors.setRange(MIN_PALETTE_COLORS, MAX_PALETTE_COLORS)
+        self.colors.setValue(DEFAULT_COLORS)
+        self.colors.setSuffix(" colours")
+        self.colors.setEnabled(False)
+        self.reduce.toggled.connect(self.colors.setEnabled)
+        colors_row = QHBoxLayout()
+        colors_row.addWidget(self.reduce)
+        colors_row.addWidget(self.colors, 1)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
+            self,
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        ok = buttons.button(QDialogButtonBox.StandardButton.Ok)
+        self.folder.textChanged.connect(
+            lambda text: ok.setEnabled(self.replace.isChecked() or bool(text.strip()))
+        )
+        self.replace.toggled.connect(
+            lambda: ok.setEnabled(
+                self.replace.isChecked() or bool(self.folder.text().strip())
+            )
+        )
+
+        layout = QFormLayout(self)
+        layout.addRow("Files:", self.replace)
+        layout.addRow("", self.copy)
+        layout.addRow("To folder:", folder_row)
+        layout.addRow("Colours:", colors_row)
+        layout.addRow(buttons)
+
+    def output_folder(self) -> Path | None:
+        """The folder to write to, None to replace the files."""
+        return None if self.replace.isChecked() else Path(self.folder.text().strip())
+
+    def reduced_colors(self) -> int | None:
+        return self.colors.value() if self.reduce.isChecked() else None
+
+    def _browse(self) -> None:
+        if folder := QFileDialog.getExistingDirectory(
+            self, "Write Optimized Files To", self.folder.text()
+        ):
+            self.folder.setText(folder)
@@ -41,13 +41,25 @@ class Ui_MainView(object):
         spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
         self.horizontalLayout.addItem(spacerItem)
         self.verticalLayout_3.addLayout(self.horizontalLayout)
-        self.gif_list = QtWidgets.QListWidget(self.frame_2)
+        self.horizontalLayout_7 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_7.setObjectName("horizontalLayout_7")
+        self.search_box = QtWidgets.QLineEdit(self.frame_2)
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setObjectName("search_box")
+        self.horizontalLayout_7.addWidget(self.search_box)
+        self.sort_combo = QtWidgets.QComboBox(self.frame_2)
+        self.sort_combo.setObjectName("sort_combo")
+        self.horizontalLayout_7.addWidget(self.sort_combo)
+        self.verticalLayout_3.addLayout(self.horizontalLayout_7)
+        self.gif_list = QtWidgets.QListView(self.frame_2)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.Expanding)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
         sizePolicy.setHeightForWidth(self.gif_list.sizePolicy().hasHeightForWidth())
         self.gif_list.setSizePolicy(sizePolicy)
         self.gif_list.setAlternatingRowColors(True)
+        self.gif_list.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.gif_list.setUniformItemSizes(True)
         self.gif_list.setObjectName("gif_list")
         self.verticalLayout_3.addWidget(self.gif_list)
         self.verticalLayout_5.addLayout(self.verticalLayout_3)
@@ -87,6 +99,21 @@ class Ui_MainView(object):
         spacerItem3 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
         self.verticalLayout_2.addItem(spacerItem3)
         self.verticalLayout_6.addLayout(self.verticalLayout_2)
+        self.filmstrip = QtWidgets.QListView(self.frame)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.filmstrip.sizePolicy().hasHeightForWidth())
+        self.filmstrip.setSizePolicy(sizePolicy)
+        self.filmstrip.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.filmstrip.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.filmstrip.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.filmstrip.setHorizontalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.filmstrip.setFlow(QtWidgets.QListView.LeftToRight)
+        self.filmstrip.setUniformItemSizes(True)
+        self.filmstrip.setViewMode(QtWidgets.QListView.IconMode)
+        self.filmstrip.setObjectName("filmstrip")
+        self.verticalLayout_6.addWidget(self.filmstrip)
         self.verticalLayout = QtWidgets.QVBoxLayout()
         self.verticalLayout.setObjectName("verticalLayout")
         self.horizontalLayout_2 = QtWidgets.QHBoxLayout()
@@ -151,14 +178,45 @@ class Ui_MainView(object):
         self.menubar.setObjectName("menubar")
         self.menuFile = QtWidgets.QMenu(self.menubar)
         self.menuFile.setObjectName("menuFile")
+        self.menuView = QtWidgets.QMenu(self.menubar)
+        self.menuView.setObjectName("menuView")
         MainView.setMenuBar(self.menubar)
         self.statusbar = QtWidgets.QStatusBar(MainView)
         self.statusbar.setObjectName("statusbar")
         MainView.setStatusBar(self.statusbar)
         self.actionBrowse = QtWidgets.QAction(MainView)
         self.actionBrowse.setObjectName("actionBrowse")
+        self.actionExportFrames = QtWidgets.QAction(MainView)
+        self.actionExportFrames.setObjectName("actionExportFrames")
+        self.actionOptimize = QtWidgets.QAction(MainView)
+        self.actionOptimize.setObjectName("actionOptimize")
+        self.actionThumbnailGrid = QtWidgets.QAction(MainView)
+        self.actionThumbnailGrid.setCheckable(True)
+        self.actionThumbnailGrid.setObjectName("actionThumbnailGrid")
+        self.actionActualSize = QtWidgets.QAction(MainView)
+        self.actionActualSize.setCheckable(True)
+        self.actionActualSize.setObjectName("actionActualSize")
+        self.actionCompareSelected = QtWidgets.QAction(MainView)
+        self.actionCompareSelected.setObjectName("actionCompareSelected")
+        self.actionFindDuplicates = QtWidgets.QAction(MainView)
+        self.actionFindDuplicates.setObjectName("actionFindDuplicates")
+        self.actionCacheStatistics = QtWidgets.QAction(MainView)
+        self.actionCacheStatistics.setObjectName("actionCacheStatistics")
+        self.actionExportPlaybackStatistics = QtWidgets.QAction(MainView)
+        self.actionExportPlaybackStatistics.setVisible(False)
+        self.actionExportPlaybackStatistics.setObjectName("actionExportPlaybackStatistics")
         self.menuFile.addAction(self.actionBrowse)
+        self.menuFile.addAction(self.actionExportFrames)
+        self.menuFile.addAction(self.actionOptimize)
+        self.menuView.addAction(self.actionThumbnailGrid)
+        self.menuView.addAction(self.actionActualSize)
+        self.menuView.addAction(self.actionCompareSelected)
+        self.menuView.addAction(self.actionFindDuplicates)
+        self.menuView.addSeparator()
+        self.menuView.addAction(self.actionCacheStatistics)
+        self.menuView.addAction(self.actionExportPlaybackStatistics)
         self.menubar.addAction(self.menuFile.menuAction())
+        self.menubar.addAction(self.menuView.menuAction())
 
         self.retranslateUi(MainView)
         QtCore.QMetaObject.connectSlotsByName(MainView)
@@ -168,10 +226,32 @@ class Ui_MainView(object):
         MainView.setWindowTitle(_translate("MainView", "Gif Viewer"))
         self.files_label.setText(_translate("MainView", "Files:"))
         self.pushButtonBrowse.setText(_translate("MainView", "Browse"))
+        self.search_box.setPlaceholderText(_translate("MainView", "Search names, ^ for prefix"))
+        self.sort_combo.setToolTip(_translate("MainView", "Sort by"))
         self.dimensions_label.setText(_translate("MainView", "Dimensions:"))
         self.loop.setText(_translate("MainView", "Loop"))
         self.single_step.setText(_translate("MainView", "Single Step"))
         self.frame_label.setText(_translate("MainView", "Frame:"))
         self.speed_label.setText(_translate("MainView", "Speed:"))
         self.menuFile.setTitle(_translate("MainView", "File"))
+        self.menuView.setTitle(_translate("MainView", "View"))
         self.actionBrowse.setText(_translate("MainView", "Browse"))
+        self.actionExportFrames.setText(_translate("MainView", "Export Frames..."))
+        self.actionExportFrames.setToolTip(_translate("MainView", "Write frames of the selected files to PNG files or sprite sheets"))
+        self.actionExportFrames.setShortcut(_translate("MainView", "Ctrl+E"))
+        self.actionOptimize.setText(_translate("MainView", "Optimize..."))
+        self.actionOptimize.setToolTip(_translate("MainView", "Shrink the selected files by encoding them again"))
+        self.actionOptimize.setShortcut(_translate("MainView", "Ctrl+Shift+O"))
+        self.actionThumbnailGrid.setText(_translate("MainView", "Thumbnail Grid"))
+        self.actionThumbnailGrid.setShortcut(_translate("MainView", "Ctrl+G"))
+        self.actionActualSize.setText(_translate("MainView", "Actual Size"))
+        self.actionActualSize.setToolTip(_translate("MainView", "Show gifs at full resolution instead of fitting them to the window"))
+        self.actionActualSize.setShortcut(_translate("MainView", "Ctrl+1"))
+        self.actionCompareSelected.setText(_translate("MainView", "Compare Selected"))
+        self.actionCompareSelected.setToolTip(_translate("MainView", "Play the selected files side by side, frame for frame"))
+        self.actionCompareSelected.setShortcut(_translate("MainView", "Ctrl+K"))
+        self.actionFindDuplicates.setText(_translate("MainView", "Find Duplicates"))
+        self.actionFindDuplicates.setToolTip(_translate("MainView", "Group the listed files that are identical or look alike"))
+        self.actionFindDuplicates.setShortcut(_translate("MainView", "Ctrl+D"))
+        self.actionCacheStatistics.setText(_translate("MainView", "Cache Statistics"))
+        self.actionExportPlaybackStatistics.setText(_translate("MainView", "Export Playback Statistics..."))
@@ -0,0 +1,131 @@
+"""Gif flavoured LZW, in pure Python."""
+
+MAX_CODE_SIZE = 12
+MAX_CODES = 1 << MAX_CODE_SIZE
+
+
+def image_data(data, pos: int) -> tuple[int, bytes]:
+    """Return the minimum code size and joined sub-blocks of image data at pos."""
+
+    min_code_size = data[pos]
+    pos += 1
+    chunks = []
+    while length := data[pos]:
+        chunks.append(data[pos + 1 : pos + 1 + length])
+        pos += length + 1
+    return min_code_size, b"".join(chunks)
+
+
+def decode(data: bytes, min_code_size: int, pixel_count: int) -> bytes:
+    """Decode gif image data into at most pixel_count colour indexes.
+
+    Damaged data stops decoding early; the caller pads what is missing.
+    The string table holds whole bytes objects and the output is joined
+    once at the end, so each code costs little more than a lookup.
+    """
+
+    clear_code = 1 << min_code_size
+    end_code = clear_code + 1
+    initial_table = [bytes((code,)) for code in range(clear_code)] + [b"", b""]
+    table = initial_table[:]
+    add = table.append
+    next_code = clear_code + 2
+    code_size = min_code_size + 1
+    mask = (1 << code_size) - 1
+    previous = None
+    chunks = []
+    emit = chunks.append
+
+    bit_buffer = 0
+    bit_count = 0
+    for byte in data:
+        bit_buffer |= byte << bit_count
+        bit_count += 8
+        while bit_count >= code_size:
+            code = bit_buffer & mask
+            bit_buffer >>= code_size
+            bit_count -= code_size
+
+            if code < clear_code or end_code < code < next_code:
+                entry = table[code]
+                if previous is not None and next_code < MAX_CODES:
+                    add(previous + entry[:1])
+                    next_code += 1
+            elif code == next_code and previous is not None:
+                entry = previous + previous[:1]
+                if next_code < MAX_CODES:
+                    add(entry)
+                    next_code += 1
+            elif code == clear_code:
+                table = initial_table[:]
+                add = table.append
+                next_code = clear_code + 2
+                code_size = min_code_size + 1
+                mask = (1 << code_size) - 1
+                previous = None
+                continue
+            else:
+                # the end code, or a code that cannot be there in valid data
+                return b"".join(chunks)[:pixel_count]
+
+            emit(entry)
+            previous = entry
+            if next_code > mask and code_size < MAX_CODE_SIZE:
+                code_size += 1
+                mask = (1 << code_size) - 1
+
+    return b"".join(chunks)[:pixel_count]
+
+
+def encode(indexes: bytes, min_code_size: int) -> bytes:
+    """Encode colour indexes as gif image data, without the sub-blocks.
+
+    Strings are keyed by their code and next byte, so each index costs a
+    dict lookup. Once the table is full it is cleared and started again.
+    """
+
+    clear_code = 1 << min_code_size
+    end_code = clear_code + 1
+    next_code = end_code + 1
+    code_size = min_code_size + 1
+    table: dict[int, int] = {}
+    output = bytearray()
+    bit_buffer = clear_code
+    bit_count = code_size
+
+    def emit(code: int) -> None:
+        nonlocal bit_buffer, bit_count
+        bit_buffer |= code << bit_count
+        bit_count += code_size
+        while bit_count >= 8:
+            output.append(bit_buffer & 0xFF)
+            bit_buffer >>= 8
+            bit_count -= 8
+
+    if indexes:
+        prefix = indexes[0]
+        for index in memoryview(indexes)[1:]:
+            key = prefix << 8 | index
+            if (code := table.get(key)) is not None:
+                prefix = code
+                continue
+
+            emit(prefix)
+            if next_code < MAX_CODES:
+                table[key] = next_code
+                next_code += 1
+                # the decoder's table trails this one by a code
+                if next_code > 1 << code_size and code_size < MAX_CODE_SIZE:
+                    code_size += 1
+            else:
+                emit(clear_code)
+                table.clear()
+                next_code = end_code + 1
+                code_size = min_code_size + 1
+            prefix = index
+        emit(prefix)
+
+    emit(end_code)
+    if bit_count:
+        output.append(bit_buffer & 0xFF)
+    return bytes(output)
@@ -1,14 +1,45 @@
 """mainview.py controller."""
 
+import time
 from pathlib import Path
-
-from PyQt5.QtCore import QObject, QRect, Qt, pyqtSlot
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import (
+    QCoreApplication,
+    QModelIndex,
+    QObject,
+    QRect,
+    QSize,
+    Qt,
+    QTimer,
+    pyqtSlot,
+)
 from PyQt5.QtGui import QIntValidator, QMovie, QPalette
-from PyQt5.QtWidgets import QFileDialog, QListWidgetItem, QWidget
+from PyQt5.QtWidgets import QDialog, QFileDialog, QWidget
 
 from gifviewer import helpers
+from gifviewer.comparison import MAX_PANES, MIN_PANES
+from gifviewer.fileorder import SORT_KEYS
+from gifviewer.filmstrip import FrameThumbnails
+from gifviewer.framecache import FrameCache
+from gifviewer.gui.filmstripmodel import FilmstripModel
+from gifviewer.gui.giflistmodel import GifListModel
+from gifviewer.player import GifPlayer
+from gifviewer.prefetcher import Prefetcher
+from gifviewer.scanner import ScanOptions
 import gifviewer.settings as settings
 
+if TYPE_CHECKING:
+    from gifviewer.frameexport import ExportResult
+    from gifviewer.optimizer import OptimizeResult
+    from gifviewer.playbackstats import PlaybackStats
+    from gifviewer.thumbnails import ThumbnailProvider
+    from gifviewer.workers import FrameExportThread, OptimizeThread
+
+PLAYBACK_STATS_INTERVAL = 500  # ms between status bar updates
+FIT_SETTLE_TIME = 150  # ms the display must keep its size before decoding to fit
+FRAME_SEEK_INTERVAL = 50  # ms between full size frames shown while scrubbing
+
 
 class MainViewController(QObject):
     """Implements the mainview controller."""
@@ -21,39 +52,426 @@ class MainViewController(QObject):
         self._model = model
         self._frame_validator = QIntValidator(0, 0)
         self._original_base_role_color = view.frame.palette().color(QPalette.Base)
-        self._folder_browser = FolderBrowser(start_folder=settings.cl_args.start_in)
+        self._folder_browser = FolderBrowser(start_folder=settings.cl_args.start_in[0])
+        self._scan_options = ScanOptions.from_args(settings.cl_args)
+        self._list_model = GifListModel(model, self)
+        self._frame_cache = FrameCache(
+            settings.cl_args.cache_mb, settings.cl_args.decoder
+        )
+        self._prefetcher = Prefetcher(
+            self._frame_cache, settings.cl_args.prefetch, self
+        )
+        self._thumbnails: "ThumbnailProvider | None" = None
+        self._playback_stats: "PlaybackStats | None" = None
+        self._export_thread: "FrameExportThread | None" = None
+        self._export_folder: Path | None = None
+        self._export_results: "list[ExportResult]" = []
+        self._optimize_thread: "OptimizeThread | None" = None
+        self._optimize_folder: Path | None = None
+        self._optimize_results: "list[OptimizeResult]" = []
+        self._view.set_file_list_model(self._list_model)
+
+        self._frame_thumbnails = FrameThumbnails(parent=self)
+        self._filmstrip_model = FilmstripModel(self._frame_thumbnails, self)
+        self._view.set_filmstrip_model(
+            self._filmstrip_model, self._frame_thumbnails.size
+        )
+        self._view.filmstrip.selectionModel().currentChanged.connect(
+            self._filmstrip_frame_chosen
+        )
+        if (app := QCoreApplication.instance()) is not None:
+            app.aboutToQuit.connect(self._frame_thumbnails.shutdown)
+
+        # a drag moves the slider faster than frames decode, so frames are
+        # shown at most this often and those passed in between are skipped
+        self._seek_frame: int | None = None
+        self._seek_timer = QTimer(self)
+        self._seek_timer.setSingleShot(True)
+        self._seek_timer.setInterval(FRAME_SEEK_INTERVAL)
+        # noinspection PyUnresolvedReferences
+        self._seek_timer.timeout.connect(self._seek_pending_frame)
+
+        # gifs are decoded again to fit once resizing has stopped
+        self._fit_timer = QTimer(self)
+        self._fit_timer.setSingleShot(True)
+        self._fit_timer.setInterval(FIT_SETTLE_TIME)
+        # noinspection PyUnresolvedReferences
+        self._fit_timer.timeout.connect(self._fit_to_view)
 
         self._view.pushButtonBrowse.clicked.connect(self._browse_for_folder)
         self._view.actionBrowse.triggered.connect(self._browse_for_folder)
+        self._view.actionExportFrames.triggered.connect(self._export_frames)
+        self._view.actionOptimize.triggered.connect(self._optimize)
+        self._view.actionThumbnailGrid.toggled.connect(self._thumbnail_grid_toggled)
+        self._view.actionActualSize.toggled.connect(self._actual_size_toggled)
+        self._view.actionCompareSelected.triggered.connect(self._compare_selected)
+        self._view.actionFindDuplicates.triggered.connect(self._find_duplicates)
+        self._view.actionCacheStatistics.triggered.connect(self._show_cache_statistics)
+        # noinspection PyUnresolvedReferences
+        self._view.display_resized.connect(self._fit_timer.start)
         self._view.loop.toggled.connect(self._loop_toggled)
 
+        for key, label in SORT_KEYS.items():
+            self._view.sort_combo.addItem(label, key)
+        self._view.search_box.textChanged.connect(self._list_model.set_filter)
+        self._view.sort_combo.currentIndexChanged.connect(self._sort_key_changed)
+        # noinspection PyUnresolvedReferences
+        self._list_model.rows_arranged.connect(self._rows_arranged)
+
         self._view.frame_slider.setMinimum(0)
 
         self._view.speed_slider.setValue(self._model.speed)
         self._view.speed_slider.valueChanged.connect(self._update_speed)
         self._view.speed_slider.sliderReleased.connect(self._speed_changed)
 
-        self._view.gif_list.currentItemChanged.connect(
-            lambda item, _: self._set_gif_display_movie_from_string(item.file_path)
+        self._view.gif_list.selectionModel().currentChanged.connect(
+            self._current_index_changed
         )
-        self._view.gif_list.itemPressed.connect(
-            lambda item: self._set_gif_display_movie_from_string(item.file_path)
+        self._view.gif_list.pressed.connect(
+            lambda index: self._set_gif_display_movie_from_string(
+                self._list_model.file_path(index)
+            )
         )
 
+        self._model.files_added.connect(self._populate_gif_list)
+        self._model.scan_finished.connect(self._scan_finished)
+        self._model.files_inserted.connect(self._file_count_changed)
+        self._model.files_removed.connect(self._file_count_changed)
+
         self._view.single_step.toggled.connect(self._single_step_toggled)
 
     def initialize_controller(self) -> None:
         self._view.frame_number.setValidator(self._frame_validator)
         self._set_speed_text(self._model.speed)
-        self._model.update_files(self._folder_browser.current_folder)
+        if settings.cl_args.playback_stats is not None:
+            self._record_playback_stats()
+        # scanning waits for the window to be on screen
+        self._view.first_painted.connect(self._scan_start_folder)
+
+    @pyqtSlot()  # MainView::first_painted()
+    def _scan_start_folder(self) -> None:
+        # the display has its size now, the first gif is decoded to fit it
+        self._fit_to_view()
+        self._scan_folders([Path(folder) for folder in settings.cl_args.start_in])
 
     @pyqtSlot(bool)  # QPushButton::clicked(), QAction::triggered()
     def _browse_for_folder(self, _: bool) -> None:
         if path := self._folder_browser.browse(self._view, "Select Folder"):
-            self._view.reset()
-            self._model.update_files(path)
-            self._populate_gif_list(self._model.files)
-            self._set_gif_display_movie_from_string(self._model.first_file)
+            self._scan_folders([path])
+
+    @pyqtSlot(bool)  # QAction::toggled()
+    def _thumbnail_grid_toggled(self, checked: bool) -> None:
+        if checked and self._thumbnails is None:
+            from gifviewer.thumbnails import ThumbnailProvider
+
+            self._thumbnails = ThumbnailProvider(parent=self)
+
+        self._list_model.set_thumbnail_provider(self._thumbnails if checked else None)
+        self._view.set_grid_mode(checked, self._thumbnails.size)
+
+    @pyqtSlot(bool)  # QAction::toggled()
+    def _actual_size_toggled(self, checked: bool) -> None:
+        self._view.set_fit_to_view(not checked)
+        # after the display has been laid out again
+        self._fit_timer.start()
+
+    @pyqtSlot()  # QTimer::timeout()
+    def _fit_to_view(self) -> None:
+        fit = (
+            QSize()
+            if self._view.actionActualSize.isChecked()
+            else self._view.display_size()
+        )
+        if fit == self._frame_cache.fit:
+            return
+
+        self._frame_cache.set_fit(fit)
+        if (movie := self._view.movie()) is not None and not movie.source.fits(fit):
+            movie.set_source(self._frame_cache.get(movie.source.path))
+
+    @pyqtSlot(bool)  # QAction::triggered()
+    def _compare_selected(self, _: bool) -> None:
+        rows = sorted(self._view.gif_list.selectionModel().selectedRows())
+        if not MIN_PANES <= len(rows) <= MAX_PANES:
+            self._view.update_status_message(
+                f"Select {MIN_PANES} to {MAX_PANES} files to compare."
+            )
+            return
+
+        from gifviewer.comparisoncontroller import ComparisonController
+
+        ComparisonController(
+            [self._list_model.file_path(index) for index in rows],
+            self._frame_cache,
+            self._model.speed,
+            self,
+        )
+
+    @pyqtSlot(bool)  # QAction::triggered()
+    def _find_duplicates(self, _: bool) -> None:
+        if self._model.scanning:
+            self._view.update_status_message("Wait for the scan to finish.")
+            return
+
+        from gifviewer.duplicatescontroller import DuplicatesController
+
+        controller = DuplicatesController(
+            self._model.roots,
+            self._model.files,
+            self._frame_cache,
+            self._model.speed,
+            self,
+        )
+        # noinspection PyUnresolvedReferences
+        controller.file_chosen.connect(self._show_file)
+
+    @pyqtSlot(object)  # DuplicatesController::file_chosen()
+    def _show_file(self, path: Path) -> None:
+        if (index := self._list_model.index_of(path)).isValid():
+            self._view.gif_list.setCurrentIndex(index)
+            self._view.gif_list.scrollTo(index)
+        else:
+            # hidden by the search, shown all the same
+            self._set_gif_display_movie_from_string(path)
+        self._view.activateWindow()
+
+    @pyqtSlot(bool)  # QAction::triggered()
+    def _export_frames(self, _: bool) -> None:
+        if self._export_thread is not None:
+            self._view.update_status_message("Frames are still being exported.")
+            return
+        if not (rows := sorted(self._view.gif_list.selectionModel().selectedRows())):
+            self._view.update_status_message("Select the files to export frames of.")
+            return
+
+        from gifviewer.gui.exportdialog import ExportDialog
+        from gifviewer.workers import FrameExportThread
+
+        folder = self._export_folder or self._folder_browser.current_folder / "frames"
+        dialog = ExportDialog(len(rows), folder, self._view)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+
+        self._export_folder = dialog.output_folder()
+        self._export_results = []
+        self._export_thread = FrameExportThread(
+            [self._list_model.file_path(index) for index in rows],
+            self._export_folder,
+            dialog.selection(),
+            dialog.sheet_columns(),
+            self,
+        )
+        # noinspection PyUnresolvedReferences
+        self._export_thread.file_exported.connect(self._file_exported)
+        # noinspection PyUnresolvedReferences
+        self._export_thread.finished.connect(self._export_finished)
+        QCoreApplication.instance().aboutToQuit.connect(self._cancel_export)
+        self._view.update_status_message(f"Exporting frames of {len(rows)} files...")
+        self._export_thread.start()
+
+    @pyqtSlot(object)  # FrameExportThread::file_exported()
+    def _file_exported(self, result: "ExportResult") -> None:
+        self._export_results.append(result)
+        self._view.update_status_message(
+            f"Exported frames of {len(self._export_results)} files"
+            f" to {self._export_thread.folder.as_posix()}..."
+        )
+
+    @pyqtSlot()  # QThread::finished()
+    def _export_finished(self) -> None:
+        frames = sum(result.frames for result in self._export_results)
+        message = (
+            f"Exported {frames} frames of {len(self._export_results)} files"
+            f" to {self._export_thread.folder.as_posix()}."
+        )
+        if failed := [result for result in self._export_results if result.error]:
+            message += (
+                f" {len(failed)} failed: {failed[0].path.name}: {failed[0].error}"
+            )
+        self._view.update_status_message(message)
+        QCoreApplication.instance().aboutToQuit.disconnect(self._cancel_export)
+        self._export_thread.deleteLater()
+        self._export_thread = None
+
+    @pyqtSlot()  # QCoreApplication::aboutToQuit()
+    def _cancel_export(self) -> None:
+        if self._export_thread is not None:
+            self._export_thread.cancel()
+            self._export_thread.wait()
+
+    @pyqtSlot(bool)  # QAction::triggered()
+    def _optimize(self, _: bool) -> None:
+        if self._optimize_thread is not None:
+            self._view.update_status_message("Files are still being optimized.")
+            return
+        if not (rows := sorted(self._view.gif_list.selectionModel().selectedRows())):
+            self._view.update_status_message("Select the files to optimize.")
+            return
+
+        from gifviewer.gui.optimizedialog import OptimizeDialog
+        from gifviewer.workers import OptimizeThread
+
+        folder = (
+            self._optimize_folder or self._folder_browser.current_folder / "optimized"
+        )
+        dialog = OptimizeDialog(len(rows), folder, self._view)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+
+        if (output := dialog.output_folder()) is not None:
+            self._optimize_folder = output
+        self._optimize_results = []
+        self._optimize_thread = OptimizeThread(
+            [self._list_model.file_path(index) for index in rows],
+            output,
+            dialog.reduced_colors(),
+            self,
+        )
+        # noinspection PyUnresolvedReferences
+        self._optimize_thread.file_optimized.connect(self._file_optimized)
+        # noinspection PyUnresolvedReferences
+        self._optimize_thread.finished.connect(self._optimize_finished)
+        QCoreApplication.instance().aboutToQuit.connect(self._cancel_optimize)
+        self._view.update_status_message(f"Optimizing {len(rows)} files...")
+        self._optimize_thread.start()
+
+    @pyqtSlot(object)  # OptimizeThread::file_optimized()
+    def _file_optimized(self, result: "OptimizeResult") -> None:
+        self._optimize_results.append(result)
+        self._view.update_status_message(
+            f"Optimized {len(self._optimize_results)} files..."
+        )
+
+    @pyqtSlot()  # QThread::finished()
+    def _optimize_finished(self) -> None:
+        before = sum(result.before for result in self._optimize_results)
+        saved = sum(result.saved for result in self._optimize_results)
+        message = (
+            f"Optimized {len(self._optimize_results)} files,"
+            f" saving {saved / 2**10:.0f} of {before / 2**10:.0f} KB."
+        )
+        if failed := [result for result in self._optimize_results if result.error]:
+            message += (
+                f" {len(failed)} failed: {failed[0].path.name}: {failed[0].error}"
+            )
+        self._view.update_status_message(message)
+        QCoreApplication.instance().aboutToQuit.disconnect(self._cancel_optimize)
+        self._optimize_thread.deleteLater()
+        self._optimize_thread = None
+
+    @pyqtSlot()  # QCoreApplication::aboutToQuit()
+    def _cancel_optimize(self) -> None:
+        if self._optimize_thread is not None:
+            self._optimize_thread.cancel()
+            self._optimize_thread.wait()
+
+    @pyqtSlot(bool)  # QAction::triggered()
+    def _show_cache_statistics(self, _: bool) -> None:
+        self._view.update_status_message(str(self._frame_cache.stats()))
+
+    def _record_playback_stats(self) -> None:
+        from gifviewer.playbackstats import PlaybackStats
+
+        self._playback_stats = PlaybackStats()
+        self._view.actionExportPlaybackStatistics.setVisible(True)
+        self._view.actionExportPlaybackStatistics.triggered.connect(
+            self._export_playback_stats
+        )
+        self._view.update_playback_stats("Playback: no file selected")
+
+        timer = QTimer(self)
+        # noinspection PyUnresolvedReferences
+        timer.timeout.connect(self._show_playback_stats)
+        timer.start(PLAYBACK_STATS_INTERVAL)
+
+        if settings.cl_args.playback_stats:
+            QCoreApplication.instance().aboutToQuit.connect(
+                lambda: self._playback_stats.export(
+                    Path(settings.cl_args.playback_stats)
+                )
+            )
+
+    @pyqtSlot()  # QTimer::timeout()
+    def _show_playback_stats(self) -> None:
+        if stats := self._playback_stats.current():
+            self._view.update_playback_stats(f"Playback: {stats}")
+
+    @pyqtSlot(bool)  # QAction::triggered()
+    def _export_playback_stats(self, _: bool) -> None:
+        path, _ = QFileDialog.getSaveFileName(
+            self._view, "Export Playback Statistics", "", "JSON (*.json)"
+        )
+        if not path:
+            return
+
+        try:
+            self._playback_stats.export(Path(path))
+        except OSError as error:
+            self._view.update_status_message(f"Export failed: {error}")
+
+    @pyqtSlot(int)  # QComboBox::currentIndexChanged()
+    def _sort_key_changed(self, index: int) -> None:
+        self._list_model.set_sort_key(self._view.sort_combo.itemData(index))
+
+    @pyqtSlot()  # GifListModel::rows_arranged()
+    def _rows_arranged(self) -> None:
+        self._update_file_count_label()
+        # keep showing the playing file if it is still on the list
+        if (movie := self._view.movie()) is None:
+            return
+        if (index := self._list_model.index_of(movie.source.path)).isValid():
+            self._view.gif_list.setCurrentIndex(index)
+            self._view.gif_list.scrollTo(index)
+
+    def _update_file_count_label(self) -> None:
+        if self._list_model.filtered:
+            self._view.update_file_count_label(
+                self._model.count, self._list_model.rowCount()
+            )
+        else:
+            self._view.update_file_count_label(self._model.count)
+
+    def _scan_folders(self, roots: list[Path]) -> None:
+        self._prefetcher.cancel_all()
+        self._view.search_box.clear()
+        self._view.single_step.setChecked(False)
+        self._view.reset()
+        self._view.single_step.setEnabled(False)
+        self._view.loop.setEnabled(False)
+        folders = ", ".join(root.as_posix() for root in roots)
+        self._view.update_status_message(f"Scanning {folders}...")
+        self._model.update_files(roots, self._scan_options)
+
+    @pyqtSlot()  # MainViewModel::scan_finished()
+    def _scan_finished(self) -> None:
+        # handles the folder containing no gif files
+        if not self._model.files:
+            self._view.clear_status_message()
+            return
+
+        self._update_status_bar()
+        if len(counts := self._model.root_counts) > 1:
+            self._view.update_status_message(
+                "Found "
+                + ", ".join(
+                    f"{count} in {root.as_posix()}" for root, count in counts.items()
+                )
+                + "."
+            )
+
+    @pyqtSlot(QModelIndex, QModelIndex)  # QItemSelectionModel::currentChanged()
+    def _current_index_changed(self, index: QModelIndex, _) -> None:
+        # there is no current index after the list is cleared
+        if not index.isValid():
+            return
+
+        # rearranging the list selects the playing file again
+        path = self._list_model.file_path(index)
+        if (movie := self._view.movie()) is None or movie.source.path != path:
+            self._set_gif_display_movie_from_string(path)
+        self._prefetcher.prefetch(
+            self._prefetcher.neighbours(self._list_model.visible_files, index.row())
+        )
 
     def _loop_toggled(self, checked: bool) -> None:
         if checked:
@@ -69,38 +487,53 @@ class MainViewController(QObject):
             QPalette.Base,
             self.ANIMATION_PLAYING_FRAME_COLOR,
         )
-        self._view.gif_display.movie().start()
+        self._view.movie().start()
 
-    @pyqtSlot(list)
+    @pyqtSlot(list)  # MainViewModel::files_added()
     def _populate_gif_list(self, files: list[Path]) -> None:
-        # handles the folder containing no gif files
-        if not files:
-            self._view.single_step.setEnabled(False)
-            self._view.loop.setEnabled(False)
-            return
-
-        # populate widget
-        for file in files:
-            list_widget_item = QListWidgetItem(file.name)
-            list_widget_item.file_path = file
-            self._view.gif_list.addItem(list_widget_item)
-
-        # update
+        # the list model inserts the rows itself, only the first batch
+        # needs the controls set up
         self._view.update_file_count_label(self._model.count)
-        self._view.gif_list.setCurrentItem(self._view.gif_list.item(0))
+        if self._model.count == len(files):
+            self._select_first_file()
+
+    def _select_first_file(self) -> None:
+        self._view.gif_list.setCurrentIndex(self._list_model.index(0))
         self._view.update_speed_slider(self._model.speed)
-        self._update_status_bar()
 
         self._view.single_step.setEnabled(True)
         self._view.loop.setEnabled(True)
 
+    @pyqtSlot(list)  # MainViewModel::files_inserted(), MainViewModel::files_removed()
+    def _file_count_changed(self, _: list[int]) -> None:
+        # the list view keeps the selection on its file as rows move
+        self._update_file_count_label()
+        if self._model.count == 0:
+            self._view.single_step.setChecked(False)
+            self._view.reset()
+            self._view.single_step.setEnabled(False)
+            self._view.loop.setEnabled(False)
+            self._view.clear_status_message()
+        elif (
+            not self._view.gif_list.currentIndex().isValid()
+            and self._list_model.rowCount()
+        ):
+            self._select_first_file()
+            self._update_status_bar()
+
     @pyqtSlot(Path)
     def _set_gif_display_movie_from_string(self, path: Path) -> None:
-        def _initialize_new_movie(path_: Path) -> QMovie:
-            movie_: QMovie = QMovie(path_.as_posix())
-            # sets CacheMode to CacheAll, so we can jump to
-            # specific frames when using single step mode
-            movie_.setCacheMode(QMovie.CacheMode.CacheAll)
+        def _initialize_new_movie(path_: Path) -> GifPlayer:
+            # decoded frames are kept by the cache, so we can jump to
+            # specific frames when using single step mode and return
+            # to recently viewed files without decoding them again
+            if self._playback_stats is not None:
+                self._playback_stats.file_opened(path_, time.perf_counter())
+            movie_ = GifPlayer(
+                self._frame_cache.get(path_),
+                stats=self._playback_stats,
+                frame_skip=not settings.cl_args.no_frame_skip,
+            )
             movie_.setSpeed(self._model.speed)
             # noinspection PyUnresolvedReferences
             movie_.frameChanged.connect(self._stop_movie_if_looping_not_selected)
@@ -108,11 +541,13 @@ class MainViewController(QObject):
             movie_.updated.connect(self._update_dimensions_label)
             return movie_
 
-        current_movie: QMovie = self._view.movie()
+        # single stepping is through the frames of one gif
+        self._view.single_step.setChecked(False)
+        current_movie = self._view.movie()
         if current_movie and current_movie.state() == QMovie.MovieState.Running:
             self._view.normal_play.setChecked(True)
 
-        movie: QMovie = _initialize_new_movie(path)
+        movie = _initialize_new_movie(path)
         self._view.set_movie(movie)
         self._view.add_title_detail(path.as_posix())
 
@@ -127,6 +562,7 @@ class MainViewController(QObject):
             frame = 0
             self._view.frame_slider.setValue(frame)
             self._view.frame_number.setText(str(frame))
+            self._view.show_filmstrip_frame(self._filmstrip_model.index(frame))
             movie.jumpToFrame(frame)
 
         if not checked:
@@ -134,6 +570,10 @@ class MainViewController(QObject):
             helpers.disconnect_lambda_slots(
                 signal=self._view.frame_number.returnPressed
             )
+            self._seek_timer.stop()
+            self._seek_frame = None
+            self._frame_thumbnails.set_path(None)
+            self._filmstrip_model.set_frame_count(0)
             self._view.update_speed_controls_visibility(True)
             self._view.update_nav_controls_visibility(False)
             return
@@ -144,9 +584,10 @@ class MainViewController(QObject):
         frame_count = movie.frameCount() - 1
         self._view.frame_slider.setMaximum(frame_count)
 
-        self._view.frame_slider.valueChanged.connect(
-            lambda frame: movie.jumpToFrame(frame)
-        )
+        self._frame_thumbnails.set_path(movie.source.path)
+        self._filmstrip_model.set_frame_count(movie.frameCount())
+
+        self._view.frame_slider.valueChanged.connect(self._frame_requested)
         self._view.frame_slider.valueChanged.connect(
             lambda frame: self._view.frame_number.setText(str(frame))
         )
@@ -164,6 +605,28 @@ class MainViewController(QObject):
         self._view.update_speed_controls_visibility(False)
         self._view.update_nav_controls_visibility(True)
 
+    @pyqtSlot(int)  # QSlider::valueChanged()
+    def _frame_requested(self, frame: int) -> None:
+        self._view.show_filmstrip_frame(self._filmstrip_model.index(frame))
+        self._seek_frame = frame
+        if not self._seek_timer.isActive():
+            self._seek_pending_frame()
+
+    @pyqtSlot()  # QTimer::timeout()
+    def _seek_pending_frame(self) -> None:
+        if self._seek_frame is None or (movie := self._view.movie()) is None:
+            return
+
+        movie.jumpToFrame(self._seek_frame)
+        self._seek_frame = None
+        # started once the frame is shown, so a slow decode delays the next
+        self._seek_timer.start()
+
+    @pyqtSlot(QModelIndex, QModelIndex)  # QItemSelectionModel::currentChanged()
+    def _filmstrip_frame_chosen(self, index: QModelIndex, _) -> None:
+        if index.isValid() and index.row() != self._view.frame_slider.value():
+            self._view.frame_slider.setValue(index.row())
+
     @pyqtSlot()  # QSlider::sliderReleased()
     def _speed_changed(self) -> None:
         if movie := self._view.movie():
@@ -178,11 +641,11 @@ class MainViewController(QObject):
             QPalette.Base,
             self._original_base_role_color,
         )
-        self._view.gif_display.movie().stop()
+        self._view.movie().stop()
 
-    @pyqtSlot(int)  # QMovie::frameChanged()
+    @pyqtSlot(int)  # GifPlayer::frameChanged()
     def _stop_movie_if_looping_not_selected(self, frame_number) -> None:
-        # this method is used instead of the QMovie::finished() signal
+        # this method is used instead of the GifPlayer::finished() signal
         # because infinite looping gifs don't cause the signal to be emitted
         if self._view.loop.isChecked():
             return
@@ -195,10 +658,12 @@ class MainViewController(QObject):
     def _set_speed_text(self, speed: int) -> None:
         self._view.update_speed_label(speed)
 
-    @pyqtSlot(QRect)  # QMovie::updated()
+    @pyqtSlot(QRect)  # GifPlayer::updated()
     def _update_dimensions_label(self, _) -> None:
         movie = self._view.movie()
-        width, height = helpers.get_pixmap_dimensions(movie.currentPixmap())
+        # the frames shown may be scaled down, the gif's own size is wanted
+        size = movie.source.size
+        width, height = size.width(), size.height()
         self._view.set_dimension_text(f"Dimensions: {width} x {height}")
 
         # update only needs to happen once, when the file is selected
@@ -213,7 +678,7 @@ class MainViewController(QObject):
 
         # only show message if more than one item is on the list
         # as the first item is automatically displayed
-        if self._view.gif_list.count() > 1:
+        if self._model.count > 1:
             self._view.update_status_message("Select file to preview animation.")
 
 
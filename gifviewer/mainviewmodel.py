@@ -1,29 +1,98 @@
+import contextlib
+from collections.abc import Iterable
 from pathlib import Path
 
-from PyQt5.QtCore import QObject
+from PyQt5.QtCore import (
+    QCoreApplication,
+    QFileSystemWatcher,
+    QObject,
+    pyqtSignal,
+    pyqtSlot,
+)
+
+from gifviewer import scanner
+from gifviewer.nameindex import NameIndex
+from gifviewer.pathstore import PathStore
+from gifviewer.scanner import ScanOptions
+from gifviewer.workers import FolderScanThread, FolderWatchThread, SortKeysThread
 
 DEFAULT_SPEED = 100
 
 
 class MainViewModel(QObject):
+    files_cleared = pyqtSignal()
+    files_added = pyqtSignal(list)
+    # previous index of each file, in the new order
+    files_sorted = pyqtSignal(list)
+    scan_finished = pyqtSignal()
+    # rows of the files added or removed after the scan, while watching the
+    # folder, ascending: inserted ones as the store is after the whole
+    # batch, removed ones as it was before it
+    files_inserted = pyqtSignal(list)
+    files_removed = pyqtSignal(list)
+    # the files have been ordered by every metadata sort key
+    orderings_changed = pyqtSignal()
+
     def __init__(self) -> None:
         super().__init__()
         self._count: int = 0
-        self._files = []
+        self._files = PathStore()
+        # built once a scan has sorted the files, then kept in step with them
+        self._names: NameIndex | None = None
+        self._orderings: dict | None = None
+        # counts changes to the files, to recognise results made before one
+        self._generation = 0
+        # files found below each scanned folder
+        self._roots: list[Path] = []
+        self._root_counts: dict[Path, int] = {}
         self._speed = DEFAULT_SPEED
+        self._scan_thread: FolderScanThread | None = None
+        self._watch_thread: FolderWatchThread | None = None
+        self._sort_thread: SortKeysThread | None = None
+        self._watcher = QFileSystemWatcher(self)
+
+        if (app := QCoreApplication.instance()) is not None:
+            app.aboutToQuit.connect(self.shutdown)
 
     @property
     def count(self) -> int:
         return self._count
 
     @property
-    def files(self) -> list:
+    def files(self) -> PathStore:
         return self._files
 
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def names(self) -> NameIndex | None:
+        return self._names
+
+    @property
+    def orderings(self) -> dict | None:
+        """Orderings by each metadata sort key, if up to date with the files."""
+        return self._orderings
+
+    @property
+    def roots(self) -> list[Path]:
+        """The folders the files are listed from."""
+        return self._roots
+
+    @property
+    def root_counts(self) -> dict[Path, int]:
+        """The files the last scan found below each folder, once it has."""
+        return self._root_counts
+
     @property
     def first_file(self) -> Path:
         return self._files[0]
 
+    @property
+    def scanning(self) -> bool:
+        return self._scan_thread is not None
+
     @property
     def speed(self) -> int:
         return self._speed
@@ -32,11 +101,236 @@ class MainViewModel(QObject):
     def speed(self, speed: int) -> None:
         self._speed = speed
 
-    def update_files(self, path: Path) -> None:
-        self._files = self._get_files(path)
+    def update_files(
+        self, roots: Iterable[Path], options: ScanOptions = ScanOptions()
+    ) -> None:
+        """Start scanning roots in the background, cancelling any running scan.
+
+        Files are announced in batches through files_added and
+        scan_finished is emitted once the folders have been fully walked.
+        """
+
+        self.cancel_scan()
+        self.stop_watching()
+        self.clear_files()
+        self._root_counts = {}
+
+        self._scan_thread = FolderScanThread(roots, options, self)
+        self._roots = self._scan_thread.roots
+        # noinspection PyUnresolvedReferences
+        self._scan_thread.files_found.connect(self._files_found)
+        # noinspection PyUnresolvedReferences
+        self._scan_thread.roots_counted.connect(self._roots_counted)
+        # noinspection PyUnresolvedReferences
+        self._scan_thread.listing_finished.connect(self._listing_finished)
+        # noinspection PyUnresolvedReferences
+        self._scan_thread.finished.connect(self._scan_thread_finished)
+        self._scan_thread.start()
+
+    def cancel_scan(self) -> None:
+        if self._scan_thread is None:
+            return
+
+        # the thread may still deliver queued batches; the slots below
+        # ignore anything not sent by the current scan
+        self._scan_thread.cancel()
+        self._scan_thread = None
+
+    def stop_watching(self) -> None:
+        if self._watch_thread is not None:
+            # noinspection PyUnresolvedReferences
+            self._watcher.directoryChanged.disconnect(self._watch_thread.refresh)
+            # noinspection PyUnresolvedReferences
+            self._watcher.fileChanged.disconnect(self._watch_thread.refresh)
+            self._watch_thread.cancel()
+            self._watch_thread = None
+
+        # archives are watched as the files they are
+        if watched := self._watcher.directories() + self._watcher.files():
+            self._watcher.removePaths(watched)
+
+    @pyqtSlot()  # QCoreApplication::aboutToQuit()
+    def shutdown(self) -> None:
+        """Stop every scan and watch, including cancelled ones still winding down."""
+
+        self.cancel_scan()
+        self.stop_watching()
+        self._cancel_sorting()
+        for thread in self.findChildren(
+            (FolderScanThread, FolderWatchThread, SortKeysThread)
+        ):
+            thread.cancel()
+            thread.wait()
+
+    def add_files(self, files: list[Path]) -> None:
+        files.sort(key=scanner.name_key)
+        self._files.extend(files)
+        self._count = len(self._files)
+        self._generation += 1
+        # noinspection PyUnresolvedReferences
+        self.files_added.emit(files)
+
+    def insert_files(self, files: list[Path]) -> None:
+        """Insert files at their sorted rows, skipping any already listed."""
+
+        inserted = []
+        for file in files:
+            row = self._files.bisect_name(scanner.name_key(file))
+            # files with the same name from other directories sort together
+            start = self._files.bisect_name(scanner.name_key(file), left=True)
+            if file in (self._files[i] for i in range(start, row)):
+                continue
+
+            self._files.insert(row, file)
+            if self._names is not None:
+                self._names.insert(row, scanner.name_key(file))
+            inserted.append(file)
+        if not inserted:
+            return
+
+        self._count += len(inserted)
+        self._changed()
+        # noinspection PyUnresolvedReferences
+        self.files_inserted.emit(
+            sorted(self._files.index_sorted(file) for file in inserted)
+        )
+
+    def remove_files(self, files: list[Path]) -> None:
+        rows = set()
+        for file in files:
+            with contextlib.suppress(ValueError):
+                rows.add(self._files.index_sorted(file))
+        if not rows:
+            return
+
+        for row in sorted(rows, reverse=True):
+            del self._files[row]
+            if self._names is not None:
+                del self._names[row]
+        self._count -= len(rows)
+        self._changed()
+        # noinspection PyUnresolvedReferences
+        self.files_removed.emit(sorted(rows))
+
+    def clear_files(self) -> None:
+        self._cancel_sorting()
+        self._files.clear()
+        self._names = None
+        self._count = 0
+        self._changed()
+        # noinspection PyUnresolvedReferences
+        self.files_cleared.emit()
+
+    def sort_files(self) -> None:
+        keys = self._files.name_keys()
+        order = self._files.sort_by_name(keys)
+        self._names = NameIndex([keys[index] for index in order])
+        self._changed()
+        # noinspection PyUnresolvedReferences
+        self.files_sorted.emit(order)
+
+    @pyqtSlot(list)  # FolderScanThread::files_found()
+    def _files_found(self, files: list[Path]) -> None:
+        if self.sender() is self._scan_thread:
+            self.add_files(files)
+
+    @pyqtSlot()  # FolderScanThread::listing_finished()
+    def _listing_finished(self) -> None:
+        if self.sender() is not self._scan_thread:
+            return
+
+        self.sort_files()
+        # noinspection PyUnresolvedReferences
+        self.scan_finished.emit()
+        self._start_watching(self._scan_thread.roots, self._scan_thread.options)
+
+    @pyqtSlot(dict)  # FolderScanThread::roots_counted()
+    def _roots_counted(self, counts: dict[Path, int]) -> None:
+        if self.sender() is self._scan_thread:
+            self._root_counts = counts
+
+    def _start_watching(self, roots: list[Path], options: ScanOptions) -> None:
+        self._watch_thread = FolderWatchThread(roots, options, self)
+        # noinspection PyUnresolvedReferences
+        self._watcher.directoryChanged.connect(self._watch_thread.refresh)
+        # noinspection PyUnresolvedReferences
+        self._watcher.fileChanged.connect(self._watch_thread.refresh)
+        # noinspection PyUnresolvedReferences
+        self._watch_thread.files_changed.connect(self._files_changed)
+        # noinspection PyUnresolvedReferences
+        self._watch_thread.directories_added.connect(self._directories_added)
+        # noinspection PyUnresolvedReferences
+        self._watch_thread.directories_removed.connect(self._directories_removed)
+        # noinspection PyUnresolvedReferences
+        self._watch_thread.finished.connect(self._watch_thread_finished)
+        self._watch_thread.start()
+
+    @pyqtSlot(list, list)  # FolderWatchThread::files_changed()
+    def _files_changed(self, added: list[Path], removed: list[Path]) -> None:
+        if self.sender() is not self._watch_thread:
+            return
+
+        # a rename arrives as a removal and an addition
+        self.remove_files(removed)
+        self.insert_files(added)
+        self._start_sorting(self._watch_thread.roots)
+
+    def _changed(self) -> None:
+        self._generation += 1
+        self._orderings = None
+
+    def _start_sorting(self, roots: list[Path]) -> None:
+        self._cancel_sorting()
+        self._sort_thread = SortKeysThread(roots, self._files, self._generation, self)
+        # noinspection PyUnresolvedReferences
+        self._sort_thread.orderings_ready.connect(self._orderings_ready)
+        # noinspection PyUnresolvedReferences
+        self._sort_thread.finished.connect(self._sort_thread_finished)
+        self._sort_thread.start()
+
+    def _cancel_sorting(self) -> None:
+        if self._sort_thread is not None:
+            self._sort_thread.cancel()
+            self._sort_thread = None
+
+    @pyqtSlot(object, int)  # SortKeysThread::orderings_ready()
+    def _orderings_ready(self, orderings: dict, generation: int) -> None:
+        if self.sender() is not self._sort_thread or generation != self._generation:
+            return
+
+        self._orderings = orderings
+        # noinspection PyUnresolvedReferences
+        self.orderings_changed.emit()
+
+    @pyqtSlot(list)  # FolderWatchThread::directories_added()
+    def _directories_added(self, directories: list[str]) -> None:
+        if self.sender() is self._watch_thread and directories:
+            self._watcher.addPaths(directories)
+
+    @pyqtSlot(list)  # FolderWatchThread::directories_removed()
+    def _directories_removed(self, directories: list[str]) -> None:
+        if self.sender() is self._watch_thread and directories:
+            self._watcher.removePaths(directories)
+
+    @pyqtSlot()  # QThread::finished()
+    def _scan_thread_finished(self) -> None:
+        thread = self.sender()
+        thread.deleteLater()
+        if thread is self._scan_thread:
+            self._scan_thread = None
+            # the scan has read the metadata the orderings are made from
+            self._start_sorting(thread.roots)
 
-    def _get_files(self, path: Path) -> list[Path]:
-        files = [Path(file) for file in path.rglob("*.gif")]
-        self._count = len(files)
+    @pyqtSlot()  # QThread::finished()
+    def _sort_thread_finished(self) -> None:
+        thread = self.sender()
+        thread.deleteLater()
+        if thread is self._sort_thread:
+            self._sort_thread = None
 
-        return sorted(files, key=lambda p: p.name.lower())
+    @pyqtSlot()  # QThread::finished()
+    def _watch_thread_finished(self) -> None:
+        thread = self.sender()
+        thread.deleteLater()
+        if thread is self._watch_thread:
+            self._watch_thread = None
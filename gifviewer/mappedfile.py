@@ -0,0 +1,48 @@
+"""Files read by Qt straight from a memory map."""
+
+import mmap
+from pathlib import Path
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QImageReader
+
+from gifviewer import gifinfo
+
+
+class MappedFile:
+    """A file memory mapped and opened as a read only QIODevice.
+
+    The device's byte array is a raw view of the map rather than a copy,
+    so Qt reads the file from the page cache without any read calls, and
+    opening a file again costs no more than mapping it. The view does not
+    keep the map alive: close the file only once nothing reads the device.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Raises OSError if path cannot be opened."""
+
+        self._data = gifinfo.map_file(path)
+        self._bytes = QByteArray.fromRawData(self._data)
+        self._device = QBuffer(self._bytes)
+        self._device.open(QIODevice.OpenModeFlag.ReadOnly)
+
+    def __enter__(self) -> "MappedFile":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    @property
+    def device(self) -> QIODevice:
+        return self._device
+
+    def reader(self) -> QImageReader:
+        """Return a reader of the device, which must not outlive the file."""
+        return QImageReader(self._device)
+
+    def close(self) -> None:
+        self._device.close()
+        self._bytes = QByteArray()
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
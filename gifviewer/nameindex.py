@@ -0,0 +1,202 @@
+"""Searchable index of the lowercased names of a name-sorted file list."""
+
+import bisect
+from array import array
+from collections.abc import Callable, Sequence
+
+# names per block; small enough to split quickly, large enough that a
+# million names make only about a thousand blocks to test
+BLOCK_SIZE = 1024
+# bits in a block's trigram signature, sparse enough to rule out most blocks
+SIGNATURE_BITS = 1 << 14
+PREFIX = "^"
+# names may hold any character but NUL
+_SEPARATOR = "\0"
+_HIGHEST = chr(0x10FFFF)
+
+
+def matches(key: str, query: str) -> bool:
+    """Return whether the name key matches query, as search() would."""
+
+    if query.startswith(PREFIX):
+        return key.startswith(query[len(PREFIX) :])
+    return query in key
+
+
+def signature(text: str) -> int:
+    """Return a bit set with a bit for each trigram in text.
+
+    Hashed trigrams share bits, so a query whose bits are not all set in
+    a block's signature cannot be in it, while one whose bits are still
+    has to be looked for. str hashes differ between processes, so
+    signatures are only valid in the one that made them.
+    """
+
+    bits = bytearray(SIGNATURE_BITS // 8)
+    # zip makes the trigrams faster than slicing, most of them are repeats
+    for trigram in set(map("".join, zip(text, text[1:], text[2:]))):
+        bit = hash(trigram) & (SIGNATURE_BITS - 1)
+        bits[bit >> 3] |= 1 << (bit & 7)
+    return int.from_bytes(bits, "little")
+
+
+class NameIndex:
+    """The name keys of a PathStore sorted by name, in the same order.
+
+    Names are kept as blocks of joined strings. A substring query
+    is first looked for in whole blocks, using str's own search, and only
+    blocks that contain it are split into names, so a query costs little
+    more than a scan of the joined text. Once prepare() has given each
+    block a trigram signature, blocks whose signature rules a query out
+    are not even scanned. A query starting with ^ matches name prefixes,
+    which being sorted are found by binary search.
+
+    Entries are addressed by their index in the store. search() may run
+    on another thread against a snapshot() while this index is changed.
+    """
+
+    def __init__(self, keys: Sequence[str] = ()) -> None:
+        self._blocks: list[str] = []
+        self._firsts: list[str] = []
+        self._starts: list[int] = []
+        self._sizes: list[int] = []
+        # by block text, shared with snapshots, so signatures made for one
+        # serve them all and only changed blocks need new ones
+        self._signatures: dict[str, int] = {}
+        self._length = len(keys)
+        for start in range(0, len(keys), BLOCK_SIZE):
+            block = keys[start : start + BLOCK_SIZE]
+            self._blocks.append(_SEPARATOR.join(block))
+            self._firsts.append(block[0])
+            self._starts.append(start)
+            self._sizes.append(len(block))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def snapshot(self) -> "NameIndex":
+        """Return a copy that later changes to this index leave alone."""
+
+        copy = NameIndex()
+        # the blocks are immutable strings, only the lists need copying
+        copy._blocks = self._blocks.copy()
+        copy._firsts = self._firsts.copy()
+        copy._starts = self._starts.copy()
+        copy._sizes = self._sizes.copy()
+        copy._signatures = self._signatures
+        copy._length = self._length
+        return copy
+
+    def insert(self, index: int, key: str) -> None:
+        if not self._blocks:
+            self._blocks.append(key)
+            self._firsts.append(key)
+            self._starts.append(0)
+            self._sizes.append(1)
+            self._length = 1
+            return
+
+        block = max(bisect.bisect_right(self._starts, index) - 1, 0)
+        keys = self._keys(block)
+        keys.insert(index - self._starts[block], key)
+        self._length += 1
+        if len(keys) > 2 * BLOCK_SIZE:
+            middle = len(keys) // 2
+            self._store(block, keys[:middle])
+            self._blocks.insert(block + 1, "")
+            self._firsts.insert(block + 1, "")
+            self._starts.insert(block + 1, 0)
+            self._sizes.insert(block + 1, 0)
+            self._store(block + 1, keys[middle:])
+        else:
+            self._store(block, keys)
+        self._renumber(block)
+
+    def __delitem__(self, index: int) -> None:
+        block = bisect.bisect_right(self._starts, index) - 1
+        keys = self._keys(block)
+        del keys[index - self._starts[block]]
+        self._length -= 1
+        if keys:
+            self._store(block, keys)
+        else:
+            self._signatures.pop(self._blocks[block], None)
+            del self._blocks[block]
+            del self._firsts[block]
+            del self._starts[block]
+            del self._sizes[block]
+        self._renumber(block)
+
+    def prepare(self, *, cancelled: Callable[[], bool] = lambda: False) -> bool:
+        """Give every block a signature; returns False if cancelled first.
+
+        Slow for large indexes, so meant for a worker thread. Work done
+        before cancelling is kept.
+        """
+
+        for text in self._blocks:
+            if cancelled():
+                return False
+            if text not in self._signatures:
+                self._signatures[text] = signature(text)
+        return True
+
+    def search(
+        self, query: str, *, cancelled: Callable[[], bool] = lambda: False
+    ) -> array | None:
+        """Return the indexes of the entries matching query, in order.
+
+        Returns None if cancelled.
+        """
+
+        query = query.replace(_SEPARATOR, "")
+        if query.startswith(PREFIX):
+            low, high = self._prefix_range(query[len(PREFIX) :])
+            return array("L", range(low, high))
+
+        # a query shorter than a trigram has no bits, and no block is ruled out
+        wanted = signature(query)
+        found = array("L")
+        for block, text in enumerate(self._blocks):
+            if cancelled():
+                return None
+            if (known := self._signatures.get(text)) is not None and (
+                known & wanted != wanted
+            ):
+                continue
+            if query not in text:
+                continue
+
+            start = self._starts[block]
+            found.extend(
+                start + offset
+                for offset, key in enumerate(text.split(_SEPARATOR))
+                if query in key
+            )
+        return found
+
+    def _prefix_range(self, prefix: str) -> tuple[int, int]:
+        return self._bisect(prefix), self._bisect(prefix + _HIGHEST)
+
+    def _bisect(self, key: str) -> int:
+        """Return the index of the first entry not below key."""
+
+        block = bisect.bisect_left(self._firsts, key) - 1
+        if block < 0:
+            return 0
+        return self._starts[block] + bisect.bisect_left(self._keys(block), key)
+
+    def _keys(self, block: int) -> list[str]:
+        return self._blocks[block].split(_SEPARATOR)
+
+    def _store(self, block: int, keys: list[str]) -> None:
+        self._signatures.pop(self._blocks[block], None)
+        self._blocks[block] = _SEPARATOR.join(keys)
+        self._firsts[block] = keys[0]
+        self._sizes[block] = len(keys)
+
+    def _renumber(self, block: int) -> None:
+        start = self._starts[block - 1] + self._sizes[block - 1] if block else 0
+        for number in range(block, len(self._blocks)):
+            self._starts[number] = start
+            start += self._sizes[number]
@@ -0,0 +1,139 @@
+"""Gif decoding with NumPy, an alternative to Qt's decoder.
+
+Image data is decompressed by the pure Python LZW decoder; palette lookup,
+deinterlacing, transparency and disposal are array operations on a canvas
+of 32 bit pixels. Frames reach Qt as QImages over the arrays' own memory.
+
+Needs NumPy, which gifviewer does not otherwise depend on.
+"""
+
+import numpy as np
+from PyQt5.QtGui import QImage
+
+from gifviewer import lzw
+from gifviewer.framestream import FrameStream
+from gifviewer.gifinfo import FrameInfo
+
+_OPAQUE = np.uint32(0xFF000000)
+
+
+class ArrayImage(QImage):
+    """A QImage over the pixels of an array, which it keeps alive."""
+
+    def __init__(self, array: np.ndarray) -> None:
+        height, width = array.shape
+        super().__init__(
+            array.data,
+            width,
+            height,
+            array.strides[0],
+            QImage.Format.Format_ARGB32_Premultiplied,
+        )
+        self._array = array
+
+
+def palette(table: bytes) -> np.ndarray:
+    """Return a colour table as 256 opaque premultiplied argb pixels."""
+
+    rgb = np.zeros((256, 3), dtype=np.uint32)
+    colours = np.frombuffer(table, dtype=np.uint8)[: 256 * 3]
+    rgb[: len(colours) // 3] = colours[: len(colours) // 3 * 3].reshape(-1, 3)
+    return _OPAQUE | rgb[:, 0] << 16 | rgb[:, 1] << 8 | rgb[:, 2]
+
+
+def interlaced_rows(height: int) -> np.ndarray:
+    """Return the canvas row of each row of an interlaced image, in order."""
+
+    return np.concatenate(
+        (
+            np.arange(0, height, 8),
+            np.arange(4, height, 8),
+            np.arange(2, height, 4),
+            np.arange(1, height, 2),
+        )
+    )
+
+
+class NumpyFrameStream(FrameStream):
+    """A FrameStream whose canvas is an array of premultiplied argb pixels.
+
+    Transparent pixels are stored as zero, so every pixel is valid in
+    premultiplied form without any conversion.
+    """
+
+    def __init__(self, path, **kwargs) -> None:
+        super().__init__(path, **kwargs)
+        data = self._data
+        self._global_palette = (
+            palette(data[13 : self._info.header_end])
+            if self._info.global_color_table
+            else None
+        )
+
+    def _new_canvas(self) -> np.ndarray:
+        return np.zeros((self._info.height, self._info.width), dtype=np.uint32)
+
+    @staticmethod
+    def _snapshot(image: np.ndarray) -> np.ndarray:
+        return image.copy()
+
+    @staticmethod
+    def _to_qimage(image: np.ndarray) -> QImage:
+        return ArrayImage(image)
+
+    @staticmethod
+    def _image_bytes(image: np.ndarray) -> tuple[int, int]:
+        return id(image), image.nbytes
+
+    @staticmethod
+    def _clear(image: np.ndarray, frame: FrameInfo) -> None:
+        image[
+            frame.top : frame.top + frame.height, frame.left : frame.left + frame.width
+        ] = 0
+
+    def _draw(self, image: np.ndarray, frame: FrameInfo) -> None:
+        # only the part of the frame on the canvas is drawn
+        height = min(frame.height, image.shape[0] - frame.top)
+        width = min(frame.width, image.shape[1] - frame.left)
+        if height <= 0 or width <= 0:
+            return
+
+        indexes, colours = self._decode(frame)
+        indexes = indexes[:height, :width]
+        target = image[frame.top : frame.top + height, frame.left : frame.left + width]
+        if frame.transparent_index is None:
+            np.take(colours, indexes, out=target)
+        else:
+            np.copyto(
+                target,
+                colours[indexes],
+                where=indexes != frame.transparent_index,
+            )
+
+    def _decode(self, frame: FrameInfo) -> tuple[np.ndarray, np.ndarray]:
+        """Return the colour indexes of frame, by canvas row, and its palette."""
+
+        data = self._data
+        pos = frame.image_offset + 10
+        packed = data[frame.image_offset + 9]
+        if frame.local_color_table:
+            table_end = pos + (3 << ((packed & 0x07) + 1))
+            colours = palette(data[pos:table_end])
+            pos = table_end
+        elif self._global_palette is not None:
+            colours = self._global_palette
+        else:
+            colours = palette(b"")
+
+        pixel_count = frame.width * frame.height
+        min_code_size, compressed = lzw.image_data(data, pos)
+        decoded = lzw.decode(compressed, min_code_size, pixel_count)
+        indexes = np.zeros(pixel_count, dtype=np.uint8)
+        indexes[: len(decoded)] = np.frombuffer(decoded, dtype=np.uint8)
+        indexes = indexes.reshape(frame.height, frame.width)
+
+        if frame.interlaced:
+            ordered = np.empty_like(indexes)
+            ordered[interlaced_rows(frame.height)] = indexes
+            indexes = ordered
+        return indexes, colours
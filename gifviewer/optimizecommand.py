@@ -0,0 +1,88 @@
+"""Headless optimizing, run as ``cli.py optimize GIF_OR_FOLDER...``.
+
+Gifs given directly are optimized as they are; folders are searched for
+gifs the way the viewer scans them. Uses Qt's image classes but starts
+no application, so no display is needed.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from gifviewer import archives, scanner
+from gifviewer.gifwriter import MAX_PALETTE_COLORS, MIN_PALETTE_COLORS
+
+
+def main(args: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog=f"{Path(sys.argv[0]).name} optimize",
+        description="Shrink gifs by encoding them again, replacing each one"
+        " that comes out smaller.",
+    )
+    parser.add_argument(
+        "paths",
+        type=Path,
+        nargs="+",
+        metavar="GIF_OR_FOLDER",
+        help="gifs, or folders to find gifs in",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="folder to write the gifs to, leaving the originals as they are",
+    )
+    parser.add_argument(
+        "--colors",
+        type=int,
+        metavar="N",
+        help=f"reduce each gif to N colours, {MIN_PALETTE_COLORS} to"
+        f" {MAX_PALETTE_COLORS}; loses detail",
+    )
+    parser.add_argument(
+        "--jobs", type=int, help="encoding processes (default: one per cpu)"
+    )
+    scanner.add_scan_arguments(parser)
+    options = parser.parse_args(args)
+    for path in options.paths:
+        try:
+            archives.stat(path)
+        except OSError:
+            parser.error(f"no such file or folder: {path}")
+    if (
+        options.colors is not None
+        and not MIN_PALETTE_COLORS <= options.colors <= MAX_PALETTE_COLORS
+    ):
+        parser.error(
+            f"--colors must be from {MIN_PALETTE_COLORS} to {MAX_PALETTE_COLORS}"
+        )
+    if options.jobs is not None and options.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    # Qt is imported only once there is something to optimize
+    from gifviewer.optimizer import optimize_files
+
+    paths = scanner.gif_paths(options.paths, scanner.ScanOptions.from_args(options))
+    before = after = errors = 0
+    for result in optimize_files(
+        paths, output=options.output, colors=options.colors, jobs=options.jobs
+    ):
+        if result.error is None:
+            print(
+                f"{result.path}: {result.before} -> {result.after} bytes"
+                f" ({_percent(result.saved, result.before)} smaller)"
+            )
+        else:
+            print(f"{result.path}: {result.error}", file=sys.stderr)
+            errors += 1
+        before += result.before
+        after += result.after
+
+    print(
+        f"{len(paths)} files: {before} -> {after} bytes"
+        f" ({_percent(before - after, before)} smaller)"
+    )
+    return 1 if errors else 0
+
+
+def _percent(part: int, whole: int) -> str:
+    return f"{part / whole:.0%}" if whole else "0%"
@@ -0,0 +1,514 @@
+"""Shrinking gifs by encoding them again, in bulk.
+
+Each gif is composed a frame at a time by a FrameStream and written anew.
+A frame identical to the one before it only lengthens that one's delay.
+Every other frame is cropped to the rectangle that changed on the canvas,
+and the pixels inside it that did not change are made transparent, which
+leaves long runs of one index for LZW to compress. Colours go into the
+global colour table while it has room, and into local tables after that.
+Optionally the colours are first reduced to a palette chosen by median
+cut over frames sampled through the animation, which loses detail.
+
+The gif written is decoded again and compared with the canvases it was
+encoded from, and replaces the original only if it is smaller. It is
+written to a temporary file beside its target and renamed over it, so
+no target is ever left half written. Files are optimized on a pool of
+processes.
+
+Uses Qt's image classes but no application, so it runs headless.
+"""
+
+import hashlib
+import mmap
+import multiprocessing
+import os
+import shutil
+from collections import Counter
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import NamedTuple
+
+from PyQt5.QtGui import QImage
+
+from gifviewer import archives, gifinfo, gifwriter
+from gifviewer.frameexport import output_stems
+from gifviewer.framestream import FrameStream
+from gifviewer.player import MIN_DELAY_MS
+
+PALETTE_FRAMES = 32  # frames sampled to choose a reduced palette from
+JOBS_PER_PROCESS = 2  # files queued per process, to keep them all busy
+
+# disposal methods
+_KEEP = 1
+_CLEAR = 2
+
+_TRANSPARENT = 0  # index of transparency, and a transparent canvas pixel
+_PIXEL = b"\0\0\0\0"  # the bytes of a transparent canvas pixel
+_CANVAS_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+
+
+class OptimizeResult(NamedTuple):
+    path: Path
+    before: int  # bytes
+    after: int  # bytes, the same as before if the file was kept as it was
+    error: str | None = None
+
+    @property
+    def saved(self) -> int:
+        return self.before - self.after
+
+
+class EncodeError(Exception):
+    """The frames cannot be written as a gif without losing colours."""
+
+
+def optimize_files(
+    paths: Sequence[Path],
+    *,
+    output: Path | None = None,
+    colors: int | None = None,
+    jobs: int | None = None,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> Iterator[OptimizeResult]:
+    """Optimize each gif, replacing it or writing it into folder output.
+
+    colors reduces each gif to a palette of that many colours. Yields a
+    result for each gif as it is finished, in no particular order. Stops
+    as soon as cancelled() returns True, leaving the gifs being optimized
+    as they were.
+    """
+
+    jobs = jobs or os.cpu_count() or 1
+    targets = list(paths)
+    if output is not None:
+        output.mkdir(parents=True, exist_ok=True)
+        targets = [output / f"{stem}.gif" for stem in output_stems(paths)]
+
+    # spawned rather than forked, since the GUI optimizes with threads running
+    with ProcessPoolExecutor(
+        jobs, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        pending = set()
+        for path, target in zip(paths, targets):
+            pending.add(pool.submit(optimize_file, path, target, colors))
+            if len(pending) < jobs * JOBS_PER_PROCESS:
+                continue
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield future.result()
+            if cancelled():
+                pool.shutdown(cancel_futures=True)
+                return
+
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield future.result()
+            if cancelled():
+                pool.shutdown(cancel_futures=True)
+                return
+
+
+def optimize_file(path: Path, target: Path, colors: int | None) -> OptimizeResult:
+    """Write the smaller of path optimized and path as it is to target."""
+
+    try:
+        before = archives.stat(path).st_size
+    except OSError as error:
+        return OptimizeResult(path, 0, 0, str(error))
+    if target == path and archives.split(path) is not None:
+        return OptimizeResult(
+            path, before, before, "cannot replace a file inside an archive"
+        )
+
+    temporary = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        stream = FrameStream(path, window=1)
+        try:
+            encoded = encode(stream, colors, before)
+        finally:
+            stream.close()
+
+        if encoded is not None:
+            data, expected = encoded
+            temporary.write_bytes(data)
+            _verify(temporary, expected)
+            if target == path:
+                shutil.copymode(path, temporary)
+        elif target != path:
+            # the output folder gets every gif, even those that did not shrink
+            _copy(path, temporary)
+        else:
+            return OptimizeResult(path, before, before)
+        os.replace(temporary, target)
+    except (OSError, gifinfo.GifFormatError, EncodeError) as error:
+        temporary.unlink(missing_ok=True)
+        return OptimizeResult(path, before, before, str(error))
+    return OptimizeResult(path, before, before if encoded is None else len(data))
+
+
+def encode(
+    stream: FrameStream, colors: int | None = None, limit: int | None = None
+) -> tuple[bytes, list[tuple[bytes, int]]] | None:
+    """Return the frames of stream as a gif, with the digest and delay of
+    each canvas it composes to.
+
+    colors reduces the gif to a palette of that many colours. Returns None
+    as soon as the gif comes to limit bytes, since it is no use then.
+    Raises EncodeError if a frame cannot be written.
+    """
+
+    size = stream.size
+    table = None if colors is None else [_TRANSPARENT, *_palette(stream, colors)]
+    encoder = _Encoder(size.width(), size.height())
+    for number in range(stream.frame_count):
+        image = stream.frame(number)
+        if table is not None:
+            image = image.convertToFormat(QImage.Format.Format_Indexed8, table)
+        image = image.convertToFormat(_CANVAS_FORMAT)
+        encoder.add(
+            image.constBits().asstring(image.sizeInBytes()), stream.delay(number)
+        )
+        if limit is not None and encoder.size >= limit:
+            return None
+
+    data = encoder.finish(stream.info.loop_count)
+    if limit is not None and len(data) >= limit:
+        return None
+    return data, encoder.canvases
+
+
+class _Frame:
+    """A composed canvas and how it is to be written."""
+
+    __slots__ = ("canvas", "base", "rect", "delay", "disposal")
+
+    def __init__(
+        self, canvas: bytes, base: bytes, rect: tuple[int, int, int, int], delay: int
+    ) -> None:
+        self.canvas = canvas
+        # the canvas it is drawn on, which its transparent pixels show
+        self.base = base
+        self.rect = rect  # left, top, right, bottom
+        self.delay = delay
+        self.disposal = _KEEP
+
+
+class _Encoder:
+    """Turns composed canvases into gif frames.
+
+    Each frame is held back until the next is known, since whether it must
+    be cleared after it is shown depends on the next.
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        self._width = width
+        self._height = height
+        self._blank = bytes(width * height * 4)
+        self._global = [_TRANSPARENT]
+        self._global_indexes: dict[int, int] = {}
+        self._frames: list[bytes] = []
+        self.size = 0  # bytes of the frames written so far
+        self._pending: _Frame | None = None
+        # the digest and delay of each canvas written
+        self.canvases: list[tuple[bytes, int]] = []
+
+    def add(self, canvas: bytes, delay: int) -> None:
+        pending = self._pending
+        if (
+            pending is not None
+            and canvas == pending.canvas
+            and MIN_DELAY_MS < delay
+            and MIN_DELAY_MS < pending.delay
+            and pending.delay + delay <= gifwriter.MAX_DELAY_MS
+        ):
+            pending.delay += delay
+            return
+
+        base = self._blank
+        if pending is not None:
+            base = pending.canvas
+            if self._uncovers(canvas, base):
+                # pixels turning transparent need the frame before cleared
+                pending.disposal = _CLEAR
+                base = self._cleared(base, pending.rect)
+                if self._uncovers(canvas, base):
+                    pending.rect = (0, 0, self._width, self._height)
+                    base = self._blank
+            self._write(pending)
+
+        rect = self._changed_rect(canvas, base) or (0, 0, 1, 1)
+        self._pending = _Frame(canvas, base, rect, delay)
+
+    def finish(self, loop_count: int | None) -> bytes:
+        if self._pending is not None:
+            self._write(self._pending)
+            self._pending = None
+        return b"".join(
+            (
+                gifwriter.header(
+                    self._width, self._height, _rgb(self._global), loop_count
+                ),
+                *self._frames,
+                gifwriter.trailer(),
+            )
+        )
+
+    def _rows(
+        self, canvas: bytes, left: int, top: int, right: int, bottom: int
+    ) -> list[bytes]:
+        stride = self._width * 4
+        return [
+            canvas[y * stride + left * 4 : y * stride + right * 4]
+            for y in range(top, bottom)
+        ]
+
+    def _changed_rect(
+        self, canvas: bytes, base: bytes
+    ) -> tuple[int, int, int, int] | None:
+        """Return the smallest rectangle holding every pixel that differs."""
+
+        pairs = list(
+            zip(
+                self._rows(canvas, 0, 0, self._width, self._height),
+                self._rows(base, 0, 0, self._width, self._height),
+            )
+        )
+        changed = [y for y, (row, base_row) in enumerate(pairs) if row != base_row]
+        if not changed:
+            return None
+
+        left, right = self._width, 0
+        for y in changed:
+            row, base_row = pairs[y]
+            if row[: left * 4] != base_row[: left * 4]:
+                left = _first_difference(row, base_row, 0, left)
+            if row[right * 4 :] != base_row[right * 4 :]:
+                right = _last_difference(row, base_row, right, self._width) + 1
+        return left, changed[0], right, changed[-1] + 1
+
+    def _uncovers(self, canvas: bytes, base: bytes) -> bool:
+        """Return whether canvas is transparent anywhere base is not, which
+        no frame drawn on base can make it."""
+
+        if _PIXEL not in canvas:
+            # every pixel is opaque or transparent, with an alpha byte in
+            # every four, so four zero bytes are found only in a transparent one
+            return False
+        for row, base_row in zip(
+            self._rows(canvas, 0, 0, self._width, self._height),
+            self._rows(base, 0, 0, self._width, self._height),
+        ):
+            if _PIXEL in row and any(
+                pixel == _TRANSPARENT and base_pixel != _TRANSPARENT
+                for pixel, base_pixel in zip(_pixels(row), _pixels(base_row))
+            ):
+                return True
+        return False
+
+    def _cleared(self, canvas: bytes, rect: tuple[int, int, int, int]) -> bytes:
+        left, top, right, bottom = rect
+        cleared = bytearray(canvas)
+        stride = self._width * 4
+        for y in range(top, bottom):
+            cleared[y * stride + left * 4 : y * stride + right * 4] = bytes(
+                (right - left) * 4
+            )
+        return bytes(cleared)
+
+    def _write(self, frame: _Frame) -> None:
+        left, top, right, bottom = frame.rect
+        width, height = right - left, bottom - top
+        pixels = b"".join(self._rows(frame.canvas, left, top, right, bottom))
+        changed = _unchanged_cleared(
+            pixels, b"".join(self._rows(frame.base, left, top, right, bottom))
+        )
+
+        # only the changed pixels need a colour of their own
+        colors = set(_pixels(changed))
+        colors.discard(_TRANSPARENT)
+        transparent = len(colors) <= gifwriter.MAX_PALETTE_COLORS
+        if transparent:
+            pixels = changed
+        elif frame.disposal == _CLEAR or _PIXEL in pixels:
+            raise EncodeError(
+                f"a frame has {len(colors)} colours as well as transparency"
+            )
+        elif len(colors := set(_pixels(pixels))) > gifwriter.MAX_COLORS:
+            raise EncodeError(f"a frame has {len(colors)} colours")
+
+        local_colors = None
+        new_colors = colors.difference(self._global_indexes)
+        if transparent and len(self._global) + len(new_colors) <= gifwriter.MAX_COLORS:
+            for color in sorted(new_colors):
+                self._global_indexes[color] = len(self._global)
+                self._global.append(color)
+            table = self._global
+        else:
+            table = local_colors = [_TRANSPARENT] * transparent + sorted(colors)
+
+        # every colour is in the table, so Qt matches them all exactly
+        image = QImage(pixels, width, height, width * 4, _CANVAS_FORMAT)
+        data = _index_bytes(image.convertToFormat(QImage.Format.Format_Indexed8, table))
+        written = gifwriter.frame(
+            left,
+            top,
+            width,
+            height,
+            data,
+            delay_ms=frame.delay,
+            disposal=frame.disposal,
+            transparent_index=_TRANSPARENT if transparent else None,
+            local_colors=_rgb(local_colors) if local_colors else None,
+        )
+        self._frames.append(written)
+        self.size += len(written)
+        self.canvases.append((_digest(frame.canvas), frame.delay))
+
+
+def _copy(path: Path, target: Path) -> None:
+    data = gifinfo.map_file(path)
+    try:
+        target.write_bytes(data)
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+
+def _unchanged_cleared(pixels: bytes, base: bytes) -> bytes:
+    """Return pixels with those the same in base made transparent.
+
+    Works on the pixels as one large integer, so no pixel is looked at
+    from Python.
+    """
+
+    ones = int.from_bytes(b"\x01\0\0\0" * (len(pixels) // 4), "little")
+    difference = int.from_bytes(pixels, "little") ^ int.from_bytes(base, "little")
+    # fold the bytes of each pixel into its lowest, then make that 1 if
+    # it is not 0; a byte plus 0xFF carries into the next bit exactly then
+    difference |= difference >> 16
+    difference |= difference >> 8
+    changed = ((difference & ones * 0xFF) + ones * 0xFF) >> 8 & ones
+    kept = int.from_bytes(pixels, "little") & changed * 0xFFFFFFFF
+    return kept.to_bytes(len(pixels), "little")
+
+
+def _index_bytes(image: QImage) -> bytes:
+    """Return the indexes of an 8 bit image, without row padding."""
+
+    data = image.constBits().asstring(image.sizeInBytes())
+    width, stride = image.width(), image.bytesPerLine()
+    if width == stride:
+        return data
+    return b"".join(
+        data[y * stride : y * stride + width] for y in range(image.height())
+    )
+
+
+def _rgb(colors: list[int]) -> list[int]:
+    return [color & 0xFFFFFF for color in colors]
+
+
+def _pixels(row: bytes) -> memoryview:
+    return memoryview(row).cast("I")
+
+
+def _first_difference(row: bytes, base_row: bytes, start: int, end: int) -> int:
+    """Return the first pixel from start before end that differs, given
+    that one does."""
+
+    while end - start > 1:
+        middle = (start + end) // 2
+        if row[start * 4 : middle * 4] == base_row[start * 4 : middle * 4]:
+            start = middle
+        else:
+            end = middle
+    return start
+
+
+def _last_difference(row: bytes, base_row: bytes, start: int, end: int) -> int:
+    """Return the last pixel from start before end that differs, given
+    that one does."""
+
+    while end - start > 1:
+        middle = (start + end) // 2
+        if row[middle * 4 : end * 4] == base_row[middle * 4 : end * 4]:
+            end = middle
+        else:
+            start = middle
+    return start
+
+
+def _digest(canvas: bytes) -> bytes:
+    return hashlib.blake2b(canvas, digest_size=16).digest()
+
+
+def _verify(path: Path, expected: list[tuple[bytes, int]]) -> None:
+    """Raise EncodeError unless the gif at path composes to the expected
+    canvases."""
+
+    stream = FrameStream(path, window=1)
+    try:
+        if stream.frame_count != len(expected):
+            raise EncodeError("the optimized gif has frames missing")
+        for number, (digest, delay) in enumerate(expected):
+            image = stream.frame(number).convertToFormat(_CANVAS_FORMAT)
+            if (
+                _digest(image.constBits().asstring(image.sizeInBytes())) != digest
+                or stream.delay(number) != delay
+            ):
+                raise EncodeError(f"frame {number} of the optimized gif differs")
+    finally:
+        stream.close()
+
+
+def _palette(stream: FrameStream, colors: int) -> list[int]:
+    """Return up to colors opaque colours chosen by median cut from frames
+    sampled evenly through stream."""
+
+    count = stream.frame_count
+    histogram = Counter()
+    for number in sorted({n * count // PALETTE_FRAMES for n in range(PALETTE_FRAMES)}):
+        image = stream.frame(number).convertToFormat(_CANVAS_FORMAT)
+        histogram.update(_pixels(image.constBits().asstring(image.sizeInBytes())))
+    histogram.pop(_TRANSPARENT, None)
+    if not histogram:
+        return []
+
+    boxes = [list(histogram.items())]
+    while len(boxes) < colors:
+        # split the box spanning the widest range of one channel
+        spans = [_widest_channel(box) for box in boxes]
+        number = max(range(len(boxes)), key=lambda n: spans[n][0])
+        span, shift = spans[number]
+        if span == 0:
+            break
+        box = sorted(boxes.pop(number), key=lambda item: item[0] >> shift & 0xFF)
+        half = sum(weight for _, weight in box) / 2
+        total = 0
+        for cut, (_, weight) in enumerate(box[:-1], 1):
+            total += weight
+            if total >= half:
+                break
+        boxes += [box[:cut], box[cut:]]
+    return [_average(box) for box in boxes if box]
+
+
+def _widest_channel(box: list[tuple[int, int]]) -> tuple[int, int]:
+    """Return the range of the widest channel in box and its bit shift."""
+
+    spans = []
+    for shift in (16, 8, 0):
+        values = [color >> shift & 0xFF for color, _ in box]
+        spans.append((max(values) - min(values), shift))
+    return max(spans)
+
+
+def _average(box: list[tuple[int, int]]) -> int:
+    total = sum(weight for _, weight in box)
+    color = 0xFF000000
+    for shift in (16, 8, 0):
+        channel = sum((value >> shift & 0xFF) * weight for value, weight in box)
+        color |= round(channel / total) << shift
+    return color
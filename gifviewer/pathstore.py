@@ -0,0 +1,171 @@
+"""Compact storage for large lists of paths."""
+
+import contextlib
+import itertools
+import os
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+
+_SEP = os.fsencode(os.sep)
+
+
+class PathStore(Sequence):
+    """A list of paths held in one shared byte buffer.
+
+    Each path is stored once, encoded with os.fsencode, and addressed by
+    offset arrays, so a million paths cost tens of megabytes rather than
+    a million Path objects. Path objects are only built on access.
+
+    Deleted entries leave their bytes behind until they make up half of
+    the buffer, which is then compacted.
+    """
+
+    def __init__(self, paths: Iterable[Path] = ()) -> None:
+        self._buffer = bytearray()
+        self._starts = array("Q")
+        self._ends = array("Q")
+        self._garbage = 0
+        self.extend(paths)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        return Path(os.fsdecode(self._raw(index)))
+
+    def __delitem__(self, index: int) -> None:
+        self._garbage += self._ends[index] - self._starts[index]
+        del self._starts[index]
+        del self._ends[index]
+        if self._garbage > len(self._buffer) // 2:
+            self._compact()
+
+    def __iter__(self) -> Iterator[Path]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the stored paths."""
+        return (
+            len(self._buffer)
+            + self._starts.itemsize * len(self._starts)
+            + self._ends.itemsize * len(self._ends)
+        )
+
+    def append(self, path: Path) -> None:
+        self.extend((path,))
+
+    def extend(self, paths: Iterable[Path]) -> None:
+        self._extend_encoded([os.fsencode(path) for path in paths])
+
+    def insert(self, index: int, path: Path) -> None:
+        encoded = os.fsencode(path)
+        start = len(self._buffer)
+        self._buffer += encoded
+        self._starts.insert(index, start)
+        self._ends.insert(index, start + len(encoded))
+
+    def _extend_encoded(self, encoded: list[bytes]) -> None:
+        offsets = list(
+            itertools.accumulate(map(len, encoded), initial=len(self._buffer))
+        )
+        self._starts.extend(offsets[:-1])
+        self._ends.extend(offsets[1:])
+        self._buffer += b"".join(encoded)
+
+    def clear(self) -> None:
+        self._buffer = bytearray()
+        self._starts = array("Q")
+        self._ends = array("Q")
+        self._garbage = 0
+
+    def copy(self) -> "PathStore":
+        copy = PathStore()
+        copy._buffer = self._buffer.copy()
+        copy._starts = array("Q", self._starts)
+        copy._ends = array("Q", self._ends)
+        copy._garbage = self._garbage
+        return copy
+
+    def index_map(self) -> dict[bytes, int]:
+        """Return the index of each path, keyed by its os.fsencode() form."""
+        return {self._raw(index): index for index in range(len(self))}
+
+    def index(self, path: Path, start: int = 0, stop: int | None = None) -> int:
+        encoded = os.fsencode(path)
+        stop = len(self) if stop is None else stop
+        position = self._buffer.find(encoded)
+        while position != -1:
+            # a match must cover a whole entry, not part of a longer path
+            with contextlib.suppress(ValueError):
+                row = self._starts.index(position)
+                if start <= row < stop and self._ends[row] == position + len(encoded):
+                    return row
+            position = self._buffer.find(encoded, position + 1)
+
+        raise ValueError(f"{path} is not in the store")
+
+    def name(self, index: int) -> str:
+        """Return the final component of the path at index."""
+
+        start, end = self._starts[index], self._ends[index]
+        name_start = self._buffer.rfind(_SEP, start, end) + 1 or start
+        return os.fsdecode(bytes(self._buffer[name_start:end]))
+
+    def bisect_name(self, key: str, *, left: bool = False) -> int:
+        """Return where an entry named key belongs in a store sorted by name.
+
+        key is a name_key; equal names go after existing ones unless left.
+        """
+
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            name = self.name(middle).lower()
+            if name < key or (name == key and not left):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def index_sorted(self, path: Path) -> int:
+        """Return the index of path in a store sorted by name."""
+
+        encoded = os.fsencode(path)
+        key = path.name.lower()
+        index = self.bisect_name(key, left=True)
+        while index < len(self) and self.name(index).lower() == key:
+            if self._raw(index) == encoded:
+                return index
+            index += 1
+
+        raise ValueError(f"{path} is not in the store")
+
+    def name_keys(self) -> list[str]:
+        """Return the case-insensitive name of every entry."""
+        return [self.name(index).lower() for index in range(len(self))]
+
+    def sort_by_name(self, keys: list[str] | None = None) -> list[int]:
+        """Sort by case-insensitive name, given as keys if already known.
+
+        Returns the previous index of each entry, in the new order.
+        """
+
+        keys = self.name_keys() if keys is None else keys
+        order = sorted(range(len(self)), key=keys.__getitem__)
+        self._starts = array("Q", (self._starts[index] for index in order))
+        self._ends = array("Q", (self._ends[index] for index in order))
+        return order
+
+    def _raw(self, index: int) -> bytes:
+        return bytes(self._buffer[self._starts[index] : self._ends[index]])
+
+    def _compact(self) -> None:
+        encoded = [self._raw(index) for index in range(len(self))]
+        self.clear()
+        self._extend_encoded(encoded)
@@ -0,0 +1,169 @@
+"""Playback timing, recorded when the viewer runs with --playback-stats.
+
+For every frame shown, the player reports how long the frame took to
+decode, how late it was shown against its place in the schedule of
+delays, scaled by the speed, and how many frames before it were skipped
+to keep to that schedule. A frame shown after its own delay has elapsed
+is counted as dropped; it is only shown at all when playing without frame
+skipping, or as the last frame of a play. Selecting a file also records
+the time from the selection to its first frame.
+"""
+
+import collections
+import dataclasses
+import json
+import statistics
+import time
+from pathlib import Path
+
+# timers are not exact, frames shown within this of their time are on time
+LATE_TOLERANCE_MS = 10
+# frames whose timings are kept per file, for the percentiles
+SAMPLES = 2000
+
+
+@dataclasses.dataclass(slots=True)
+class TimingSummary:
+    mean_ms: float
+    p95_ms: float
+    max_ms: float
+
+    @classmethod
+    def of(cls, samples: collections.deque) -> "TimingSummary":
+        if not samples:
+            return cls(0.0, 0.0, 0.0)
+        p95 = (
+            statistics.quantiles(samples, n=20, method="inclusive")[-1]
+            if len(samples) > 1
+            else samples[0]
+        )
+        return cls(statistics.fmean(samples), p95, max(samples))
+
+
+@dataclasses.dataclass(slots=True)
+class FileStats:
+    path: str
+    speed: int
+    first_frame_ms: float | None
+    frames: int
+    scheduled_frames: int
+    late_frames: int
+    dropped_frames: int
+    skipped_frames: int
+    drift_ms: float
+    decode: TimingSummary
+    lateness: TimingSummary
+
+    def __str__(self) -> str:
+        first = "-" if self.first_frame_ms is None else f"{self.first_frame_ms:.0f}"
+        return (
+            f"first frame {first} ms | decode {self.decode.mean_ms:.1f}"
+            f"/{self.decode.p95_ms:.1f} ms | late {self.late_frames}"
+            f" dropped {self.dropped_frames} of {self.scheduled_frames}"
+            f" skipped {self.skipped_frames}"
+            f" | drift {self.drift_ms:.0f} ms"
+        )
+
+
+class _FileRecord:
+    def __init__(self, path: Path, opened: float) -> None:
+        self.path = path
+        self.opened = opened
+        self.speed = 0
+        self.first_frame_ms: float | None = None
+        self.frames = 0
+        self.scheduled_frames = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self.skipped_frames = 0
+        self.drift_ms = 0.0
+        self.decode_ms: collections.deque[float] = collections.deque(maxlen=SAMPLES)
+        self.lateness_ms: collections.deque[float] = collections.deque(maxlen=SAMPLES)
+
+    def stats(self) -> FileStats:
+        return FileStats(
+            path=str(self.path),
+            speed=self.speed,
+            first_frame_ms=self.first_frame_ms,
+            frames=self.frames,
+            scheduled_frames=self.scheduled_frames,
+            late_frames=self.late_frames,
+            dropped_frames=self.dropped_frames,
+            skipped_frames=self.skipped_frames,
+            drift_ms=self.drift_ms,
+            decode=TimingSummary.of(self.decode_ms),
+            lateness=TimingSummary.of(self.lateness_ms),
+        )
+
+
+class PlaybackStats:
+    """Collects frame timings reported by players, per file."""
+
+    def __init__(self) -> None:
+        self._records: dict[Path, _FileRecord] = {}
+        self._current: _FileRecord | None = None
+
+    def file_opened(self, path: Path, opened: float) -> None:
+        """Start timing path, selected at the perf_counter() time opened."""
+
+        if (record := self._records.get(path)) is None:
+            record = self._records[path] = _FileRecord(path, opened)
+        else:
+            # a return to the file times its first frame again
+            record.opened = opened
+            record.first_frame_ms = None
+        self._current = record
+
+    def frame_shown(
+        self,
+        decode_s: float,
+        speed: int,
+        due: float | None = None,
+        interval_s: float | None = None,
+        skipped: int = 0,
+    ) -> None:
+        """Record a frame of the current file, shown now.
+
+        due is when the frame was scheduled to be shown and interval_s
+        how long it should stay up; both are None for frames shown on
+        request, such as when stepping. skipped is the number of frames
+        passed over since the last one shown.
+        """
+
+        if (record := self._current) is None:
+            return
+
+        shown = time.perf_counter()
+        record.frames += 1
+        record.speed = speed
+        record.decode_ms.append(decode_s * 1000)
+        if record.first_frame_ms is None:
+            record.first_frame_ms = (shown - record.opened) * 1000
+
+        if due is None:
+            return
+
+        lateness_ms = max(shown - due, 0.0) * 1000
+        record.scheduled_frames += 1
+        record.skipped_frames += skipped
+        record.lateness_ms.append(lateness_ms)
+        # frames keep to a schedule, so how far behind it playback is now
+        record.drift_ms = lateness_ms
+        if lateness_ms > LATE_TOLERANCE_MS:
+            record.late_frames += 1
+        if interval_s is not None and lateness_ms >= interval_s * 1000:
+            record.dropped_frames += 1
+
+    def current(self) -> FileStats | None:
+        return None if self._current is None else self._current.stats()
+
+    def to_dict(self) -> dict:
+        return {
+            "late_tolerance_ms": LATE_TOLERANCE_MS,
+            "files": [
+                dataclasses.asdict(record.stats()) for record in self._records.values()
+            ],
+        }
+
+    def export(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
@@ -0,0 +1,227 @@
+"""Plays decoded frames.
+
+Frames keep to a schedule: each is due once the delays of those before it,
+scaled by the speed, have passed since playback started, rather than a delay
+after its predecessor happened to be shown, so late frames do not add up to
+a slower animation. Delays of 10 ms or less are played as 100 ms, as browsers
+do, since gifs declaring them were made for browsers. When the frames due
+come faster than MIN_INTERVAL_MS apart, or decoding falls behind, the frames
+whose time has already passed are skipped; the last frame of each play never
+is, so a gif that does not loop still ends on it.
+"""
+
+import time
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QObject, QRect, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QMovie, QPixmap
+
+from gifviewer.framesource import FrameSource
+
+if TYPE_CHECKING:
+    from gifviewer.playbackstats import PlaybackStats
+
+DEFAULT_SPEED = 100
+# declared delays up to MIN_DELAY_MS are played as CLAMPED_DELAY_MS
+MIN_DELAY_MS = 10
+CLAMPED_DELAY_MS = 100
+# frames are shown at most this often, about once per refresh of the screen
+MIN_INTERVAL_MS = 16
+# further behind than this, playback carries on from now instead of skipping
+MAX_CATCH_UP_MS = 1000
+
+
+def effective_delay(declared: int) -> int:
+    """Return how long a frame declaring delay declared is shown, in ms."""
+    return CLAMPED_DELAY_MS if declared <= MIN_DELAY_MS else declared
+
+
+class GifPlayer(QObject):
+    """Plays a FrameSource with the parts of the QMovie interface we use.
+
+    Unlike QMovie, the decoded frames live in the source, which outlives
+    the player, so returning to a gif does not decode it again.
+    """
+
+    frameChanged = pyqtSignal(int)
+    updated = pyqtSignal(QRect)
+    finished = pyqtSignal()
+
+    def __init__(
+        self,
+        source: FrameSource,
+        parent: QObject | None = None,
+        *,
+        stats: "PlaybackStats | None" = None,
+        frame_skip: bool = True,
+    ) -> None:
+        super().__init__(parent)
+        self._source = source
+        self._stats = stats
+        self._frame_skip = frame_skip
+        # perf_counter() times the current frame was due and shown, and the
+        # next frame is due
+        self._slot = 0.0
+        self._shown = 0.0
+        self._due: float | None = None
+        self._state = QMovie.MovieState.NotRunning
+        self._speed = DEFAULT_SPEED
+        self._frame_number = -1
+        self._next_frame_number = 0
+        self._plays = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        # noinspection PyUnresolvedReferences
+        self._timer.timeout.connect(self._load_next_frame)
+
+    @property
+    def source(self) -> FrameSource:
+        return self._source
+
+    def set_source(self, source: FrameSource) -> None:
+        """Carry on from the current frame with source, the same gif
+        decoded another way."""
+
+        self._source = source
+        if self._frame_number >= 0 and source.frame_count:
+            self._show_frame(min(self._frame_number, source.frame_count - 1))
+
+    def currentFrameNumber(self) -> int:
+        return self._frame_number
+
+    def currentImage(self) -> QImage:
+        if self._frame_number < 0:
+            return QImage()
+        return self._source.frame(self._frame_number)
+
+    def currentPixmap(self) -> QPixmap:
+        return QPixmap.fromImage(self.currentImage())
+
+    def frameCount(self) -> int:
+        return self._source.frame_count
+
+    def jumpToFrame(self, frame_number: int) -> bool:
+        if not 0 <= frame_number < self._source.frame_count:
+            return False
+
+        self._next_frame_number = frame_number + 1
+        self._show_frame(frame_number)
+        self._slot = self._shown
+        if self._state == QMovie.MovieState.Running:
+            self._schedule_next_frame()
+        return True
+
+    def setPaused(self, paused: bool) -> None:
+        if paused and self._state == QMovie.MovieState.Running:
+            self._timer.stop()
+            self._state = QMovie.MovieState.Paused
+        elif not paused and self._state == QMovie.MovieState.Paused:
+            self._state = QMovie.MovieState.Running
+            # the frame shown when paused gets its full time again
+            self._slot = time.perf_counter()
+            self._schedule_next_frame()
+
+    def setSpeed(self, percent_speed: int) -> None:
+        self._speed = percent_speed
+        if self._state == QMovie.MovieState.Running:
+            self._schedule_next_frame()
+
+    def speed(self) -> int:
+        return self._speed
+
+    def start(self) -> None:
+        if self._state == QMovie.MovieState.Paused:
+            self.setPaused(False)
+            return
+        if self._state == QMovie.MovieState.Running or not self._source.frame_count:
+            return
+
+        self._state = QMovie.MovieState.Running
+        self._plays = 0
+        self._due = None
+        self._load_next_frame()
+
+    def state(self) -> QMovie.MovieState:
+        return self._state
+
+    def stop(self) -> None:
+        self._timer.stop()
+        self._due = None
+        self._state = QMovie.MovieState.NotRunning
+        self._next_frame_number = 0
+
+    def _load_next_frame(self) -> None:
+        if self._next_frame_number >= self._source.frame_count:
+            self._plays += 1
+            loop_count = self._source.loop_count
+            if loop_count != -1 and self._plays > loop_count:
+                self.stop()
+                # noinspection PyUnresolvedReferences
+                self.finished.emit()
+                return
+            self._next_frame_number = 0
+
+        now = time.perf_counter()
+        if self._due is None or (now - self._due) * 1000 > MAX_CATCH_UP_MS:
+            # starting, or held up too long to make up for by skipping
+            self._due = now
+        skipped = 0
+        if self._frame_skip and self._speed:
+            last = self._source.frame_count - 1
+            while self._next_frame_number < last:
+                interval = self._interval(self._next_frame_number) / 1000
+                if self._due + interval > now:
+                    break
+                # the frame's time is over before it could be shown
+                self._due += interval
+                self._next_frame_number += 1
+                skipped += 1
+
+        # advanced first, as listeners may stop the player on this frame
+        frame_number = self._next_frame_number
+        self._next_frame_number += 1
+        self._show_frame(frame_number, self._due, skipped)
+        self._slot = self._due
+        if self._state == QMovie.MovieState.Running:
+            self._schedule_next_frame()
+
+    def _schedule_next_frame(self) -> None:
+        # as with QMovie, a speed of zero holds the current frame
+        if not self._speed or self._frame_number < 0:
+            self._timer.stop()
+            self._due = None
+            return
+
+        self._due = self._slot + self._interval(self._frame_number) / 1000
+        wait = self._due - time.perf_counter()
+        if self._frame_skip:
+            wait = max(wait, self._shown + MIN_INTERVAL_MS / 1000 - time.perf_counter())
+        self._timer.start(max(round(wait * 1000), 0))
+
+    def _interval(self, frame_number: int) -> float:
+        """Return how long frame_number is shown at the speed, in ms."""
+        return effective_delay(self._source.delay(frame_number)) * 100 / self._speed
+
+    def _show_frame(
+        self, frame_number: int, due: float | None = None, skipped: int = 0
+    ) -> None:
+        started = time.perf_counter()
+        image = self._source.frame(frame_number)
+        decoded = time.perf_counter() - started
+        self._frame_number = frame_number
+        # noinspection PyUnresolvedReferences
+        self.updated.emit(image.rect())
+        # noinspection PyUnresolvedReferences
+        self.frameChanged.emit(frame_number)
+
+        # the view sets its pixmap on frameChanged, so the frame is shown by now
+        self._shown = time.perf_counter()
+        if self._stats is not None:
+            self._stats.frame_shown(
+                decoded,
+                self._speed,
+                due,
+                self._interval(frame_number) / 1000 if self._speed else None,
+                skipped,
+            )
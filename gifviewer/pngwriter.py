@@ -0,0 +1,114 @@
+"""PNG writing with zlib alone, so it runs in worker processes without Qt.
+
+Images are 8 bit RGBA rows with no filtering, which keeps encoding down
+to a single zlib call. An image can also be compressed in strips of rows,
+each on its own, and the pieces joined into one PNG as they come back.
+"""
+
+import struct
+import zlib
+from pathlib import Path
+
+SIGNATURE = b"\x89PNG\r\n\x1a\n"
+COMPRESS_LEVEL = 6
+_ADLER_BASE = 65521
+# the zlib header for deflate with a 32K window and default compression
+_ZLIB_HEADER = b"\x78\x9c"
+
+
+def chunk(kind: bytes, data: bytes = b"") -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)))
+    )
+
+
+def header(width: int, height: int) -> bytes:
+    """Return the signature and IHDR chunk of an 8 bit RGBA image."""
+    return SIGNATURE + chunk(
+        b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    )
+
+
+def scanlines(rgba: bytes, width: int) -> bytes:
+    """Return rgba rows, each prefixed with filter type None."""
+
+    stride = width * 4
+    return b"".join(
+        b"\x00" + rgba[start : start + stride] for start in range(0, len(rgba), stride)
+    )
+
+
+def encode(width: int, height: int, rgba: bytes, level: int = COMPRESS_LEVEL) -> bytes:
+    return (
+        header(width, height)
+        + chunk(b"IDAT", zlib.compress(scanlines(rgba, width), level))
+        + chunk(b"IEND")
+    )
+
+
+def write(
+    path: Path, width: int, height: int, rgba: bytes, level: int = COMPRESS_LEVEL
+) -> None:
+    path.write_bytes(encode(width, height, rgba, level))
+
+
+def compress_strip(
+    rgba: bytes, width: int, last: bool, level: int = COMPRESS_LEVEL
+) -> tuple[bytes, int, int]:
+    """Compress a strip of rows as part of a larger image.
+
+    Returns raw deflate data, ending on a byte boundary unless last, with
+    the adler32 and length of the data compressed, for StripWriter.
+    """
+
+    data = scanlines(rgba, width)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    compressed = compressor.compress(data) + compressor.flush(
+        zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH
+    )
+    return compressed, zlib.adler32(data), len(data)
+
+
+def adler32_combine(first: int, second: int, second_length: int) -> int:
+    """Return the adler32 of two pieces of data from theirs, as zlib does."""
+
+    remainder = second_length % _ADLER_BASE
+    sum1 = first & 0xFFFF
+    sum2 = remainder * sum1 % _ADLER_BASE
+    sum1 = (sum1 + (second & 0xFFFF) + _ADLER_BASE - 1) % _ADLER_BASE
+    sum2 = (
+        sum2 + (first >> 16) + (second >> 16) + _ADLER_BASE - remainder
+    ) % _ADLER_BASE
+    return sum1 | sum2 << 16
+
+
+class StripWriter:
+    """Writes a PNG from strips compressed by compress_strip(), in order."""
+
+    def __init__(self, path: Path, width: int, height: int) -> None:
+        self._file = open(path, "wb")
+        self._file.write(header(width, height))
+        self._adler = 1
+        self._started = False
+
+    def add(self, strip: tuple[bytes, int, int]) -> None:
+        compressed, adler, length = strip
+        if not self._started:
+            compressed = _ZLIB_HEADER + compressed
+            self._started = True
+        self._adler = adler32_combine(self._adler, adler, length)
+        self._file.write(chunk(b"IDAT", compressed))
+
+    def finish(self) -> None:
+        """Write the end of the image, once the last strip has been added."""
+
+        self._file.write(chunk(b"IDAT", struct.pack(">I", self._adler)))
+        self._file.write(chunk(b"IEND"))
+        self._file.close()
+
+    def abandon(self) -> None:
+        self._file.close()
+        Path(self._file.name).unlink(missing_ok=True)
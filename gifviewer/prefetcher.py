@@ -0,0 +1,135 @@
+"""Decodes the neighbours of the selected file ahead of time."""
+
+import threading
+from pathlib import Path
+
+from PyQt5.QtCore import (
+    QCoreApplication,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    pyqtSignal,
+    pyqtSlot,
+)
+
+from gifviewer.framecache import FrameCache
+from gifviewer.framesource import FrameSource
+from gifviewer.settings import DEFAULT_PREFETCH_COUNT
+
+
+class _PrefetchSignals(QObject):
+    done = pyqtSignal(object)
+
+
+class PrefetchTask(QRunnable):
+    """Decodes one source on a pool thread."""
+
+    def __init__(self, source: FrameSource, max_bytes: int) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.source = source
+        self.signals = _PrefetchSignals()
+        self._max_bytes = max_bytes
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def run(self) -> None:
+        self.source.decode_all(
+            cancelled=self._cancelled.is_set, max_bytes=self._max_bytes
+        )
+        # noinspection PyUnresolvedReferences
+        self.signals.done.emit(self)
+
+
+class Prefetcher(QObject):
+    """Keeps the files around the selection decoded in the frame cache.
+
+    Each call to prefetch() replaces the wanted set: files no longer in it
+    are cancelled, queued ones are dropped from the pool before they start,
+    and new ones are queued nearest first.
+    """
+
+    def __init__(
+        self,
+        cache: FrameCache,
+        count: int = DEFAULT_PREFETCH_COUNT,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._cache = cache
+        self._count = count
+        self._pool = QThreadPool(self)
+        self._tasks: dict[Path, PrefetchTask] = {}
+        # every task the pool may still run, including cancelled ones,
+        # so none is garbage collected while a thread is using it
+        self._pool_tasks: set[PrefetchTask] = set()
+
+        if (app := QCoreApplication.instance()) is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    @property
+    def count(self) -> int:
+        """Files prefetched on each side of the selection."""
+        return self._count
+
+    def neighbours(self, files, row: int) -> list[Path]:
+        """Return the files around row, nearest first, alternating sides."""
+
+        paths = []
+        for distance in range(1, self._count + 1):
+            for neighbour in (row + distance, row - distance):
+                if 0 <= neighbour < len(files):
+                    paths.append(files[neighbour])
+        return paths
+
+    def prefetch(self, paths: list[Path]) -> None:
+        wanted = set(paths)
+        for path in list(self._tasks):
+            if path not in wanted:
+                self._cancel(path)
+
+        if not paths:
+            return
+
+        # prefetched files share the budget, leaving room for the one on screen
+        max_bytes = self._cache.budget_bytes // (len(paths) + 1)
+        for priority, path in enumerate(reversed(paths)):
+            if path in self._tasks:
+                continue
+
+            source = self._cache.get_for_prefetch(path)
+            if source.complete:
+                continue
+
+            task = PrefetchTask(source, max_bytes)
+            # noinspection PyUnresolvedReferences
+            task.signals.done.connect(self._task_done)
+            self._tasks[path] = task
+            self._pool_tasks.add(task)
+            self._pool.start(task, priority)
+
+    def cancel_all(self) -> None:
+        for path in list(self._tasks):
+            self._cancel(path)
+
+    @pyqtSlot()  # QCoreApplication::aboutToQuit()
+    def shutdown(self) -> None:
+        """Cancel everything and wait for the running tasks to stop."""
+
+        self.cancel_all()
+        self._pool.waitForDone()
+
+    def _cancel(self, path: Path) -> None:
+        task = self._tasks.pop(path)
+        task.cancel()
+        if self._pool.tryTake(task):
+            self._pool_tasks.discard(task)
+
+    @pyqtSlot(object)  # _PrefetchSignals::done()
+    def _task_done(self, task: PrefetchTask) -> None:
+        self._pool_tasks.discard(task)
+        if self._tasks.get(task.source.path) is task:
+            del self._tasks[task.source.path]
+        self._cache.trim()
@@ -0,0 +1,258 @@
+"""Event loop stalls and slot timings, recorded when the viewer runs with --profile.
+
+A heartbeat timer on the GUI thread measures how late the event loop gets
+back to it. While the heartbeat is overdue by more than the stall
+threshold, a watchdog thread samples the GUI thread's Python stack, so a
+stall can be traced to the code that was running when it happened. The
+controller's slots are timed as they run, and the whole session can also
+be run under cProfile.
+"""
+
+import collections
+import cProfile
+import dataclasses
+import functools
+import heapq
+import itertools
+import json
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+
+from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSlot
+
+from gifviewer.playbackstats import SAMPLES, TimingSummary
+
+HEARTBEAT_INTERVAL = 20  # ms
+MAX_STALLS = 50  # the longest stalls are kept, with their stacks
+SUMMARY_COUNT = 10  # stalls and slots listed in the summary
+STACK_DEPTH = 12  # innermost frames kept of each stack
+
+
+@dataclasses.dataclass(slots=True)
+class Stall:
+    started_s: float  # after profiling started
+    duration_ms: float
+    slot: str | None
+    stack: list[str]
+
+    def __str__(self) -> str:
+        where = f" in {self.slot}" if self.slot else ""
+        return (
+            f"{self.duration_ms:.0f} ms at {self.started_s:.1f} s{where}\n"
+            + "".join(f"      {line}\n" for line in self.stack)
+        ).rstrip()
+
+
+@dataclasses.dataclass(slots=True)
+class SlotStats:
+    name: str
+    calls: int
+    total_ms: float
+    timing: TimingSummary
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.calls} calls, {self.total_ms:.0f} ms total,"
+            f" mean {self.timing.mean_ms:.1f} / p95 {self.timing.p95_ms:.1f}"
+            f" / max {self.timing.max_ms:.1f} ms"
+        )
+
+
+class _SlotRecord:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.total_ms = 0.0
+        self.samples_ms: collections.deque[float] = collections.deque(maxlen=SAMPLES)
+
+    def add(self, elapsed_s: float) -> None:
+        self.calls += 1
+        self.total_ms += elapsed_s * 1000
+        self.samples_ms.append(elapsed_s * 1000)
+
+    def stats(self) -> SlotStats:
+        return SlotStats(
+            self.name, self.calls, self.total_ms, TimingSummary.of(self.samples_ms)
+        )
+
+
+class Profiler(QObject):
+    """Watches the event loop for stalls and times slots, for one session."""
+
+    def __init__(
+        self, stall_ms: int, cprofile: bool = False, parent: QObject | None = None
+    ) -> None:
+        super().__init__(parent)
+        self._stall_ms = stall_ms
+        self._interval_s = HEARTBEAT_INTERVAL / 1000
+        self._started = self._stopped = 0.0
+        self._gui_thread = threading.get_ident()
+
+        self._lock = threading.Lock()
+        self._last_beat = 0.0
+        # taken by the watchdog while the loop is stuck, claimed by the next beat
+        self._sample: tuple[str | None, list[str]] | None = None
+
+        self._latency_ms: collections.deque[float] = collections.deque(maxlen=SAMPLES)
+        self._stall_count = 0
+        self._stalls: list[tuple[float, int, Stall]] = []  # a heap of the longest
+        self._sequence = itertools.count()
+
+        self._slots: dict[str, _SlotRecord] = {}
+        # the slots running on the GUI thread, innermost last
+        self._running: list[str] = []
+
+        self._heartbeat = QTimer(self)
+        self._heartbeat.setTimerType(Qt.TimerType.PreciseTimer)
+        self._heartbeat.setInterval(HEARTBEAT_INTERVAL)
+        # noinspection PyUnresolvedReferences
+        self._heartbeat.timeout.connect(self._beat)
+        self._stopping = threading.Event()
+        self._watchdog = threading.Thread(
+            target=self._watch, name="stall watchdog", daemon=True
+        )
+        self._cprofile = cProfile.Profile() if cprofile else None
+
+    def timed(self, cls: type) -> type:
+        """Return a subclass of cls whose pyqtSlot methods are timed.
+
+        The timed slots are declared on a subclass, with the same
+        signatures, so cls itself is never changed and code holding it
+        outside the profiled session keeps its own slots.
+        """
+
+        slots = {
+            name: self._timed_slot(f"{cls.__name__}.{name}", function)
+            for name, function in vars(cls).items()
+            if callable(function) and hasattr(function, "__pyqtSignature__")
+        }
+        return type(
+            cls.__name__,
+            (cls,),
+            {"__module__": cls.__module__, "__qualname__": cls.__qualname__, **slots},
+        )
+
+    def start(self) -> None:
+        self._started = self._last_beat = time.perf_counter()
+        self._heartbeat.start()
+        self._watchdog.start()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        if self._stopped:
+            return
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self._stopped = time.perf_counter()
+        self._heartbeat.stop()
+        self._stopping.set()
+        self._watchdog.join()
+
+    def slot_stats(self) -> list[SlotStats]:
+        """Return the timed slots that ran, slowest first."""
+
+        return sorted(
+            (record.stats() for record in self._slots.values() if record.calls),
+            key=lambda stats: stats.timing.max_ms,
+            reverse=True,
+        )
+
+    def stalls(self) -> list[Stall]:
+        """Return the longest stalls, longest first."""
+        return [stall for *_, stall in sorted(self._stalls, reverse=True)]
+
+    def summary(self) -> str:
+        latency = TimingSummary.of(self._latency_ms)
+        lines = [
+            f"Profiled {(self._stopped or time.perf_counter()) - self._started:.1f} s:"
+            f" event loop latency mean {latency.mean_ms:.1f}"
+            f" / p95 {latency.p95_ms:.1f} / max {latency.max_ms:.0f} ms,"
+            f" {self._stall_count} stalls of {self._stall_ms} ms or more"
+        ]
+        if stalls := self.stalls()[:SUMMARY_COUNT]:
+            lines.append("Longest stalls:")
+            lines.extend(f"  {stall}" for stall in stalls)
+        if slots := self.slot_stats()[:SUMMARY_COUNT]:
+            lines.append("Slowest slots:")
+            lines.extend(f"  {slot}" for slot in slots)
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {
+            "heartbeat_ms": HEARTBEAT_INTERVAL,
+            "stall_ms": self._stall_ms,
+            "latency": dataclasses.asdict(TimingSummary.of(self._latency_ms)),
+            "stall_count": self._stall_count,
+            "stalls": [dataclasses.asdict(stall) for stall in self.stalls()],
+            "slots": [dataclasses.asdict(slot) for slot in self.slot_stats()],
+        }
+
+    def export(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+    def export_cprofile(self, path: Path) -> None:
+        """Write the cProfile statistics, readable with pstats."""
+
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(path)
+
+    def _timed_slot(self, name: str, function):
+        record = self._slots[name] = _SlotRecord(name)
+
+        @functools.wraps(function)
+        def slot(*args, **kwargs):
+            self._running.append(name)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record.add(time.perf_counter() - started)
+                self._running.pop()
+
+        return slot
+
+    @pyqtSlot()  # QTimer::timeout()
+    def _beat(self) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            stalled_at = self._last_beat + self._interval_s
+            self._last_beat = now
+            sample, self._sample = self._sample, None
+
+        latency_ms = max(now - stalled_at, 0.0) * 1000
+        self._latency_ms.append(latency_ms)
+        if latency_ms < self._stall_ms:
+            return
+
+        self._stall_count += 1
+        slot, stack = sample or (None, [])
+        stall = Stall(round(stalled_at - self._started, 3), latency_ms, slot, stack)
+        item = (latency_ms, next(self._sequence), stall)
+        if len(self._stalls) < MAX_STALLS:
+            heapq.heappush(self._stalls, item)
+        else:
+            heapq.heappushpop(self._stalls, item)
+
+    def _watch(self) -> None:
+        while not self._stopping.wait(self._interval_s):
+            with self._lock:
+                overdue_s = time.perf_counter() - self._last_beat - self._interval_s
+                if self._sample is not None or overdue_s * 1000 < self._stall_ms:
+                    continue
+
+                # a slice, as the GUI thread may leave its slot meanwhile
+                running = self._running[-1:]
+                frame = sys._current_frames().get(self._gui_thread)
+                stack = [] if frame is None else traceback.extract_stack(frame)
+                self._sample = (
+                    running[0] if running else None,
+                    [
+                        f"{entry.filename}:{entry.lineno} in {entry.name}"
+                        for entry in stack[-STACK_DEPTH:]
+                    ],
+                )
@@ -0,0 +1,150 @@
+"""Headless metadata extraction, run as ``cli.py scan FOLDER...``.
+
+Gif files are found the way the viewer finds them and their block
+structure is read in a pool of processes, without decoding any image
+data. Records are written as each batch completes, so output starts
+straight away and memory use stays flat however large the folder is.
+Nothing here imports Qt.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import TextIO
+
+from gifviewer import archives, gifinfo, scanner
+
+FORMATS = ("jsonl", "csv")
+FIELDS = (
+    "path",
+    "size",
+    "frames",
+    "width",
+    "height",
+    "duration_ms",
+    "loop_count",
+    "truncated",
+    "error",
+)
+BATCHES_PER_JOB = 2  # batches queued per process, to keep them all busy
+
+
+def file_metadata(path: Path) -> dict:
+    """Return the metadata record of one file."""
+
+    record = dict.fromkeys(FIELDS)
+    record["path"] = str(path)
+    try:
+        record["size"] = archives.stat(path).st_size
+        info = gifinfo.read_gif_info(path)
+    except (OSError, gifinfo.GifFormatError) as error:
+        record["error"] = str(error)
+        return record
+
+    record.update(
+        frames=info.frame_count,
+        width=info.width,
+        height=info.height,
+        duration_ms=info.duration,
+        loop_count=info.loop_count,
+        truncated=info.truncated,
+    )
+    return record
+
+
+def batch_metadata(paths: list[Path]) -> list[dict]:
+    return [file_metadata(path) for path in paths]
+
+
+def iter_metadata(
+    folders: list[Path],
+    options: scanner.ScanOptions = scanner.ScanOptions(),
+    jobs: int | None = None,
+) -> Iterator[dict]:
+    """Yield the metadata of the wanted gifs below folders, as they are read.
+
+    Discovery runs in this process while the pool reads what has been
+    found; records come out in completion order, not sorted.
+    """
+
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(jobs) as pool:
+        pending = set()
+        for batch in scanner.iter_gif_batches(folders, options):
+            pending.add(pool.submit(batch_metadata, batch))
+            if len(pending) >= jobs * BATCHES_PER_JOB:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def record_writer(output: TextIO, format_: str) -> Callable[[dict], object]:
+    """Return a function writing one record to output in format_."""
+
+    if format_ == "csv":
+        writer = csv.DictWriter(output, FIELDS)
+        writer.writeheader()
+        return writer.writerow
+    return lambda record: output.write(json.dumps(record) + "\n")
+
+
+def main(args: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog=f"{Path(sys.argv[0]).name} scan",
+        description="Write frame counts, dimensions, durations and sizes of gifs.",
+    )
+    parser.add_argument(
+        "folders",
+        type=Path,
+        nargs="+",
+        metavar="FOLDER",
+        help="folders, or zip and tar archives, to scan",
+    )
+    scanner.add_scan_arguments(parser)
+    parser.add_argument("--format", choices=FORMATS, default=FORMATS[0])
+    parser.add_argument(
+        "--jobs", type=int, help="worker processes (default: one per cpu)"
+    )
+    parser.add_argument(
+        "--output", type=Path, help="write to this file instead of stdout"
+    )
+    options = parser.parse_args(args)
+    for folder in options.folders:
+        if not scanner.is_folder(folder):
+            parser.error(f"not a folder: {folder}")
+    if options.max_depth is not None and options.max_depth < 0:
+        parser.error("--max-depth must not be negative")
+    if options.jobs is not None and options.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    output = (
+        open(options.output, "w", newline="", encoding="utf-8")
+        if options.output
+        else sys.stdout
+    )
+    errors = 0
+    try:
+        write = record_writer(output, options.format)
+        for record in iter_metadata(
+            scanner.distinct_roots(options.folders),
+            scanner.ScanOptions.from_args(options),
+            options.jobs,
+        ):
+            write(record)
+            errors += record["error"] is not None
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    # unreadable files fail the run, so a CI job notices them
+    return 1 if errors else 0
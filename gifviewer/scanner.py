@@ -0,0 +1,364 @@
+"""Folder scanning, kept free of Qt so it can run on any thread.
+
+Zip and tar archives are walked as folders of their members, see archives.
+"""
+
+import argparse
+import dataclasses
+import fnmatch
+import os
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import NamedTuple, TypeVar
+
+from gifviewer import archives
+
+GIF_PATTERN = "*.gif"
+BATCH_SIZE = 500
+BATCH_INTERVAL = 0.1  # seconds
+# directories listed at once; listing mostly waits on the file system,
+# most of all on network mounts, so more threads than cores pay off
+WALK_WORKERS = 16
+
+_Item = TypeVar("_Item")
+_Result = TypeVar("_Result")
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ScanOptions:
+    """Which files and directories below the scanned folders are wanted.
+
+    Patterns are globs. Include patterns pick gif files by name. Exclude
+    patterns drop files and whole directories: by name, or by path below
+    the scanned folder if they contain a /. Directories deeper than
+    max_depth levels below a scanned folder are not walked.
+    """
+
+    include: tuple[str, ...] = (GIF_PATTERN,)
+    exclude: tuple[str, ...] = ()
+    max_depth: int | None = None
+    follow_symlinks: bool = False
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "ScanOptions":
+        return cls(
+            include=tuple(args.include or (GIF_PATTERN,)),
+            exclude=tuple(args.exclude or ()),
+            max_depth=args.max_depth,
+            follow_symlinks=args.follow_symlinks,
+        )
+
+    @property
+    def filtering(self) -> bool:
+        """False when every gif file below a folder is wanted."""
+        return (
+            self.include != (GIF_PATTERN,)
+            or bool(self.exclude)
+            or self.max_depth is not None
+        )
+
+    def wants_file(self, relative: str) -> bool:
+        """Whether the gif file at relative, a / separated path below a
+        scanned folder, is wanted; its directory is taken to be."""
+
+        name = relative.rpartition("/")[2]
+        return any(
+            fnmatch.fnmatch(name, pattern) for pattern in self.include
+        ) and not self._excluded(name, relative)
+
+    def wants_directory(self, relative: str) -> bool:
+        """Whether the directory at relative is walked; its parent is taken
+        to be."""
+
+        if not relative:
+            return True
+        if self.max_depth is not None and relative.count("/") >= self.max_depth:
+            return False
+        return not self._excluded(relative.rpartition("/")[2], relative)
+
+    def wants_path(self, relative: str, *, directory: bool = False) -> bool:
+        """Whether relative is wanted, checking every directory above it."""
+
+        parts = relative.split("/")
+        for depth in range(1, len(parts)):
+            if not self.wants_directory("/".join(parts[:depth])):
+                return False
+        return (
+            self.wants_directory(relative) if directory else self.wants_file(relative)
+        )
+
+    def _excluded(self, name: str, relative: str) -> bool:
+        return any(
+            fnmatch.fnmatch(relative if "/" in pattern else name, pattern)
+            for pattern in self.exclude
+        )
+
+
+class Directory(NamedTuple):
+    """A directory to walk, with the scanned folder it was found below."""
+
+    path: str
+    root: str
+    # its path below root, / separated, empty for root itself
+    relative: str
+
+    def child(self, path: str) -> "Directory":
+        name = os.path.basename(path)
+        return Directory(
+            path, self.root, f"{self.relative}/{name}" if self.relative else name
+        )
+
+    def file_relative(self, path: str) -> str:
+        name = os.path.basename(path)
+        return f"{self.relative}/{name}" if self.relative else name
+
+
+@dataclasses.dataclass(slots=True)
+class Listing:
+    """The gif files of a directory, with their size and mtime, and its
+    subdirectories, archives among them."""
+
+    files: list[tuple[str, int, int]] = dataclasses.field(default_factory=list)
+    subdirectories: list[str] = dataclasses.field(default_factory=list)
+
+
+def add_scan_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options that ScanOptions.from_args() reads."""
+
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="PATTERN",
+        help=f"only gif files whose name matches; repeatable (default {GIF_PATTERN})",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="PATTERN",
+        help="skip files and folders matching, e.g. node_modules; repeatable",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        metavar="N",
+        help="folder levels to descend below each scanned folder",
+    )
+    parser.add_argument(
+        "--follow-symlinks",
+        action="store_true",
+        help="descend into symlinked folders, each folder once",
+    )
+
+
+def distinct_roots(roots: Iterable[Path]) -> list[Path]:
+    """Return roots made absolute, without duplicates or roots inside others."""
+
+    distinct: list[Path] = []
+    for root in sorted({Path(os.path.abspath(root)) for root in roots}):
+        if not any(root.is_relative_to(kept) for kept in distinct):
+            distinct.append(root)
+    return distinct
+
+
+def root_of(path: str, roots: Sequence[Path]) -> Path | None:
+    """Return the root that path is below, or is."""
+
+    for root in roots:
+        root_ = str(root)
+        if path == root_ or path.startswith(root_.rstrip(os.sep) + os.sep):
+            return root
+    return None
+
+
+def is_folder(path: str | Path) -> bool:
+    """Return whether path is a directory or an archive walked as one."""
+    return os.path.isdir(path) or archives.is_archive(path)
+
+
+def list_directory(directory: str, *, follow_symlinks: bool = False) -> Listing:
+    """List the gif files and subdirectories of directory, or the gif members
+    of an archive; empty if unreadable."""
+
+    listing = Listing()
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        listing.subdirectories.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    if archives.is_archive_name(entry.name):
+                        listing.subdirectories.append(entry.path)
+                        continue
+                    if not fnmatch.fnmatch(entry.name, GIF_PATTERN):
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                listing.files.append((entry.path, stat.st_size, stat.st_mtime_ns))
+    except NotADirectoryError:
+        if archives.is_archive_name(directory):
+            return _list_archive(directory)
+    except OSError:
+        pass
+    return listing
+
+
+def _list_archive(archive: str) -> Listing:
+    listing = Listing()
+    try:
+        mtime_ns = os.stat(archive).st_mtime_ns
+        members = archives.list_members(archive)
+    except OSError:
+        return listing
+
+    for name, size in members:
+        if fnmatch.fnmatch(name.rpartition("/")[2], GIF_PATTERN):
+            path = os.path.join(archive, *name.split("/"))
+            listing.files.append((path, size, mtime_ns))
+    return listing
+
+
+def walk_parallel(
+    starts: Iterable[_Item],
+    visit: Callable[[_Item], _Result],
+    *,
+    workers: int = WALK_WORKERS,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> Iterator[tuple[_Item, _Result, Callable[[Iterable[_Item]], None]]]:
+    """Run visit on each item on a pool of threads, as a walk.
+
+    Yields every item with what visit returned and a function that queues
+    more items, typically its children, in completion order. Closing the
+    iterator drops the items not started yet.
+    """
+
+    with ThreadPoolExecutor(workers) as pool:
+        pending = {}
+
+        def descend(items: Iterable[_Item]) -> None:
+            for item in items:
+                pending[pool.submit(visit, item)] = item
+
+        descend(starts)
+        try:
+            while pending and not cancelled():
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result(), descend
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def iter_root_files(
+    roots: Sequence[Path],
+    options: ScanOptions = ScanOptions(),
+    *,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> Iterator[tuple[Path, Path]]:
+    """Yield each wanted gif file below roots, with the root it is below.
+
+    Directories are listed in parallel. A directory reached a second
+    time, through a symlink loop or from another root, is not walked
+    again.
+    """
+
+    def visit(directory: Directory) -> tuple[os.stat_result | None, Listing]:
+        try:
+            stat = os.stat(directory.path)
+        except OSError:
+            return None, Listing()
+        return stat, list_directory(
+            directory.path, follow_symlinks=options.follow_symlinks
+        )
+
+    seen: set[tuple[int, int]] = set()
+    starts = [Directory(str(root), str(root), "") for root in roots]
+    for directory, (stat, listing), descend in walk_parallel(
+        starts, visit, cancelled=cancelled
+    ):
+        if stat is None or (stat.st_dev, stat.st_ino) in seen:
+            continue
+        seen.add((stat.st_dev, stat.st_ino))
+
+        root = Path(directory.root)
+        for path, _, _ in listing.files:
+            if options.wants_file(directory.file_relative(path)):
+                yield root, Path(path)
+        descend(
+            child
+            for child in map(directory.child, listing.subdirectories)
+            if options.wants_directory(child.relative)
+        )
+
+
+def iter_gif_files(
+    roots: Sequence[Path],
+    options: ScanOptions = ScanOptions(),
+    *,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> Iterator[Path]:
+    """Yield the wanted gif files below roots."""
+    return (file for _, file in iter_root_files(roots, options, cancelled=cancelled))
+
+
+def gif_paths(paths: list[Path], options: ScanOptions = ScanOptions()) -> list[Path]:
+    """Return the gifs given and those below the folders given, in order."""
+
+    files = [path for path in paths if not is_folder(path)]
+    folders = distinct_roots(filter(is_folder, paths))
+    found = sorted(iter_gif_files(folders, options))
+    return list(dict.fromkeys([*files, *found]))
+
+
+def iter_batches(
+    files: Iterable[Path],
+    *,
+    cancelled: Callable[[], bool] = lambda: False,
+    batch_size: int = BATCH_SIZE,
+    batch_interval: float = BATCH_INTERVAL,
+) -> Iterator[list[Path]]:
+    """Group files into batches as they are produced.
+
+    A batch is yielded once it holds batch_size files or batch_interval
+    seconds have passed since the last one, so slow folders still trickle
+    results through. Iteration stops as soon as cancelled() returns True.
+    """
+
+    batch: list[Path] = []
+    last_yield = time.monotonic()
+    for file in files:
+        if cancelled():
+            return
+
+        batch.append(file)
+        if len(batch) >= batch_size or time.monotonic() - last_yield >= batch_interval:
+            yield batch
+            batch = []
+            last_yield = time.monotonic()
+
+    if batch and not cancelled():
+        yield batch
+
+
+def iter_gif_batches(
+    roots: Sequence[Path],
+    options: ScanOptions = ScanOptions(),
+    *,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> Iterator[list[Path]]:
+    """Yield the wanted gif files below roots in batches as they are found."""
+    return iter_batches(
+        iter_gif_files(roots, options, cancelled=cancelled), cancelled=cancelled
+    )
+
+
+def name_key(path: Path) -> str:
+    """Sort key used for the file list."""
+    return path.name.lower()
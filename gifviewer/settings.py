@@ -1,3 +1,32 @@
 """Globally available app settings."""
 
+import os
+import sys
+from pathlib import Path
+
+APP_NAME = "gifviewer"
+
+# command line defaults, kept here so parsing them never imports Qt
+DEFAULT_CACHE_MB = 512
+DEFAULT_PREFETCH_COUNT = 2
+QT_DECODER = "qt"
+NUMPY_DECODER = "numpy"
+DECODERS = (QT_DECODER, NUMPY_DECODER)
+DEFAULT_STALL_MS = 200
+
 cl_args = None
+
+
+def cache_dir() -> Path:
+    """Return the per-user cache folder, creating it if needed."""
+
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData/Local"))
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library/Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+
+    folder = base / APP_NAME
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder
@@ -0,0 +1,221 @@
+"""First frame thumbnails, cached on disk.
+
+The disk cache follows the freedesktop thumbnail layout: a png per file,
+named by the md5 of the file's uri and tagged with the uri and mtime it
+was made from, so a changed file gets a new thumbnail.
+"""
+
+import contextlib
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+from PyQt5.QtCore import (
+    QCoreApplication,
+    QObject,
+    QRunnable,
+    QSize,
+    Qt,
+    QThreadPool,
+    pyqtSignal,
+    pyqtSlot,
+)
+from PyQt5.QtGui import QImage, QImageWriter, QPixmap
+
+from gifviewer import archives, settings
+from gifviewer.mappedfile import MappedFile
+
+THUMBNAIL_SIZE = 128
+MEMORY_CACHE_SIZE = 1000  # thumbnails
+MAX_QUEUED = 256  # requests waiting for a pool thread
+# freedesktop uses Thumb::URI and Thumb::MTime, but Qt drops keys with colons
+THUMB_URI_KEY = "ThumbURI"
+THUMB_MTIME_KEY = "ThumbMTime"
+
+
+class ThumbnailCache:
+    """The on-disk part of the cache; safe to use from any thread."""
+
+    def __init__(self, folder: Path | None = None, size: int = THUMBNAIL_SIZE) -> None:
+        self._folder = folder or settings.cache_dir() / "thumbnails" / str(size)
+        self._folder.mkdir(parents=True, exist_ok=True)
+        self._size = size
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def load(self, path: Path) -> QImage | None:
+        """Return the cached thumbnail of path, if it is still current."""
+
+        try:
+            mtime = str(archives.stat(path).st_mtime_ns)
+        except OSError:
+            return None
+
+        image = QImage(self._thumbnail_path(path).as_posix())
+        if image.isNull() or image.text(THUMB_MTIME_KEY) != mtime:
+            return None
+        return image
+
+    def save(self, path: Path, image: QImage) -> None:
+        try:
+            mtime = str(archives.stat(path).st_mtime_ns)
+        except OSError:
+            return
+
+        target = self._thumbnail_path(path)
+        # a file of its own, as two threads may be saving the same thumbnail
+        with contextlib.suppress(OSError):
+            descriptor, name = tempfile.mkstemp(".tmp", dir=self._folder)
+            os.close(descriptor)
+            writer = QImageWriter(name, b"png")
+            writer.setText(THUMB_URI_KEY, path.absolute().as_uri())
+            writer.setText(THUMB_MTIME_KEY, mtime)
+            if writer.write(image):
+                os.replace(name, target)
+            else:
+                os.unlink(name)
+
+    def make(self, path: Path) -> QImage:
+        """Return the thumbnail of path, rendering it from the first frame."""
+
+        if (image := self.load(path)) is not None:
+            return image
+
+        try:
+            with MappedFile(path) as file:
+                frame = file.reader().read()
+        except OSError:
+            return QImage()
+        if frame.isNull():
+            return frame
+
+        image = frame.scaled(
+            self._size,
+            self._size,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+        self.save(path, image)
+        return image
+
+    def _thumbnail_path(self, path: Path) -> Path:
+        uri = path.absolute().as_uri()
+        return (
+            self._folder
+            / f"{hashlib.md5(uri.encode(), usedforsecurity=False).hexdigest()}.png"
+        )
+
+
+class _ThumbnailSignals(QObject):
+    done = pyqtSignal(object, QImage)
+
+
+class ThumbnailTask(QRunnable):
+    def __init__(self, cache: ThumbnailCache, path: Path) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.path = path
+        self.signals = _ThumbnailSignals()
+        self._cache = cache
+
+    def run(self) -> None:
+        # noinspection PyUnresolvedReferences
+        self.signals.done.emit(self, self._cache.make(self.path))
+
+
+class ThumbnailProvider(QObject):
+    """Hands out thumbnails to the GUI, rendering missing ones in a pool.
+
+    Only thumbnails a view actually asks for are rendered. The newest
+    requests run first and the oldest are dropped once too many are
+    waiting, so after a fast scroll the cells now visible are served
+    before the ones scrolled past.
+    """
+
+    thumbnail_ready = pyqtSignal(object)
+
+    def __init__(self, cache: ThumbnailCache | None = None, parent=None) -> None:
+        super().__init__(parent)
+        self._cache = cache or ThumbnailCache()
+        self._pixmaps: OrderedDict[Path, QPixmap] = OrderedDict()
+        self._queued: OrderedDict[Path, ThumbnailTask] = OrderedDict()
+        self._running: set[ThumbnailTask] = set()
+        self._priority = 0
+        self._pool = QThreadPool(self)
+
+        self._placeholder = QPixmap(self.size)
+        self._placeholder.fill(Qt.GlobalColor.transparent)
+
+        if (app := QCoreApplication.instance()) is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    @property
+    def size(self) -> QSize:
+        return QSize(self._cache.size, self._cache.size)
+
+    @property
+    def placeholder(self) -> QPixmap:
+        """Blank pixmap to show while a thumbnail is being rendered."""
+        return self._placeholder
+
+    def thumbnail(self, path: Path) -> QPixmap | None:
+        """Return the thumbnail of path, requesting it if it is not ready.
+
+        thumbnail_ready is emitted once a requested thumbnail is available.
+        """
+
+        if (pixmap := self._pixmaps.get(path)) is not None:
+            self._pixmaps.move_to_end(path)
+            return pixmap
+
+        self._request(path)
+        return None
+
+    def clear(self) -> None:
+        for task in self._queued.values():
+            if self._pool.tryTake(task):
+                self._running.discard(task)
+        self._queued.clear()
+        self._pixmaps.clear()
+
+    @pyqtSlot()  # QCoreApplication::aboutToQuit()
+    def shutdown(self) -> None:
+        """Drop the queued thumbnails and wait for those being rendered."""
+
+        self.clear()
+        self._pool.waitForDone()
+
+    def _request(self, path: Path) -> None:
+        if path in self._queued:
+            return
+
+        if len(self._queued) >= MAX_QUEUED:
+            _, oldest = self._queued.popitem(last=False)
+            if self._pool.tryTake(oldest):
+                self._running.discard(oldest)
+
+        task = ThumbnailTask(self._cache, path)
+        # noinspection PyUnresolvedReferences
+        task.signals.done.connect(self._task_done)
+        self._queued[path] = task
+        self._running.add(task)
+        self._priority += 1
+        self._pool.start(task, self._priority)
+
+    @pyqtSlot(object, QImage)  # _ThumbnailSignals::done()
+    def _task_done(self, task: ThumbnailTask, image: QImage) -> None:
+        self._running.discard(task)
+        if self._queued.get(task.path) is task:
+            del self._queued[task.path]
+
+        pixmap = self._placeholder if image.isNull() else QPixmap.fromImage(image)
+        self._pixmaps[task.path] = pixmap
+        while len(self._pixmaps) > MEMORY_CACHE_SIZE:
+            self._pixmaps.popitem(last=False)
+
+        # noinspection PyUnresolvedReferences
+        self.thumbnail_ready.emit(task.path)
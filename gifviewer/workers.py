@@ -0,0 +1,484 @@
+"""Background workers."""
+
+import collections
+import itertools
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QSize, QThread, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from gifviewer import scanner
+from gifviewer.pathstore import PathStore
+from gifviewer.scanner import ScanOptions
+
+if TYPE_CHECKING:
+    from gifviewer.frameexport import FrameSelection
+
+# wait this long after a change for related ones, e.g. a file still being copied
+WATCH_SETTLE_TIME = 0.25
+# frame thumbnail requests kept waiting, the newest
+MAX_QUEUED_FRAMES = 64
+
+
+class FolderScanThread(QThread):
+    """Scans folders for gif files, emitting them in batches.
+
+    The folders are walked through the file index when it can be opened,
+    so unchanged directories are not listed again. Once every file has
+    been emitted, metadata is read for the files the index lacks it for.
+    """
+
+    files_found = pyqtSignal(list)
+    # the number of files found below each folder, once all are found
+    roots_counted = pyqtSignal(dict)
+    listing_finished = pyqtSignal()
+
+    def __init__(
+        self, roots: Iterable[Path], options: ScanOptions = ScanOptions(), parent=None
+    ) -> None:
+        super().__init__(parent)
+        self._roots = scanner.distinct_roots(roots)
+        self._options = options
+
+    @property
+    def roots(self) -> list[Path]:
+        return self._roots
+
+    @property
+    def options(self) -> ScanOptions:
+        return self._options
+
+    def cancel(self) -> None:
+        self.requestInterruption()
+
+    def run(self) -> None:
+        # sqlite is imported here, off the GUI thread and after startup
+        import sqlite3
+
+        from gifviewer.fileindex import FileIndex
+
+        try:
+            index = FileIndex()
+        except (OSError, sqlite3.Error):
+            index = None
+
+        if index is None:
+            self._emit_batches(
+                scanner.iter_root_files(
+                    self._roots, self._options, cancelled=self.isInterruptionRequested
+                )
+            )
+            return
+
+        with index:
+            files = index.iter_files(
+                self._roots, self._options, cancelled=self.isInterruptionRequested
+            )
+            try:
+                self._emit_batches(files)
+            finally:
+                files.close()
+
+            for root in self._roots:
+                if self.isInterruptionRequested():
+                    break
+                index.update_metadata(
+                    root, self._options, cancelled=self.isInterruptionRequested
+                )
+
+    def _emit_batches(self, root_files: Iterator[tuple[Path, Path]]) -> None:
+        counts = collections.Counter(dict.fromkeys(self._roots, 0))
+
+        def count(root: Path, file: Path) -> Path:
+            counts[root] += 1
+            return file
+
+        for batch in scanner.iter_batches(
+            itertools.starmap(count, root_files),
+            cancelled=self.isInterruptionRequested,
+        ):
+            # noinspection PyUnresolvedReferences
+            self.files_found.emit(batch)
+
+        if not self.isInterruptionRequested():
+            # noinspection PyUnresolvedReferences
+            self.roots_counted.emit(dict(counts))
+            # noinspection PyUnresolvedReferences
+            self.listing_finished.emit()
+
+
+class FolderWatchThread(QThread):
+    """Turns change notifications for scanned folders into file diffs.
+
+    Directories reported changed are relisted through the file index and
+    what appeared or disappeared in them is emitted; the rest of the
+    folders is not touched. Directories to watch are announced as they
+    are found, starting with every wanted directory of the folders.
+    """
+
+    files_changed = pyqtSignal(list, list)  # added, removed
+    directories_added = pyqtSignal(list)
+    directories_removed = pyqtSignal(list)
+
+    def __init__(
+        self, roots: list[Path], options: ScanOptions = ScanOptions(), parent=None
+    ) -> None:
+        super().__init__(parent)
+        self._roots = roots
+        self._options = options
+        self._pending: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+
+    @property
+    def roots(self) -> list[Path]:
+        return self._roots
+
+    def refresh(self, directory: str) -> None:
+        """Queue directory to be checked for changes; safe from any thread."""
+        self._pending.put(directory)
+
+    def cancel(self) -> None:
+        self.requestInterruption()
+        self._pending.put(None)
+
+    def run(self) -> None:
+        import sqlite3
+
+        from gifviewer.fileindex import FileIndex
+
+        try:
+            index = FileIndex()
+        except (OSError, sqlite3.Error):
+            return
+
+        with index:
+            directories = [
+                directory
+                for root in self._roots
+                for directory in index.directories(root, self._options)
+            ]
+            # noinspection PyUnresolvedReferences
+            self.directories_added.emit(directories)
+            # catches whatever changed between the scan and the watch starting
+            self._apply(index, set(directories))
+
+            while (directory := self._pending.get()) is not None:
+                self.msleep(int(WATCH_SETTLE_TIME * 1000))
+                changed = {directory}
+                while not self._pending.empty():
+                    if (directory := self._pending.get()) is None:
+                        return
+                    changed.add(directory)
+
+                self._apply(index, changed)
+
+    def _apply(self, index, directories: set[str]) -> None:
+        import sqlite3
+
+        change = None
+        for directory in directories:
+            if self.isInterruptionRequested():
+                return
+            if (root := scanner.root_of(directory, self._roots)) is None:
+                continue
+            try:
+                refreshed = index.refresh_directory(
+                    Path(directory), root, self._options
+                )
+            except (OSError, sqlite3.Error):
+                continue
+            if change is None:
+                change = refreshed
+            else:
+                change.update(refreshed)
+
+        if not change:
+            return
+
+        if change.added:
+            # read now, so sorting by metadata can place the new files
+            try:
+                for root in self._roots:
+                    index.update_metadata(
+                        root, self._options, cancelled=self.isInterruptionRequested
+                    )
+            except (OSError, sqlite3.Error):
+                pass
+        if change.added or change.removed:
+            # noinspection PyUnresolvedReferences
+            self.files_changed.emit(change.added, change.removed)
+        if change.directories_added:
+            # noinspection PyUnresolvedReferences
+            self.directories_added.emit(change.directories_added)
+        if change.directories_removed:
+            # noinspection PyUnresolvedReferences
+            self.directories_removed.emit(change.directories_removed)
+
+
+class SortKeysThread(QThread):
+    """Orders a file list by each metadata sort key, from the file index."""
+
+    orderings_ready = pyqtSignal(object, int)  # dict[str, Ordering], generation
+
+    def __init__(
+        self, roots: list[Path], files: PathStore, generation: int, parent=None
+    ) -> None:
+        super().__init__(parent)
+        self._roots = roots
+        # a copy, the list keeps changing on the GUI thread
+        self._files = files.copy()
+        self._generation = generation
+
+    def cancel(self) -> None:
+        self.requestInterruption()
+
+    def run(self) -> None:
+        import sqlite3
+
+        from gifviewer import fileorder
+        from gifviewer.fileindex import FileIndex
+
+        try:
+            with FileIndex() as index:
+                orderings = fileorder.build_orderings(
+                    self._files,
+                    itertools.chain.from_iterable(
+                        map(index.iter_metadata, self._roots)
+                    ),
+                    cancelled=self.isInterruptionRequested,
+                )
+        except (OSError, sqlite3.Error):
+            return
+
+        if orderings is not None:
+            # noinspection PyUnresolvedReferences
+            self.orderings_ready.emit(orderings, self._generation)
+
+
+class FrameExportThread(QThread):
+    """Exports frames of gifs, emitting a result as each gif is finished."""
+
+    file_exported = pyqtSignal(object)  # ExportResult
+
+    def __init__(
+        self,
+        paths: list[Path],
+        folder: Path,
+        selection: "FrameSelection",
+        columns: int | None,
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self._paths = paths
+        self._folder = folder
+        self._selection = selection
+        self._columns = columns
+
+    @property
+    def folder(self) -> Path:
+        return self._folder
+
+    def cancel(self) -> None:
+        self.requestInterruption()
+
+    def run(self) -> None:
+        from concurrent.futures import BrokenExecutor
+
+        from gifviewer.frameexport import ExportResult, export_frames
+
+        unfinished = dict.fromkeys(self._paths)
+        try:
+            for result in export_frames(
+                self._paths,
+                self._folder,
+                self._selection,
+                columns=self._columns,
+                cancelled=self.isInterruptionRequested,
+            ):
+                unfinished.pop(result.path, None)
+                # noinspection PyUnresolvedReferences
+                self.file_exported.emit(result)
+        except (OSError, BrokenExecutor) as error:
+            # the folder could not be made, or the encoding processes died
+            for path in unfinished:
+                # noinspection PyUnresolvedReferences
+                self.file_exported.emit(ExportResult(path, 0, str(error)))
+
+
+class FrameThumbnailThread(QThread):
+    """Renders thumbnails of the frames of one gif as they are requested.
+
+    Of the requests waiting, the lowest frame is rendered first, so the
+    frames of a window are composed in order. Only the newest
+    MAX_QUEUED_FRAMES requests are kept, dropping frames a scroll has
+    left behind.
+    """
+
+    thumbnail_rendered = pyqtSignal(int, QImage)
+
+    def __init__(self, path: Path, size: int, parent=None) -> None:
+        super().__init__(parent)
+        self._path = path
+        self._size = size
+        self._condition = threading.Condition()
+        self._queued: collections.OrderedDict[int, None] = collections.OrderedDict()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def request(self, number: int) -> None:
+        """Queue frame number to be rendered; safe from any thread."""
+
+        with self._condition:
+            self._queued[number] = None
+            self._queued.move_to_end(number)
+            while len(self._queued) > MAX_QUEUED_FRAMES:
+                self._queued.popitem(last=False)
+            self._condition.notify()
+
+    def cancel(self) -> None:
+        self.requestInterruption()
+        with self._condition:
+            self._condition.notify()
+
+    def run(self) -> None:
+        from gifviewer.framestream import FrameStream
+        from gifviewer.gifinfo import GifFormatError
+
+        try:
+            stream = FrameStream(
+                self._path, window=1, fit=QSize(self._size, self._size)
+            )
+        except (OSError, GifFormatError):
+            return
+
+        try:
+            while (number := self._next()) is not None:
+                # noinspection PyUnresolvedReferences
+                self.thumbnail_rendered.emit(number, stream.frame(number))
+        finally:
+            stream.close()
+
+    def _next(self) -> int | None:
+        with self._condition:
+            while not self._queued and not self.isInterruptionRequested():
+                self._condition.wait()
+            if self.isInterruptionRequested():
+                return None
+            number = min(self._queued)
+            del self._queued[number]
+            return number
+
+
+class OptimizeThread(QThread):
+    """Optimizes gifs, emitting a result as each gif is finished."""
+
+    file_optimized = pyqtSignal(object)  # OptimizeResult
+
+    def __init__(
+        self,
+        paths: list[Path],
+        folder: Path | None,
+        colors: int | None,
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self._paths = paths
+        self._folder = folder
+        self._colors = colors
+
+    def cancel(self) -> None:
+        self.requestInterruption()
+
+    def run(self) -> None:
+        from concurrent.futures import BrokenExecutor
+
+        from gifviewer.optimizer import OptimizeResult, optimize_files
+
+        unfinished = dict.fromkeys(self._paths)
+        try:
+            for result in optimize_files(
+                self._paths,
+                output=self._folder,
+                colors=self._colors,
+                cancelled=self.isInterruptionRequested,
+            ):
+                unfinished.pop(result.path, None)
+                # noinspection PyUnresolvedReferences
+                self.file_optimized.emit(result)
+        except (OSError, BrokenExecutor) as error:
+            # the folder could not be made, or the encoding processes died
+            for path in unfinished:
+                # noinspection PyUnresolvedReferences
+                self.file_optimized.emit(OptimizeResult(path, 0, 0, str(error)))
+
+
+class DuplicatesThread(QThread):
+    """Groups identical and similar files, hashing those the file index
+    has no hashes for and storing what it hashes there."""
+
+    # files hashed so far, of those to hash
+    progress = pyqtSignal(int, int)
+    groups_found = pyqtSignal(list)  # list[DuplicateGroup]
+
+    def __init__(self, roots: list[Path], files: PathStore, parent=None) -> None:
+        super().__init__(parent)
+        self._roots = roots
+        # a copy, the list keeps changing on the GUI thread
+        self._files = files.copy()
+
+    def cancel(self) -> None:
+        self.requestInterruption()
+
+    def run(self) -> None:
+        import sqlite3
+        from concurrent.futures import BrokenExecutor
+
+        from gifviewer import archives
+        from gifviewer.duplicates import find_duplicates
+        from gifviewer.fileindex import FileHashes, FileIndex
+
+        listed = set(self._files)
+        index = None
+        try:
+            index = FileIndex()
+            files = [
+                file
+                for root in self._roots
+                for file in index.iter_hashes(root)
+                if file.path in listed
+            ]
+        except (OSError, sqlite3.Error):
+            # hashed every time, without an index to keep the hashes in
+            if index is not None:
+                index.close()
+                index = None
+            files = []
+            for path in listed:
+                try:
+                    stat = archives.stat(path)
+                except OSError:
+                    continue
+                files.append(FileHashes(path, stat.st_size, stat.st_mtime_ns))
+
+        try:
+            groups = find_duplicates(
+                files,
+                store=index.store_hashes if index is not None else lambda _: None,
+                # noinspection PyUnresolvedReferences
+                progress=self.progress.emit,
+                cancelled=self.isInterruptionRequested,
+            )
+        except (sqlite3.Error, BrokenExecutor):
+            groups = None
+        finally:
+            if index is not None:
+                index.close()
+
+        if groups is not None:
+            # noinspection PyUnresolvedReferences
+            self.groups_found.emit(groups)
@@ -0,0 +1,214 @@
+"""Small gifs made for the tests, covering the parts of the format the
+decoders have to get right.
+
+The gifs are checked against QImageReader, so they keep clear of two
+places where Qt departs from what browsers do. Restoring the background
+fills with the header's background colour unless the disposed frame has a
+transparent index, and a first frame smaller than the canvas is set on
+the background colour too, where the decoders here clear to transparent.
+Qt also holds the canvas without alpha when the first frame has no
+transparent index. So first frames cover the canvas and have one, and so
+does every frame that restores the background. Qt also puts the rows of
+interlaced images only 3 or 4 rows high in the wrong places, so shorter
+images are never interlaced.
+"""
+
+import dataclasses
+import random
+from pathlib import Path
+
+from PyQt5.QtGui import QImage, QImageReader
+
+from gifviewer import gifwriter
+
+# packed byte of the image descriptor, after the graphic control extension
+_DESCRIPTOR_PACKED = 8 + 9
+_INTERLACED = 0x40
+
+# Qt misplaces the rows of interlaced images 3 or 4 rows high
+MIN_INTERLACED_HEIGHT = 5
+
+# fully transparent pixels compare equal whatever colour they carry
+PIXEL_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+
+PALETTE = [0x000000, 0xFF0000, 0x00FF00, 0x0000FF, 0xFFFF00, 0x00FFFF, 0xFF00FF]
+
+
+@dataclasses.dataclass
+class Frame:
+    width: int
+    height: int
+    indexes: bytes
+    left: int = 0
+    top: int = 0
+    delay_ms: int = 100
+    disposal: int = 0
+    transparent_index: int | None = None
+    local_colors: list[int] | None = None
+    interlaced: bool = False
+
+
+def interlace(indexes: bytes, width: int, height: int) -> bytes:
+    """Return the rows of an image in the order an interlaced gif holds them."""
+
+    order = [
+        *range(0, height, 8),
+        *range(4, height, 8),
+        *range(2, height, 4),
+        *range(1, height, 2),
+    ]
+    return b"".join(indexes[row * width : (row + 1) * width] for row in order)
+
+
+def gif_bytes(
+    width: int,
+    height: int,
+    frames: list[Frame],
+    *,
+    colors: list[int] | None = PALETTE,
+    loop_count: int | None = 0,
+) -> bytes:
+    data = gifwriter.header(width, height, colors or [], loop_count)
+    for frame in frames:
+        indexes = frame.indexes
+        if frame.interlaced:
+            indexes = interlace(indexes, frame.width, frame.height)
+        block = bytearray(
+            gifwriter.frame(
+                frame.left,
+                frame.top,
+                frame.width,
+                frame.height,
+                indexes,
+                delay_ms=frame.delay_ms,
+                disposal=frame.disposal,
+                transparent_index=frame.transparent_index,
+                local_colors=frame.local_colors,
+            )
+        )
+        if frame.interlaced:
+            block[_DESCRIPTOR_PACKED] |= _INTERLACED
+        data += block
+    return data + gifwriter.trailer()
+
+
+def write_gif(path: Path, width: int, height: int, frames: list[Frame], **kwargs):
+    path.write_bytes(gif_bytes(width, height, frames, **kwargs))
+    return path
+
+
+def random_frames(
+    seed: int, width: int, height: int, count: int, colors: int = len(PALETTE)
+) -> list[Frame]:
+    """Return count frames mixing every disposal method, transparency,
+    interlacing, local colour tables and frames smaller than the canvas."""
+
+    rng = random.Random(seed)
+    frames = []
+    for number in range(count):
+        if number == 0 or rng.random() < 0.3:
+            left = top = 0
+            frame_width, frame_height = width, height
+        else:
+            frame_width = rng.randint(1, width)
+            frame_height = rng.randint(1, height)
+            left = rng.randint(0, width - frame_width)
+            top = rng.randint(0, height - frame_height)
+        local_colors = None
+        palette_size = colors
+        if rng.random() < 0.3:
+            palette_size = rng.randint(2, 16)
+            local_colors = [rng.randrange(1 << 24) for _ in range(palette_size)]
+        disposal = rng.randrange(4)
+        transparent_index = None
+        # see the module docstring for why these frames need a transparent index
+        if number == 0 or disposal == 2 or rng.random() < 0.5:
+            transparent_index = rng.randrange(palette_size)
+        frames.append(
+            Frame(
+                frame_width,
+                frame_height,
+                bytes(
+                    rng.randrange(palette_size)
+                    for _ in range(frame_width * frame_height)
+                ),
+                left,
+                top,
+                delay_ms=rng.choice((20, 50, 100)),
+                disposal=disposal,
+                transparent_index=transparent_index,
+                local_colors=local_colors,
+                interlaced=frame_height >= MIN_INTERLACED_HEIGHT and rng.random() < 0.3,
+            )
+        )
+    return frames
+
+
+def sample_gifs(folder: Path) -> list[Path]:
+    """Write a handful of gifs to folder, each stressing something else."""
+
+    solid = [
+        Frame(8, 8, bytes([number % 7]) * 64, transparent_index=6)
+        for number in range(3)
+    ]
+    local = random_frames(3, 12, 10, 20)
+    for frame in local:
+        frame.local_colors = frame.local_colors or PALETTE
+    return [
+        write_gif(folder / "random.gif", 13, 11, random_frames(1, 13, 11, 40)),
+        write_gif(folder / "long.gif", 9, 9, random_frames(2, 9, 9, 90)),
+        write_gif(
+            folder / "local.gif",
+            12,
+            10,
+            local,
+            colors=None,
+            loop_count=None,
+        ),
+        write_gif(
+            folder / "disposals.gif",
+            10,
+            9,
+            [
+                Frame(
+                    10,
+                    9,
+                    bytes(range(7)) * 12 + bytes(6),
+                    disposal=1,
+                    transparent_index=6,
+                ),
+                Frame(
+                    4, 3, bytes([1, 2, 3] * 4), 2, 2, disposal=2, transparent_index=3
+                ),
+                Frame(5, 4, bytes([4, 0] * 10), 3, 3, disposal=3, transparent_index=0),
+                Frame(6, 5, bytes([5] * 30), 1, 1, disposal=0, local_colors=PALETTE),
+                Frame(
+                    10,
+                    9,
+                    bytes([6, 1, 2] * 30),
+                    disposal=2,
+                    transparent_index=2,
+                    interlaced=True,
+                ),
+                Frame(3, 3, bytes(9), 7, 6, disposal=3),
+                Frame(2, 2, bytes([3] * 4), 0, 0, disposal=1),
+            ],
+        ),
+        write_gif(folder / "solid.gif", 8, 8, solid, loop_count=3),
+    ]
+
+
+def reference_frames(path: Path) -> list[QImage]:
+    """Return the frames of path as QImageReader decodes them."""
+
+    reader = QImageReader(str(path))
+    frames = []
+    while not (image := reader.read()).isNull():
+        frames.append(image.convertToFormat(PIXEL_FORMAT))
+    return frames
+
+
+def assert_same_frames(stream, expected: list[QImage], numbers) -> None:
+    for number in numbers:
+        frame = stream.frame(number).convertToFormat(PIXEL_FORMAT)
+        assert frame == expected[number], f"frame {number} differs"
@@ -0,0 +1,163 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from gifs import Frame, gif_bytes
+from gifviewer import archives, gifinfo, scanner
+
+SPIN = gif_bytes(2, 2, [Frame(2, 2, bytes(4))] * 2)
+WAVE = gif_bytes(3, 1, [Frame(3, 1, bytes([1, 2, 3]))])
+
+# members every archive holds; only the first two are gifs to list
+MEMBERS = {
+    "spin.gif": SPIN,
+    "anims/deep/wave.gif": WAVE,
+    "notes.txt": b"not a gif",
+    "anims/inner.zip": b"PK\x05\x06" + bytes(18),
+}
+# members whose names do not map to a path of their own below the archive
+ODD_MEMBERS = {
+    "./dot.gif": SPIN,
+    "anims/../up.gif": SPIN,
+    "../escape.gif": SPIN,
+    "anims//double.gif": SPIN,
+}
+LISTED = ["anims/deep/wave.gif", "spin.gif"]
+
+
+def write_zip(path):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("anims/", b"")
+        archive.writestr("empty/", b"")
+        for name, data in {**MEMBERS, **ODD_MEMBERS}.items():
+            archive.writestr(name, data)
+    return path
+
+
+def write_tar(path):
+    with tarfile.open(path, "w") as archive:
+        for name in ("anims", "empty"):
+            info = tarfile.TarInfo(name)
+            info.type = tarfile.DIRTYPE
+            archive.addfile(info)
+        link = tarfile.TarInfo("link.gif")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "spin.gif"
+        archive.addfile(link)
+        for name, data in {**MEMBERS, **ODD_MEMBERS}.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return path
+
+
+@pytest.fixture(params=[write_zip, write_tar], ids=["zip", "tar"])
+def archive(request, tmp_path):
+    suffix = ".zip" if request.param is write_zip else ".tar"
+    return request.param(tmp_path / f"bundle{suffix}")
+
+
+def member(archive, name):
+    return archive.joinpath(*name.split("/"))
+
+
+def test_only_plain_gif_members_are_listed(archive):
+    listing = scanner.list_directory(str(archive))
+    assert sorted(listing.files) == sorted(
+        (str(member(archive, name)), len(MEMBERS[name]), archive.stat().st_mtime_ns)
+        for name in LISTED
+    )
+    assert listing.subdirectories == []
+
+
+def test_members_list_regular_files_with_plain_names(archive):
+    assert sorted(archives.list_members(archive)) == sorted(
+        archives.Member(name, len(data)) for name, data in MEMBERS.items()
+    )
+
+
+def test_scanning_a_folder_walks_its_archives(archive):
+    write_zip(archive.parent / "other.zip")
+    (archive.parent / "loose.gif").write_bytes(SPIN)
+    found = {
+        file.relative_to(archive.parent).as_posix()
+        for file in scanner.iter_gif_files([archive.parent])
+    }
+    assert found == {
+        "loose.gif",
+        *(f"{archive.name}/{name}" for name in LISTED),
+        *(f"other.zip/{name}" for name in LISTED),
+    }
+
+
+@pytest.mark.parametrize("name", LISTED)
+def test_stat_and_open_give_the_member(archive, name):
+    path = member(archive, name)
+    stat = archives.stat(path)
+    assert stat.st_size == len(MEMBERS[name])
+    assert stat.st_mtime_ns == archive.stat().st_mtime_ns
+    assert archives.split(path) == (str(archive), name)
+    assert bytes(gifinfo.map_file(path)) == MEMBERS[name]
+    assert gifinfo.read_gif_info(path).frame_count == (2 if name == "spin.gif" else 1)
+
+
+@pytest.mark.parametrize(
+    "name", ["missing.gif", "dot.gif", "up.gif", "escape.gif", "anims", "empty"]
+)
+def test_missing_and_odd_members_are_not_found(archive, name):
+    with pytest.raises(FileNotFoundError):
+        archives.stat(member(archive, name))
+    with pytest.raises(FileNotFoundError):
+        archives.read_member(archive, name)
+
+
+def test_paths_below_folders_or_missing_archives_are_not_split(tmp_path):
+    folder = tmp_path / "looks.zip"
+    folder.mkdir()
+    assert archives.split(folder / "a.gif") is None
+    assert archives.split(tmp_path / "gone.zip" / "a.gif") is None
+    with pytest.raises(FileNotFoundError):
+        archives.stat(tmp_path / "gone.zip" / "a.gif")
+
+
+def test_rewritten_archive_is_read_again(archive):
+    path = member(archive, "spin.gif")
+    assert bytes(gifinfo.map_file(path)) == SPIN
+
+    archive.unlink()
+    if archive.suffix == ".zip":
+        with zipfile.ZipFile(archive, "w") as rewritten:
+            rewritten.writestr("spin.gif", WAVE)
+    else:
+        with tarfile.open(archive, "w") as rewritten:
+            info = tarfile.TarInfo("spin.gif")
+            info.size = len(WAVE)
+            rewritten.addfile(info, io.BytesIO(WAVE))
+    mtime_ns = archive.stat().st_mtime_ns + 10**9
+    os.utime(archive, ns=(mtime_ns, mtime_ns))
+
+    assert archives.stat(path).st_size == len(WAVE)
+    assert bytes(gifinfo.map_file(path)) == WAVE
+    assert archives.list_members(archive) == [archives.Member("spin.gif", len(WAVE))]
+
+
+@pytest.mark.parametrize("suffix", [".zip", ".tar"])
+def test_unreadable_archives_list_nothing(tmp_path, suffix):
+    damaged = tmp_path / f"damaged{suffix}"
+    damaged.write_bytes(b"\x1f\x8b" + b"neither zip nor plain tar" * 40)
+    with pytest.raises(OSError):
+        archives.list_members(damaged)
+    assert scanner.list_directory(str(damaged)).files == []
+
+
+def test_compressed_tar_is_not_browsed(tmp_path):
+    compressed = tmp_path / "bundle.tar"
+    with tarfile.open(compressed, "w:gz") as archive:
+        info = tarfile.TarInfo("spin.gif")
+        info.size = len(SPIN)
+        archive.addfile(info, io.BytesIO(SPIN))
+    with pytest.raises(OSError):
+        archives.list_members(compressed)
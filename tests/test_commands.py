@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+import pytest
+from conftest import ROOT
+
+COMMANDS = ["scan", "export", "optimize"]
+
+
+@pytest.mark.parametrize("command", COMMANDS)
+def test_help_does_not_import_qt(command):
+    # run apart, as the other tests have imported Qt here already
+    code = (
+        "import runpy, sys\n"
+        f"sys.argv = ['cli.py', {command!r}, '--help']\n"
+        "try:\n"
+        "    runpy.run_path('cli.py', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(sorted(name for name in sys.modules if name.startswith('PyQt5')))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert "usage:" in output
+    assert output.splitlines()[-1] == "[]"
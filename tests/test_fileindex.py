@@ -0,0 +1,171 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from gifs import Frame, write_gif
+from gifviewer import fileindex, scanner, settings
+from gifviewer.fileindex import FileIndex
+
+
+def make_tree(root):
+    (root / "sub").mkdir(parents=True)
+    write_gif(root / "a.gif", 2, 2, [Frame(2, 2, bytes(4))])
+    write_gif(root / "sub" / "b.gif", 2, 2, [Frame(2, 2, bytes(4))] * 2)
+    (root / "notes.txt").write_text("not a gif")
+
+
+def touch(directory):
+    """Move the mtime of directory on, however coarse the file system's is."""
+
+    mtime_ns = os.stat(directory).st_mtime_ns + 10**9
+    os.utime(directory, ns=(mtime_ns, mtime_ns))
+
+
+def scan(index, root) -> set[str]:
+    return {file.name for _, file in index.iter_files([root])}
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "gifs"
+    make_tree(root)
+    return root
+
+
+@pytest.fixture
+def index(tmp_path):
+    with FileIndex(tmp_path / "index.sqlite3") as index:
+        yield index
+
+
+@pytest.fixture
+def listed(monkeypatch):
+    """The directories listed from the file system, in order."""
+
+    directories = []
+    list_directory = scanner.list_directory
+
+    def counting(directory, **kwargs):
+        directories.append(directory)
+        return list_directory(directory, **kwargs)
+
+    monkeypatch.setattr(scanner, "list_directory", counting)
+    return directories
+
+
+def test_unchanged_folder_comes_from_the_index(index, root, listed):
+    assert scan(index, root) == {"a.gif", "b.gif"}
+    assert len(listed) == 2
+
+    listed.clear()
+    assert scan(index, root) == {"a.gif", "b.gif"}
+    assert listed == []
+
+
+def test_added_file_relists_only_its_directory(index, root, listed):
+    scan(index, root)
+    listed.clear()
+
+    write_gif(root / "sub" / "c.gif", 2, 2, [Frame(2, 2, bytes(4))])
+    touch(root / "sub")
+    assert scan(index, root) == {"a.gif", "b.gif", "c.gif"}
+    assert listed == [str(root / "sub")]
+
+
+def test_replaced_file_has_its_metadata_read_again(index, root):
+    scan(index, root)
+    index.update_metadata(root)
+    assert index.metadata(root / "a.gif").frame_count == 1
+
+    # written beside it and renamed over it, the way files are saved safely
+    replacement = write_gif(root / "a.tmp", 3, 2, [Frame(3, 2, bytes(6))] * 3)
+    os.replace(replacement, root / "a.gif")
+    touch(root)
+    scan(index, root)
+    assert index.metadata(root / "a.gif").frame_count is None
+
+    assert index.update_metadata(root) == 1
+    metadata = index.metadata(root / "a.gif")
+    assert (metadata.frame_count, metadata.width) == (3, 3)
+
+
+def test_removed_directory_is_pruned(index, root):
+    scan(index, root)
+    index.update_metadata(root)
+
+    shutil.rmtree(root / "sub")
+    touch(root)
+    assert scan(index, root) == {"a.gif"}
+    assert index.directories(root) == [str(root)]
+    assert [metadata.path.name for metadata in index.iter_metadata(root)] == ["a.gif"]
+
+
+def test_refresh_directory_reports_changes(index, root):
+    scan(index, root)
+
+    (root / "sub" / "b.gif").unlink()
+    (root / "new").mkdir()
+    write_gif(root / "new" / "d.gif", 2, 2, [Frame(2, 2, bytes(4))])
+    touch(root)
+    touch(root / "sub")
+
+    change = index.refresh_directory(root, root)
+    change.update(index.refresh_directory(root / "sub", root))
+    assert [path.name for path in change.added] == ["d.gif"]
+    assert [path.name for path in change.removed] == ["b.gif"]
+    assert change.directories_added == [str(root / "new")]
+
+    assert not index.refresh_directory(root, root)
+
+
+def test_index_is_kept_between_connections(tmp_path, root, listed):
+    with FileIndex(tmp_path / "index.sqlite3") as index:
+        scan(index, root)
+    listed.clear()
+    with FileIndex(tmp_path / "index.sqlite3") as index:
+        assert scan(index, root) == {"a.gif", "b.gif"}
+    assert listed == []
+
+
+def corrupt(path):
+    path.write_bytes(b"this is not a database" * 200)
+
+
+def lock(path):
+    FileIndex(path).close()
+    connection = sqlite3.connect(path)
+    connection.execute("BEGIN EXCLUSIVE")
+    return connection
+
+
+def test_corrupt_database_raises_sqlite_error(tmp_path):
+    corrupt(tmp_path / "index.sqlite3")
+    with pytest.raises(sqlite3.DatabaseError):
+        FileIndex(tmp_path / "index.sqlite3")
+
+
+def test_locked_database_raises_sqlite_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(fileindex, "BUSY_TIMEOUT", 0.05)
+    connection = lock(tmp_path / "index.sqlite3")
+    with pytest.raises(sqlite3.OperationalError):
+        FileIndex(tmp_path / "index.sqlite3")
+    connection.close()
+
+
+@pytest.mark.parametrize("spoil", [corrupt, lock])
+def test_scan_without_usable_index_lists_everything(tmp_path, root, monkeypatch, spoil):
+    from gifviewer.workers import FolderScanThread
+
+    cache = tmp_path / "cache"
+    cache.mkdir()
+    monkeypatch.setattr(settings, "cache_dir", lambda: cache)
+    monkeypatch.setattr(fileindex, "BUSY_TIMEOUT", 0.05)
+    spoil(cache / fileindex.INDEX_FILE_NAME)
+
+    found = []
+    thread = FolderScanThread([root])
+    thread.files_found.connect(found.extend)
+    thread.run()
+    assert sorted(path.name for path in found) == ["a.gif", "b.gif"]
@@ -0,0 +1,137 @@
+import json
+import random
+import struct
+import zlib
+
+import pytest
+from PyQt5.QtGui import QImage
+
+from gifs import PIXEL_FORMAT, reference_frames, sample_gifs
+from gifviewer import gifinfo, pngwriter
+from gifviewer.frameexport import FrameSelection, export_frames, output_stems
+
+
+def idat(path) -> bytes:
+    """Return the joined IDAT chunks of a PNG, checking every chunk's crc."""
+
+    data = path.read_bytes()
+    assert data.startswith(pngwriter.SIGNATURE)
+    pos = len(pngwriter.SIGNATURE)
+    chunks = []
+    while pos < len(data):
+        (length,) = struct.unpack_from(">I", data, pos)
+        kind = data[pos + 4 : pos + 8]
+        body = data[pos + 8 : pos + 8 + length]
+        (crc,) = struct.unpack_from(">I", data, pos + 8 + length)
+        assert crc == zlib.crc32(body, zlib.crc32(kind))
+        if kind == b"IDAT":
+            chunks.append(body)
+        pos += length + 12
+    return b"".join(chunks)
+
+
+def loaded(path) -> QImage:
+    image = QImage(str(path))
+    assert not image.isNull(), path
+    return image.convertToFormat(PIXEL_FORMAT)
+
+
+@pytest.fixture
+def gif(tmp_path, qapp):
+    # the one with every disposal method, transparency and interlacing
+    return sample_gifs(tmp_path)[0]
+
+
+def test_adler32_combine_matches_zlib():
+    rng = random.Random(1)
+    # longer than the adler32 modulus, so the sums wrap
+    data = bytes(rng.randrange(256) for _ in range(200_000))
+    cuts = [0, 1, 5552, 65520, 65521, 65522, 131_042, len(data) - 1, len(data)]
+    cuts += [rng.randrange(len(data)) for _ in range(20)]
+    for cut in cuts:
+        first, second = data[:cut], data[cut:]
+        combined = pngwriter.adler32_combine(
+            zlib.adler32(first), zlib.adler32(second), len(second)
+        )
+        assert combined == zlib.adler32(data), cut
+
+
+def test_strips_make_one_png(tmp_path, qapp):
+    rng = random.Random(2)
+    width, height = 37, 23
+    rgba = bytes(rng.randrange(256) for _ in range(width * height * 4))
+    path = tmp_path / "strips.png"
+    writer = pngwriter.StripWriter(path, width, height)
+    starts = [0, 1, 2, 10, 22, height]
+    for start, stop in zip(starts, starts[1:]):
+        rows = rgba[start * width * 4 : stop * width * 4]
+        writer.add(pngwriter.compress_strip(rows, width, stop == height))
+    writer.finish()
+
+    # decompressing checks the adler32 the strips were combined into
+    assert zlib.decompress(idat(path)) == pngwriter.scanlines(rgba, width)
+    image = QImage(str(path)).convertToFormat(QImage.Format.Format_RGBA8888)
+    assert image.constBits().asstring(image.sizeInBytes()) == rgba
+
+
+def test_encode_reads_back(tmp_path, qapp):
+    rng = random.Random(3)
+    rgba = bytes(rng.randrange(256) for _ in range(5 * 3 * 4))
+    path = tmp_path / "image.png"
+    pngwriter.write(path, 5, 3, rgba)
+    assert zlib.decompress(idat(path)) == pngwriter.scanlines(rgba, 5)
+
+
+def test_exported_pngs_match_qt(gif, tmp_path):
+    expected = reference_frames(gif)
+    selection = FrameSelection.parse("3-30", 4)
+    output = tmp_path / "pngs"
+    results = list(export_frames([gif], output, selection, jobs=1))
+
+    numbers = selection.numbers(len(expected))
+    assert results == [(gif, len(numbers), None)]
+    assert sorted(path.name for path in output.iterdir()) == [
+        f"{gif.stem}_{number:04}.png" for number in numbers
+    ]
+    for number in numbers:
+        image = loaded(output / f"{gif.stem}_{number:04}.png")
+        assert image == expected[number], number
+
+
+@pytest.mark.parametrize("columns", [0, 1, 3, 100])
+def test_sprite_sheet_tiles_match_qt(gif, tmp_path, columns):
+    expected = reference_frames(gif)
+    delays = gifinfo.read_gif_info(gif).delays
+    output = tmp_path / "sheet"
+    selection = FrameSelection(step=3)
+    results = list(export_frames([gif], output, selection, columns=columns, jobs=1))
+
+    numbers = selection.numbers(len(expected))
+    assert results == [(gif, len(numbers), None)]
+    layout = json.loads((output / f"{gif.stem}.json").read_text())
+    sheet = loaded(output / layout["image"])
+    width, height = layout["frame_width"], layout["frame_height"]
+    assert [tile["frame"] for tile in layout["frames"]] == list(numbers)
+    assert sheet.width() == width * layout["columns"]
+    for tile in layout["frames"]:
+        number = tile["frame"]
+        assert sheet.copy(tile["x"], tile["y"], width, height) == expected[number]
+        assert tile["delay_ms"] == delays[number]
+
+
+def test_frame_selection():
+    assert FrameSelection.parse(None) == FrameSelection()
+    assert FrameSelection.parse("4") == FrameSelection(4, 4)
+    assert FrameSelection.parse("2-", 2) == FrameSelection(2, None, 2)
+    assert list(FrameSelection.parse("-3").numbers(10)) == [0, 1, 2, 3]
+    assert list(FrameSelection.parse("5-20", 5).numbers(12)) == [5, 10]
+    for frames in ("x", "3-1", "1-2-3", "-4-"):
+        with pytest.raises(ValueError):
+            FrameSelection.parse(frames)
+    with pytest.raises(ValueError):
+        FrameSelection.parse("1", 0)
+
+
+def test_output_stems_are_distinct(tmp_path):
+    paths = [tmp_path / "a" / "x.gif", tmp_path / "b" / "X.gif", tmp_path / "x.gif"]
+    assert output_stems(paths) == ["x", "X-2", "x-3"]
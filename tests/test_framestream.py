@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from gifs import (
+    PIXEL_FORMAT,
+    Frame,
+    assert_same_frames,
+    reference_frames,
+    sample_gifs,
+    write_gif,
+)
+from gifviewer.framestream import FrameStream
+
+
+@pytest.fixture
+def gifs(tmp_path, qapp):
+    return sample_gifs(tmp_path)
+
+
+def test_every_frame_matches_qt(gifs):
+    for path in gifs:
+        expected = reference_frames(path)
+        stream = FrameStream(path)
+        assert stream.frame_count == len(expected), path.name
+        assert_same_frames(stream, expected, range(len(expected)))
+        stream.close()
+
+
+def test_random_seeks_match_qt(gifs):
+    rng = random.Random(7)
+    for path in gifs:
+        expected = reference_frames(path)
+        # a tiny window and close checkpoints make most seeks start over
+        stream = FrameStream(path, window=2, checkpoint_interval=3, checkpoints=2)
+        numbers = [rng.randrange(len(expected)) for _ in range(3 * len(expected))]
+        assert_same_frames(stream, expected, numbers)
+        stream.close()
+
+
+def test_seek_past_opaque_frame_restoring_previous(tmp_path, qapp):
+    # frame 1 covers the canvas but is disposed of by restoring frame 0
+    path = write_gif(
+        tmp_path / "restore.gif",
+        4,
+        1,
+        [
+            Frame(4, 1, bytes([6, 1, 6, 1]), disposal=1, transparent_index=6),
+            Frame(4, 1, bytes([2, 2, 2, 2]), disposal=3),
+            Frame(4, 1, bytes([6, 6, 6, 6]), transparent_index=6),
+        ],
+    )
+    expected = reference_frames(path)
+    stream = FrameStream(path, window=1)
+    assert_same_frames(stream, expected, [2, 0, 2])
+    stream.close()
+
+
+def test_restoring_background_clears_to_transparent(tmp_path, qapp):
+    # Qt fills with the background colour instead, browsers clear it
+    path = write_gif(
+        tmp_path / "background.gif",
+        2,
+        1,
+        [Frame(2, 1, bytes([1, 2]), disposal=2), Frame(1, 1, bytes([3]), 1, 0)],
+    )
+    stream = FrameStream(path)
+    frame = stream.frame(1).convertToFormat(PIXEL_FORMAT)
+    assert frame.pixel(0, 0) == 0
+    assert frame.pixel(1, 0) == 0xFF0000FF
+    stream.close()
+
+
+def test_delays_and_loop_count(tmp_path, qapp):
+    path = write_gif(
+        tmp_path / "delays.gif",
+        4,
+        4,
+        [Frame(4, 4, bytes(16), delay_ms=delay) for delay in (20, 70, 1000)],
+        loop_count=2,
+    )
+    stream = FrameStream(path)
+    assert [stream.delay(number) for number in range(3)] == [20, 70, 1000]
+    assert stream.loop_count == 2
+    stream.close()
+
+
+def test_frame_numbers_are_clamped(gifs):
+    expected = reference_frames(gifs[0])
+    stream = FrameStream(gifs[0])
+    assert stream.frame(-5).convertToFormat(PIXEL_FORMAT) == expected[0]
+    assert stream.frame(10**6).convertToFormat(PIXEL_FORMAT) == expected[-1]
+    stream.close()
@@ -0,0 +1,120 @@
+import random
+import time
+from pathlib import Path
+
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+from gifviewer import fileorder
+from gifviewer.fileindex import GifMetadata
+from gifviewer.gui.giflistmodel import FilePathRole, GifListModel
+from gifviewer.mainviewmodel import MainViewModel
+from gifviewer.nameindex import matches
+
+NAMES = ["cat", "dog", "catalog", "bat", "Zebra"]
+
+
+def random_paths(rng: random.Random, count: int) -> list[Path]:
+    return [
+        Path(f"/gifs/{rng.choice('ab')}/{rng.choice(NAMES)}{rng.randrange(50)}.gif")
+        for _ in range(count)
+    ]
+
+
+def wait_for_arrangement(list_model: GifListModel, change) -> None:
+    arranged = []
+    list_model.rows_arranged.connect(lambda: arranged.append(True))
+    change()
+    deadline = time.monotonic() + 10
+    while not arranged:
+        assert time.monotonic() < deadline, "the rows were never arranged"
+        QCoreApplication.processEvents()
+
+
+def shown(list_model: GifListModel) -> list[Path]:
+    return [
+        list_model.data(list_model.index(row), FilePathRole)
+        for row in range(list_model.rowCount())
+    ]
+
+
+def assert_index_of(list_model: GifListModel, model: MainViewModel) -> None:
+    rows = {path: row for row, path in enumerate(shown(list_model))}
+    for path in model.files:
+        index = list_model.index_of(path)
+        if path in rows:
+            assert index.row() == rows[path], path
+        else:
+            assert not index.isValid(), path
+
+
+def scanned(model: MainViewModel) -> None:
+    rng = random.Random(3)
+    model.add_files(list(dict.fromkeys(random_paths(rng, 120))))
+    model.sort_files()
+
+
+@pytest.fixture
+def model(qapp):
+    return MainViewModel()
+
+
+def change_randomly(rng: random.Random, model: MainViewModel) -> tuple[list, list]:
+    removed = rng.sample(list(model.files), rng.randrange(6))
+    added = [
+        path for path in random_paths(rng, rng.randrange(6)) if path not in removed
+    ]
+    listed = set(model.files)
+    # a file never listed is skipped
+    model.remove_files(removed + [Path("/gifs/c/cat1.gif")])
+    model.insert_files(added)
+    return removed, [path for path in dict.fromkeys(added) if path not in listed]
+
+
+@pytest.mark.parametrize("query", ["", "cat", "^dog", "zz"])
+def test_name_order_follows_batches(model, query):
+    list_model = GifListModel(model)
+    scanned(model)
+    if query:
+        wait_for_arrangement(list_model, lambda: list_model.set_filter(query))
+
+    rng = random.Random(len(query))
+    for _ in range(30):
+        change_randomly(rng, model)
+        expected = [path for path in model.files if matches(path.name.lower(), query)]
+        assert shown(list_model) == expected
+        assert_index_of(list_model, model)
+
+
+@pytest.mark.parametrize("query", ["", "cat"])
+def test_metadata_order_follows_batches(model, query):
+    list_model = GifListModel(model)
+    scanned(model)
+    rng = random.Random(5)
+    metadata = [
+        GifMetadata(path, rng.randrange(10), 0, None, None, None, None)
+        for path in model.files
+    ]
+    model._orderings = fileorder.build_orderings(model.files, metadata)
+    wait_for_arrangement(list_model, lambda: list_model.set_sort_key("size"))
+    if query:
+        wait_for_arrangement(list_model, lambda: list_model.set_filter(query))
+
+    sizes = {entry.path: entry.size for entry in metadata}
+    expected = sorted(
+        (path for path in model.files if matches(path.name.lower(), query)),
+        key=sizes.__getitem__,
+    )
+    assert shown(list_model) == expected
+    assert_index_of(list_model, model)
+
+    for _ in range(30):
+        removed, added = change_randomly(rng, model)
+        # files found after the sort have no metadata, so they go last
+        expected = [path for path in expected if path not in removed]
+        expected += sorted(
+            (path for path in added if matches(path.name.lower(), query)),
+            key=list(model.files).index,
+        )
+        assert shown(list_model) == expected
+        assert_index_of(list_model, model)
@@ -0,0 +1,121 @@
+import random
+
+import pytest
+from PyQt5.QtGui import QImageReader
+
+from gifviewer import gifinfo, gifwriter, lzw
+
+
+def de_bruijn(symbols: int) -> bytes:
+    """Return a sequence holding every pair of symbols exactly once, so
+    that LZW adds a code to its table for every index after the first."""
+
+    sequence = []
+    pairs = [0] * symbols
+
+    def extend(start: int) -> None:
+        # Hierholzer's walk over the graph with an edge for every pair
+        stack = [start]
+        while stack:
+            symbol = stack[-1]
+            if pairs[symbol] < symbols:
+                pairs[symbol] += 1
+                stack.append(pairs[symbol] - 1)
+            else:
+                sequence.append(stack.pop())
+
+    extend(0)
+    return bytes(reversed(sequence))
+
+
+def round_trip(indexes: bytes, min_code_size: int) -> bytes:
+    return lzw.decode(lzw.encode(indexes, min_code_size), min_code_size, len(indexes))
+
+
+def test_de_bruijn_holds_every_pair_once():
+    sequence = de_bruijn(16)
+    pairs = list(zip(sequence, sequence[1:]))
+    assert len(pairs) == len(set(pairs)) == 16 * 16
+
+
+@pytest.mark.parametrize("min_code_size", range(2, 9))
+def test_round_trip(min_code_size):
+    rng = random.Random(min_code_size)
+    symbols = 1 << min_code_size
+    cases = [
+        b"",
+        bytes([symbols - 1]),
+        bytes(5000),  # one long run, each code one index longer
+        bytes([0, 1]) * 3000,
+        # random enough to fill the table and clear it again and again
+        bytes(rng.randrange(symbols) for _ in range(30000)),
+    ]
+    for indexes in cases:
+        assert round_trip(indexes, min_code_size) == indexes
+
+
+def test_round_trip_at_every_code_size_boundary():
+    # every index after the first adds a code, starting at the end code + 1
+    sequence = de_bruijn(256)
+    first_code = (1 << 8) + 2
+    boundaries = [1 << size for size in range(9, lzw.MAX_CODE_SIZE + 1)]
+    for boundary in boundaries:
+        length = boundary - first_code + 1
+        for indexes in (sequence[: length + shift] for shift in range(-3, 4)):
+            assert round_trip(indexes, 8) == indexes, len(indexes)
+
+
+def test_round_trip_clearing_a_full_table():
+    # long enough to fill the table of 4096 codes many times over
+    sequence = de_bruijn(256)
+    assert len(sequence) > 10 * lzw.MAX_CODES
+    assert round_trip(sequence, 8) == sequence
+
+
+def test_decode_stops_at_pixel_count():
+    data = lzw.encode(bytes(range(4)) * 10, 2)
+    assert lzw.decode(data, 2, 7) == bytes([0, 1, 2, 3, 0, 1, 2])
+
+
+def test_sub_blocks_read_back():
+    data = bytes(random.Random(1).randrange(256) for _ in range(1000))
+    blocks = gifwriter.sub_blocks(data)
+    assert max(blocks[0], blocks[256]) == 255
+    assert lzw.image_data(bytes((8,)) + blocks, 0) == (8, data)
+
+
+@pytest.mark.parametrize("colors", [2, 7, 256])
+def test_written_gif_reads_back(tmp_path, qapp, colors):
+    rng = random.Random(colors)
+    palette = [rng.randrange(1 << 24) for _ in range(colors)]
+    width, height = 64, 64
+    indexes = bytes(rng.randrange(colors) for _ in range(width * height))
+    if colors == 256:
+        # a new code for every pixel, so the table fills and is cleared
+        indexes = de_bruijn(256)[: width * height]
+    path = tmp_path / "written.gif"
+    path.write_bytes(
+        gifwriter.header(width, height, palette, 2)
+        + gifwriter.frame(
+            0,
+            0,
+            width,
+            height,
+            indexes,
+            delay_ms=70,
+            disposal=1,
+            transparent_index=None,
+        )
+        + gifwriter.trailer()
+    )
+
+    info = gifinfo.read_gif_info(path)
+    assert (info.width, info.height, info.loop_count) == (width, height, 2)
+    assert info.delays == [70]
+
+    image = QImageReader(str(path)).read()
+    assert not image.isNull()
+    for y in range(height):
+        for x in range(width):
+            expected = palette[indexes[y * width + x]]
+            assert image.pixel(x, y) & 0xFFFFFF == expected, (x, y)
@@ -0,0 +1,123 @@
+import bisect
+import random
+
+import pytest
+
+from gifviewer import nameindex
+from gifviewer.nameindex import NameIndex, matches
+
+QUERIES = ["a", "cat", "^cat", "^c", "at.g", "^", "", "zz", ".gif", "^dog1", "og1"]
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    # a few names per block, so the tests split and drop blocks
+    monkeypatch.setattr(nameindex, "BLOCK_SIZE", 4)
+
+
+def random_keys(rng: random.Random, count: int) -> list[str]:
+    names = ["cat", "dog", "catalog", "a", "bat", "zebra", "über"]
+    return [f"{rng.choice(names)}{rng.randrange(30)}.gif" for _ in range(count)]
+
+
+def expected_search(keys: list[str], query: str) -> list[int]:
+    return [index for index, key in enumerate(keys) if matches(key, query)]
+
+
+def assert_searches(index: NameIndex, keys: list[str]) -> None:
+    assert len(index) == len(keys)
+    for query in QUERIES:
+        assert list(index.search(query)) == expected_search(keys, query), query
+
+
+def test_matches_a_list_through_inserts_and_deletes():
+    rng = random.Random(1)
+    keys = sorted(random_keys(rng, 30))
+    index = NameIndex(keys)
+    assert_searches(index, keys)
+    for key in random_keys(rng, 200):
+        if keys and rng.random() < 0.45:
+            position = rng.randrange(len(keys))
+            del keys[position]
+            del index[position]
+        else:
+            position = bisect.bisect_right(keys, key)
+            keys.insert(position, key)
+            index.insert(position, key)
+        assert_searches(index, keys)
+
+
+def test_deleting_every_entry_and_starting_again():
+    keys = ["a.gif", "b.gif", "c.gif", "d.gif", "e.gif"]
+    index = NameIndex(keys)
+    for _ in keys:
+        del index[0]
+    assert len(index) == 0
+    assert list(index.search("gif")) == []
+    index.insert(0, "cat.gif")
+    assert list(index.search("^cat")) == [0]
+
+
+def test_prefix_and_substring_queries():
+    index = NameIndex(sorted(["abc.gif", "xabc.gif", "abd.gif", "b.gif", "ab.gif"]))
+    # ab.gif, abc.gif, abd.gif, b.gif, xabc.gif
+    assert list(index.search("^ab")) == [0, 1, 2]
+    assert list(index.search("ab")) == [0, 1, 2, 4]
+    assert list(index.search("^abc")) == [1]
+    assert list(index.search("^zzz")) == []
+    assert list(index.search("^")) == [0, 1, 2, 3, 4]
+
+
+def test_separator_in_query_is_ignored():
+    index = NameIndex(["a.gif", "b.gif"])
+    assert list(index.search("gif\0")) == [0, 1]
+    assert list(index.search("a.gif\0b")) == []
+
+
+def test_snapshot_keeps_its_entries_while_the_index_changes():
+    rng = random.Random(2)
+    keys = sorted(random_keys(rng, 40))
+    index = NameIndex(keys)
+    snapshot = index.snapshot()
+    before = list(keys)
+
+    for key in random_keys(rng, 40):
+        position = bisect.bisect_right(keys, key)
+        keys.insert(position, key)
+        index.insert(position, key)
+    for _ in range(20):
+        position = rng.randrange(len(keys))
+        del keys[position]
+        del index[position]
+
+    assert_searches(snapshot, before)
+    assert_searches(index, keys)
+
+
+def test_prepared_signatures_give_the_same_results():
+    rng = random.Random(4)
+    keys = sorted(random_keys(rng, 60))
+    index = NameIndex(keys)
+    snapshot = index.snapshot()
+    assert index.prepare()
+    assert_searches(index, keys)
+    # signatures are shared with snapshots
+    assert_searches(snapshot, keys)
+    before = list(keys)
+
+    for key in random_keys(rng, 30):
+        position = bisect.bisect_right(keys, key)
+        keys.insert(position, key)
+        index.insert(position, key)
+    # changed blocks have no signature until prepared again
+    assert_searches(index, keys)
+    assert index.prepare()
+    assert_searches(index, keys)
+    assert_searches(snapshot, before)
+
+
+def test_cancelled_search_and_prepare():
+    index = NameIndex(sorted(random_keys(random.Random(6), 20)))
+    assert index.search("cat", cancelled=lambda: True) is None
+    assert not index.prepare(cancelled=lambda: True)
+    assert index.prepare()
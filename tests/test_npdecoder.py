@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gifs import (  # noqa: E402
+    PIXEL_FORMAT,
+    Frame,
+    assert_same_frames,
+    interlace,
+    reference_frames,
+    sample_gifs,
+    write_gif,
+)
+from gifviewer.npdecoder import (  # noqa: E402
+    ArrayImage,
+    NumpyFrameStream,
+    interlaced_rows,
+    palette,
+)
+
+
+@pytest.fixture
+def gifs(tmp_path, qapp):
+    return sample_gifs(tmp_path)
+
+
+def test_every_frame_matches_qt(gifs):
+    for path in gifs:
+        expected = reference_frames(path)
+        stream = NumpyFrameStream(path)
+        assert stream.frame_count == len(expected), path.name
+        assert_same_frames(stream, expected, range(len(expected)))
+        stream.close()
+
+
+def test_random_seeks_match_qt(gifs):
+    rng = random.Random(11)
+    for path in gifs:
+        expected = reference_frames(path)
+        stream = NumpyFrameStream(path, window=2, checkpoint_interval=3, checkpoints=2)
+        numbers = [rng.randrange(len(expected)) for _ in range(3 * len(expected))]
+        assert_same_frames(stream, expected, numbers)
+        stream.close()
+
+
+@pytest.mark.parametrize("height", range(1, 20))
+def test_interlaced_rows(height):
+    rows = bytes(range(height))
+    order = interlace(rows, 1, height)
+    assert list(interlaced_rows(height)) == list(order)
+
+
+@pytest.mark.parametrize("height", [3, 4, 9])
+def test_interlaced_frame_matches_plain_one(tmp_path, qapp, height):
+    # Qt gets 3 and 4 row interlaced images wrong, so the plain gif is the
+    # reference here
+    indexes = bytes(row % 7 for row in range(height) for _ in range(3))
+    plain = write_gif(tmp_path / "plain.gif", 3, height, [Frame(3, height, indexes)])
+    interlaced = write_gif(
+        tmp_path / "interlaced.gif",
+        3,
+        height,
+        [Frame(3, height, indexes, interlaced=True)],
+    )
+    stream = NumpyFrameStream(interlaced)
+    assert_same_frames(stream, reference_frames(plain), [0])
+    stream.close()
+
+
+def test_palette_is_opaque_and_padded():
+    colours = palette(bytes([1, 2, 3, 255, 0, 128]))
+    assert colours.shape == (256,)
+    assert list(colours[:2]) == [0xFF010203, 0xFFFF0080]
+    assert colours[2] == 0xFF000000
+
+
+def test_frames_are_views_of_the_canvas_arrays(gifs):
+    stream = NumpyFrameStream(gifs[0])
+    image = stream.frame(0)
+    assert isinstance(image, ArrayImage)
+    assert image.format() == PIXEL_FORMAT
+    assert image.pixel(0, 0) == int(image._array[0, 0])
+    stream.close()
@@ -0,0 +1,168 @@
+import stat
+
+import pytest
+
+from gifs import PIXEL_FORMAT, Frame, reference_frames, sample_gifs, write_gif
+from gifviewer import gifinfo, optimizer
+from gifviewer.framestream import FrameStream
+
+
+def square_frames(count: int = 12) -> list[Frame]:
+    """Return full frames of a square moving over a still background,
+    written as naively as can be, with some frames repeated."""
+
+    frames = []
+    for number in range(count):
+        indexes = bytearray([number % 2 + 4] * 32 * 32)
+        x = number // 2 * 4
+        for y in range(8, 14):
+            indexes[y * 32 + x : y * 32 + x + 6] = bytes([1]) * 6
+        if number % 4 == 0:
+            indexes[-1] = 6  # transparent, so the pixel before shows through
+        frames.append(
+            Frame(
+                32,
+                32,
+                bytes(indexes),
+                delay_ms=30 + number * 10,
+                disposal=1,
+                transparent_index=6,
+            )
+        )
+    frames[1].indexes = frames[0].indexes  # a repeat, merged by the optimizer
+    return frames
+
+
+def timeline(path) -> tuple[list[tuple[bytes, int]], int | None]:
+    """Return the canvases of path as QImageReader decodes them, with
+    runs of the same canvas merged and their delays added up, and the
+    loop count."""
+
+    info = gifinfo.read_gif_info(path)
+    canvases = []
+    for image, delay in zip(reference_frames(path), info.delays, strict=True):
+        image = image.convertToFormat(PIXEL_FORMAT)
+        pixels = image.constBits().asstring(image.sizeInBytes())
+        if canvases and canvases[-1][0] == pixels:
+            canvases[-1] = (pixels, canvases[-1][1] + delay)
+        else:
+            canvases.append((pixels, delay))
+    return canvases, info.loop_count
+
+
+@pytest.fixture
+def gifs(tmp_path, qapp):
+    return [
+        *sample_gifs(tmp_path),
+        write_gif(tmp_path / "square.gif", 32, 32, square_frames(), loop_count=5),
+    ]
+
+
+def test_encoded_gif_composes_to_the_same_frames(gifs, tmp_path):
+    for path in gifs:
+        # encoded without a limit, as most of these would not shrink
+        stream = FrameStream(path, window=1)
+        data, _ = optimizer.encode(stream)
+        stream.close()
+        target = tmp_path / f"encoded-{path.name}"
+        target.write_bytes(data)
+        assert timeline(target) == timeline(path), path.name
+
+
+def test_output_composes_to_the_same_frames(gifs, tmp_path):
+    output = tmp_path / "output"
+    output.mkdir()
+    for path in gifs:
+        target = output / path.name
+        result = optimizer.optimize_file(path, target, None)
+        assert result.error is None, (path.name, result.error)
+        assert result.after == target.stat().st_size
+        assert timeline(target) == timeline(path), path.name
+
+
+def test_naive_gif_shrinks(gifs):
+    path = gifs[-1]
+    before = path.read_bytes()
+    result = optimizer.optimize_file(path, path, None)
+    assert result.error is None
+    assert result.after < result.before == len(before)
+    assert path.stat().st_size == result.after
+    # the repeated frame is merged into the one before it
+    assert gifinfo.read_gif_info(path).frame_count == len(square_frames()) - 1
+
+
+def test_reduced_colors_keep_frames_delays_and_loop_count(gifs, tmp_path):
+    path = gifs[0]
+    target = tmp_path / "reduced.gif"
+    result = optimizer.optimize_file(path, target, 3)
+    assert result.error is None
+
+    canvases, loop_count = timeline(target)
+    expected, expected_loop_count = timeline(path)
+    assert loop_count == expected_loop_count
+    assert sum(delay for _, delay in canvases) == sum(delay for _, delay in expected)
+    colors = set()
+    for image in reference_frames(target):
+        colors.update(
+            image.pixel(x, y)
+            for x in range(image.width())
+            for y in range(image.height())
+        )
+    # the palette chosen and transparency
+    assert len(colors - {0}) <= 3
+
+
+def test_in_place_keeps_permissions(gifs):
+    path = gifs[-1]
+    path.chmod(0o640)
+    result = optimizer.optimize_file(path, path, None)
+    assert result.error is None and result.saved > 0
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+
+
+def test_failed_verify_leaves_original_untouched(gifs, monkeypatch):
+    path = gifs[-1]
+    before = path.read_bytes()
+    encode = optimizer.encode
+
+    def wrong_canvases(*args):
+        data, expected = encode(*args)
+        digest, delay = expected[0]
+        return data, [(bytes(len(digest)), delay), *expected[1:]]
+
+    monkeypatch.setattr(optimizer, "encode", wrong_canvases)
+    result = optimizer.optimize_file(path, path, None)
+    assert result.error == "frame 0 of the optimized gif differs"
+    assert result.after == result.before
+    assert path.read_bytes() == before
+    assert sorted(path.parent.glob(".*.tmp")) == []
+
+
+def test_unshrinkable_gif_is_kept(gifs, tmp_path):
+    path = gifs[-1]
+    optimizer.optimize_file(path, path, None)
+    optimized = path.read_bytes()
+
+    result = optimizer.optimize_file(path, path, None)
+    assert result.error is None and result.saved == 0
+    assert path.read_bytes() == optimized
+
+    # but an output folder still gets a copy
+    target = tmp_path / "copy.gif"
+    result = optimizer.optimize_file(path, target, None)
+    assert result.error is None and result.saved == 0
+    assert target.read_bytes() == optimized
+
+
+def test_optimize_files_writes_into_output(gifs, tmp_path):
+    before = {path: path.read_bytes() for path in gifs}
+    output = tmp_path / "optimized"
+    results = list(optimizer.optimize_files(gifs, output=output, jobs=1))
+
+    assert sorted(result.path for result in results) == sorted(gifs)
+    assert all(result.error is None for result in results)
+    assert sorted(path.name for path in output.iterdir()) == sorted(
+        path.name for path in gifs
+    )
+    for path, data in before.items():
+        assert path.read_bytes() == data
@@ -0,0 +1,110 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from gifviewer.pathstore import PathStore
+from gifviewer.scanner import name_key
+
+
+def random_paths(rng: random.Random, count: int) -> list[Path]:
+    folders = ["/gifs", "/gifs/cats", "/mnt/share/Über", "/gifs/cats/old"]
+    names = ["a", "B", "cat", "Cat", "dog", "zebra", "ä", "x y"]
+    return [
+        Path(rng.choice(folders), f"{rng.choice(names)}{rng.randrange(50)}.gif")
+        for _ in range(count)
+    ]
+
+
+def test_matches_a_list_through_inserts_and_deletes():
+    rng = random.Random(3)
+    expected = random_paths(rng, 50)
+    store = PathStore(expected)
+    for path in random_paths(rng, 300):
+        if expected and rng.random() < 0.5:
+            index = rng.randrange(len(expected))
+            del expected[index]
+            del store[index]
+        else:
+            index = rng.randint(0, len(expected))
+            expected.insert(index, path)
+            store.insert(index, path)
+        assert len(store) == len(expected)
+    assert list(store) == expected
+    assert store[3:9] == expected[3:9]
+    assert [store.name(index) for index in range(len(store))] == [
+        path.name for path in expected
+    ]
+
+
+def test_deleting_most_entries_compacts_the_buffer():
+    paths = [Path(f"/gifs/{number}.gif") for number in range(100)]
+    store = PathStore(paths)
+    full = store.nbytes
+    for _ in range(80):
+        del store[0]
+    assert list(store) == paths[80:]
+    assert store.nbytes < full // 2
+
+
+def test_index_matches_whole_entries_only():
+    paths = [Path("/x/gifs/a.gif"), Path("/gifs/a.gif.gif"), Path("/gifs/a.gif")]
+    store = PathStore(paths)
+    assert store.index(Path("/gifs/a.gif")) == 2
+    assert store.index(Path("/x/gifs/a.gif")) == 0
+    with pytest.raises(ValueError):
+        store.index(Path("/gifs/a"))
+    with pytest.raises(ValueError):
+        store.index(Path("/gifs/a.gif"), 0, 2)
+
+
+def test_index_after_inserts_and_removals():
+    store = PathStore([Path("/a.gif"), Path("/b.gif"), Path("/c.gif")])
+    del store[0]
+    store.insert(0, Path("/a.gif"))
+    del store[1]
+    store.append(Path("/b.gif"))
+    assert list(store) == [Path("/a.gif"), Path("/c.gif"), Path("/b.gif")]
+    assert [store.index(path) for path in store] == [0, 1, 2]
+
+
+def test_bisect_name_keeps_a_store_sorted_by_name():
+    rng = random.Random(5)
+    store = PathStore()
+    expected: list[Path] = []
+    for path in random_paths(rng, 200):
+        if expected and rng.random() < 0.3:
+            index = rng.randrange(len(expected))
+            del expected[index]
+            del store[index]
+            continue
+        key = name_key(path)
+        index = store.bisect_name(key)
+        assert store.bisect_name(key, left=True) <= index
+        store.insert(index, path)
+        expected.insert(index, path)
+
+    keys = [name_key(path) for path in store]
+    assert keys == sorted(keys)
+    assert list(store) == expected
+    for path in expected:
+        assert store.index_sorted(path) == expected.index(path)
+
+
+def test_sort_by_name_returns_the_previous_indexes():
+    paths = [Path("/b/Zed.gif"), Path("/a/apple.gif"), Path("/c/Mango.gif")]
+    store = PathStore(paths)
+    assert store.sort_by_name() == [1, 2, 0]
+    assert [path.name for path in store] == ["apple.gif", "Mango.gif", "Zed.gif"]
+    assert store.name_keys() == ["apple.gif", "mango.gif", "zed.gif"]
+    with pytest.raises(ValueError):
+        store.index_sorted(Path("/a/zed.gif"))
+
+
+def test_copy_is_independent():
+    store = PathStore([Path("/a.gif"), Path("/b.gif")])
+    copy = store.copy()
+    del store[0]
+    store.append(Path("/c.gif"))
+    assert list(copy) == [Path("/a.gif"), Path("/b.gif")]
+    assert copy.index_map() == {b"/a.gif": 0, b"/b.gif": 1}
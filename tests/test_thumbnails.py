@@ -0,0 +1,41 @@
+import threading
+
+from gifs import sample_gifs
+from gifviewer.thumbnails import THUMB_MTIME_KEY, ThumbnailCache
+
+
+def test_make_saves_a_thumbnail_that_loads(tmp_path, qapp):
+    path = sample_gifs(tmp_path)[0]
+    cache = ThumbnailCache(tmp_path / "thumbnails", 8)
+    assert cache.load(path) is None
+
+    image = cache.make(path)
+    assert max(image.width(), image.height()) == 8
+    loaded = cache.load(path)
+    assert loaded is not None
+    assert loaded.text(THUMB_MTIME_KEY) == str(path.stat().st_mtime_ns)
+
+
+def test_threads_saving_the_same_thumbnail(tmp_path, qapp):
+    path = sample_gifs(tmp_path)[0]
+    folder = tmp_path / "thumbnails"
+    cache = ThumbnailCache(folder, 8)
+    image = cache.make(path)
+    errors = []
+
+    def save() -> None:
+        try:
+            for _ in range(50):
+                cache.save(path, image)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert cache.load(path) is not None
+    assert [file.suffix for file in folder.iterdir()] == [".png"]